@@ -0,0 +1,131 @@
+import heapq
+from collections import Counter, defaultdict
+
+
+class RoomAllocator:
+    """Assigns a whole intake to free beds in one pass.
+
+    Students are grouped by (gender, year, department) and groups are
+    placed largest first, each into the block its members prefer or the
+    compatible block with most free beds, filling rooms floor by floor.
+    That keeps departments and years together without comparing every
+    student with every bed. Rooms are listed per (block, room gender) and
+    free beds are counted per (block, room gender) as they are taken, so
+    choosing a block is O(blocks) per group and a room is walked until it
+    fills, then dropped: planning is O(students + rooms + groups x blocks)
+    after sorting, plus re-skipping rooms another year has part-filled.
+
+    Hard rules: a room's gender ('' = any) must match, and a room this
+    run has started for one year is not topped up with another year.
+    Preferences are soft; misses are counted in the report.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.rooms = {}
+        self.block_names = []
+        # (block, room gender) -> room numbers with free beds, in fill order; and their free beds
+        self.blocks = defaultdict(list)
+        self.block_free = Counter()
+        self.room_year = {}
+
+    def load_rooms(self):
+        self.rooms.clear()
+        self.blocks.clear()
+        self.block_free.clear()
+        self.room_year.clear()
+        blocks = {}
+        for order, (room_no, block, floor, gender, free) in enumerate(self.db.get_free_rooms()):
+            # Already sorted by block, floor and room number; order merges a block's gender lists back
+            self.rooms[room_no] = {'block': block, 'gender': gender, 'free': free, 'order': order}
+            self.blocks[(block, gender)].append(room_no)
+            self.block_free[(block, gender)] += free
+            blocks[block] = None
+        self.block_names = list(blocks)
+
+    def compatible(self, block, gender):
+        """(block, room gender) keys whose rooms a group of this gender may use"""
+        return [(block, '')] + ([(block, gender)] if gender else [])
+
+    def plan(self, students):
+        """Return (assignments {reg_no: room_no}, unplaced [(reg_no, reason)], report)
+
+        Each student is a dict with registration_no, department and
+        optional gender, year and preferred_block.
+        """
+        if not self.rooms:
+            self.load_rooms()
+
+        groups = defaultdict(list)
+        for student in students:
+            key = ((student.get('gender') or '').strip().upper()[:1],
+                   str(student.get('year') or '').strip(),
+                   (student.get('department') or '').strip().upper())
+            groups[key].append(student)
+
+        assignments = {}
+        unplaced = []
+        missed_preferences = 0
+        for (gender, year, _), members in sorted(groups.items(), key=lambda item: -len(item[1])):
+            for block in self.block_order(gender, members):
+                members = self.fill_block(block, gender, year, members, assignments)
+                if not members:
+                    break
+            unplaced.extend((student['registration_no'], f"no free bed for gender {gender or 'any'}"
+                             f"{', year ' + year if year else ''}") for student in members)
+
+        for student in students:
+            preferred = (student.get('preferred_block') or '').strip().upper()
+            room_no = assignments.get(student['registration_no'])
+            if preferred and room_no and self.rooms[room_no]['block'] != preferred:
+                missed_preferences += 1
+
+        report = {
+            'students': len(students),
+            'placed': len(assignments),
+            'unplaced': len(unplaced),
+            'missed_preferences': missed_preferences,
+            'rooms_used': len(set(assignments.values())),
+        }
+        return assignments, unplaced, report
+
+    def block_order(self, gender, members):
+        """Preferred blocks by vote first, then by most free compatible beds"""
+        votes = Counter((student.get('preferred_block') or '').strip().upper() for student in members)
+        votes.pop('', None)
+        free = {block: sum(self.block_free[key] for key in self.compatible(block, gender))
+                for block in self.block_names}
+        return sorted((block for block in free if free[block]),
+                      key=lambda block: (-votes.get(block, 0), -free[block], block))
+
+    def fill_block(self, block, gender, year, members, assignments):
+        """Place members into the block's rooms in order; returns those left over"""
+        # Students who asked for this block get its beds first
+        members = sorted(members, key=lambda student:
+                         (student.get('preferred_block') or '').strip().upper() != block)
+        keys = self.compatible(block, gender)
+        walked = Counter()
+        i = 0
+        for room_no in heapq.merge(*(self.blocks[key] for key in keys), key=lambda r: self.rooms[r]['order']):
+            if i == len(members):
+                break
+            room = self.rooms[room_no]
+            walked[room['gender']] += 1
+            if self.room_year.get(room_no, year) != year:
+                continue
+            self.room_year[room_no] = year
+            while room['free'] and i < len(members):
+                assignments[members[i]['registration_no']] = room_no
+                room['free'] -= 1
+                self.block_free[(block, room['gender'])] -= 1
+                i += 1
+        # Drop the rooms this group filled (all within the walked prefix) so later groups skip them
+        for key in keys:
+            room_nos = self.blocks[key]
+            count = walked[key[1]]
+            room_nos[:count] = [room_no for room_no in room_nos[:count] if self.rooms[room_no]['free']]
+        return members[i:]
+
+    def commit(self, assignments):
+        """Write the plan in one transaction; returns the number of students moved"""
+        return self.db.assign_rooms(assignments)
@@ -0,0 +1,219 @@
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+from datetime import datetime
+
+# Snapshot files are named hostel-<timestamp>.db[.gz] with a matching .json manifest
+SNAPSHOT_PREFIX = 'hostel-'
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BackupManager:
+    """Online snapshots of the database plus an incremental photo store.
+
+    The database is copied with sqlite3.Connection.backup a few pages at a
+    time, sleeping between steps so writers are never locked out for long.
+    Photos are stored once per content hash under photos/; each snapshot's
+    manifest lists the hashes it needs, so unchanged photos cost nothing.
+    """
+
+    def __init__(self, db, backup_dir=None, keep=7, compress=True,
+                 pages=256, step_sleep=0.005, photo_dirs=None):
+        if keep < 1:
+            # rotate() slices with -keep; keep=0 would keep everything, not nothing
+            raise ValueError(f"keep must be at least 1, not {keep}")
+        self.db = db
+        # Defaults from the database's Config: backups beside the database file, photos under the data root
+        backup_dir = backup_dir or db.config.backups_dir
+        self.backup_dir = backup_dir
+        self.keep = keep
+        self.compress = compress
+        self.pages = pages
+        self.step_sleep = step_sleep
+        self.photo_dirs = photo_dirs or (db.config.images_dir,)
+        self.photo_store = os.path.join(backup_dir, 'photos')
+        self.hash_cache_path = os.path.join(backup_dir, 'photo_hashes.json')
+        self.lock = threading.Lock()
+
+    def create_snapshot(self):
+        """Write, verify and rotate one snapshot; returns its manifest"""
+        with self.lock:
+            os.makedirs(self.backup_dir, exist_ok=True)
+            name = SNAPSHOT_PREFIX + datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+            db_path = os.path.join(self.backup_dir, name + '.db')
+
+            self.copy_database(db_path)
+            students = self.verify_database(db_path)
+            if self.compress:
+                db_path = self.compress_file(db_path)
+
+            manifest = {
+                'name': name,
+                'created': datetime.now().isoformat(timespec='seconds'),
+                'database': os.path.basename(db_path),
+                'database_sha256': file_sha256(db_path),
+                'students': students,
+                'photos': self.store_photos(),
+            }
+            with open(os.path.join(self.backup_dir, name + '.json'), 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=1)
+
+            self.rotate()
+            return manifest
+
+    def copy_database(self, dest_path):
+        source = self.db.connect()
+        dest = sqlite3.connect(dest_path)
+        try:
+            source.backup(dest, pages=self.pages, sleep=self.step_sleep)
+        finally:
+            dest.close()
+            source.close()
+
+    @staticmethod
+    def verify_database(path):
+        """Integrity-check a snapshot; returns its student count"""
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            result = conn.execute("PRAGMA integrity_check").fetchone()[0]
+            if result != 'ok':
+                raise sqlite3.DatabaseError(f"Snapshot {path} failed integrity check: {result}")
+            return conn.execute("SELECT COUNT(*) FROM students").fetchone()[0]
+        finally:
+            conn.close()
+
+    @staticmethod
+    def compress_file(path):
+        gz_path = path + '.gz'
+        with open(path, 'rb') as src, gzip.open(gz_path, 'wb') as dst:
+            shutil.copyfileobj(src, dst, 1 << 20)
+        # Read the archive back so a truncated or corrupt write is caught now
+        with gzip.open(gz_path, 'rb') as f:
+            while f.read(1 << 20):
+                pass
+        os.remove(path)
+        return gz_path
+
+    def store_photos(self):
+        """Copy new or changed photos into the content store; returns {path: sha256}"""
+        cache = {}
+        if os.path.exists(self.hash_cache_path):
+            with open(self.hash_cache_path, encoding='utf-8') as f:
+                cache = json.load(f)
+
+        photos = {}
+        new_cache = {}
+        for photo_dir in self.photo_dirs:
+            if not os.path.isdir(photo_dir):
+                continue
+            for entry in os.scandir(photo_dir):
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+                key = entry.path.replace(os.sep, '/')
+                cached = cache.get(key)
+                if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+                    sha = cached[2]
+                else:
+                    sha = file_sha256(entry.path)
+                new_cache[key] = [stat.st_size, stat.st_mtime_ns, sha]
+                photos[key] = sha
+
+                stored = self.photo_object_path(sha)
+                if not os.path.exists(stored):
+                    os.makedirs(os.path.dirname(stored), exist_ok=True)
+                    shutil.copy2(entry.path, stored)
+
+        with open(self.hash_cache_path, 'w', encoding='utf-8') as f:
+            json.dump(new_cache, f)
+        return photos
+
+    def photo_object_path(self, sha):
+        return os.path.join(self.photo_store, sha[:2], sha)
+
+    def list_manifests(self):
+        """Manifests of existing snapshots, oldest first"""
+        if not os.path.isdir(self.backup_dir):
+            return []
+        manifests = []
+        for filename in sorted(os.listdir(self.backup_dir)):
+            if filename.startswith(SNAPSHOT_PREFIX) and filename.endswith('.json'):
+                with open(os.path.join(self.backup_dir, filename), encoding='utf-8') as f:
+                    manifests.append(json.load(f))
+        return manifests
+
+    def rotate(self):
+        """Keep the newest `keep` snapshots and drop photos no snapshot references"""
+        manifests = self.list_manifests()
+        expired, kept = manifests[:-self.keep], manifests[-self.keep:]
+        for manifest in expired:
+            for filename in (manifest['database'], manifest['name'] + '.json'):
+                path = os.path.join(self.backup_dir, filename)
+                if os.path.exists(path):
+                    os.remove(path)
+
+        if expired and os.path.isdir(self.photo_store):
+            referenced = {sha for manifest in kept for sha in manifest['photos'].values()}
+            for bucket in os.scandir(self.photo_store):
+                for obj in os.scandir(bucket.path):
+                    if obj.name not in referenced:
+                        os.remove(obj.path)
+
+    def verify_snapshot(self, manifest):
+        """Re-check a stored snapshot against its manifest; returns a list of problems"""
+        problems = []
+        db_path = os.path.join(self.backup_dir, manifest['database'])
+        if not os.path.exists(db_path):
+            return [f"missing {manifest['database']}"]
+        if file_sha256(db_path) != manifest['database_sha256']:
+            problems.append(f"checksum mismatch for {manifest['database']}")
+        for path, sha in manifest['photos'].items():
+            if not os.path.exists(self.photo_object_path(sha)):
+                problems.append(f"missing photo {path}")
+        return problems
+
+
+class BackupScheduler:
+    """Runs BackupManager.create_snapshot every `interval` seconds on a daemon thread"""
+
+    def __init__(self, manager, interval=6 * 3600):
+        self.manager = manager
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.last_error = None
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def seconds_until_due(self):
+        manifests = self.manager.list_manifests()
+        if not manifests:
+            return 0
+        age = (datetime.now() - datetime.fromisoformat(manifests[-1]['created'])).total_seconds()
+        return max(0.0, self.interval - age)
+
+    def run(self):
+        delay = self.seconds_until_due()
+        while not self.stopped.wait(delay):
+            delay = self.interval
+            try:
+                self.manager.create_snapshot()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = e
+                print("Backup Error:", e)  # Debugging
+
+    def stop(self):
+        self.stopped.set()
@@ -0,0 +1,76 @@
+"""Export benchmark: time and peak Python memory for streaming exports.
+
+Usage: python benchmarks/bench_export.py [--rows 1000000] [--in-memory-db]
+
+Peak traced memory should stay flat as --rows grows; a fetchall-based
+export would grow linearly. --in-memory-db keeps the database in RAM to time
+the export path without disk reads.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+from database import Database, INSERT_STUDENT_SQL  # noqa: E402
+from exporter import export_students  # noqa: E402
+
+
+def seed(db, rows):
+    departments = ['CS', 'EE', 'ME', 'MATH', 'PHY']
+    conn = db.connect()
+    batch = []
+    for i in range(rows):
+        batch.append((f"BX{i:08d}", 'Bench', f"Student{i % 1000}", 'Bench Parent',
+                      departments[i % len(departments)], f"A{i % 400}", '03001234567',
+                      f"s{i}@example.com", 'Campus', '', '2024-09-01', '2025-09-01',
+                      '+923001234567', f"s{i}@example.com"))
+        if len(batch) == 50000:
+            conn.executemany(INSERT_STUDENT_SQL, batch)
+            batch.clear()
+    if batch:
+        conn.executemany(INSERT_STUDENT_SQL, batch)
+    conn.commit()
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--no-memory', action='store_true', help="skip the traced peak-memory pass")
+    parser.add_argument('--in-memory-db', action='store_true', help="keep the database in RAM")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='hostel-export-')
+    db = Database(config=Config(data_root=workdir, memory=args.in_memory_db))
+    start = time.perf_counter()
+    seed(db, args.rows)
+    print(f"seeded {args.rows} rows in {time.perf_counter() - start:.1f}s ({workdir})")
+
+    cases = [
+        ('csv', 'students.csv', None, None),
+        ('csv', 'students.csv.gz', None, None),
+        ('jsonl', 'students.jsonl.gz', None, None),
+        ('csv', 'cs_subset.csv', ('registration_no', 'last_name', 'room_no'), {'department': 'CS'}),
+    ]
+    for fmt, name, columns, filters in cases:
+        path = os.path.join(workdir, name)
+        start = time.perf_counter()
+        count = export_students(db, path, fmt, columns=columns, filters=filters)
+        elapsed = time.perf_counter() - start
+        line = (f"{name:<20} rows={count:>8} {elapsed:6.1f}s {count / elapsed:>9,.0f} rows/s "
+                f"size={os.path.getsize(path) / 1e6:,.1f} MB")
+        if not args.no_memory:
+            # Separate pass: tracemalloc slows allocation-heavy code several-fold
+            tracemalloc.start()
+            export_students(db, path, fmt, columns=columns, filters=filters)
+            line += f" peak={tracemalloc.get_traced_memory()[1] / 1024:,.0f} KiB"
+            tracemalloc.stop()
+        print(line)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,279 @@
+"""End-to-end benchmark: times the main operations at several population sizes as a JSON report.
+
+Usage: python benchmarks/bench_suite.py [--sizes 1k,10k,100k] [--memory] [-o report.json]
+       python benchmarks/bench_suite.py --sizes 10k --baseline report.json [--tolerance 0.25]
+
+Each size gets a fresh database seeded with benchmarks/population.py
+students through the same validate + add_students path as `cli.py
+import`. Bulk steps report seconds and rows/s; per-call steps (lookups,
+searches, single writes, card generation) report latency percentiles
+over --samples calls. "list_load" is the desk's startup load: paging
+through iter_students and building the type-ahead index, without Tk.
+
+The report records the machine, Python, SQLite and git revision. With
+--baseline the run is compared step by step with an earlier report and
+exits 1 if any step is slower than --tolerance allows. Card generation
+needs fpdf and qrcode and is reported as skipped without them.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+import prefix_index  # noqa: E402
+from cli import IMPORT_BATCH_SIZE, prepare_student  # noqa: E402
+from config import Config  # noqa: E402
+from database import Database  # noqa: E402
+from duplicates import DuplicateDetector  # noqa: E402
+from exporter import export_students  # noqa: E402
+from population import generate_students, make_photos, parse_size, room_layout  # noqa: E402
+from validator import Validator  # noqa: E402
+
+# Page size the desk loads the students list with (main.LOAD_BATCH_SIZE; main needs Tk)
+LOAD_BATCH_SIZE = 500
+
+# Differences below these are timer noise, never regressions
+NOISE_SECONDS = 0.01
+NOISE_MS = 0.05
+
+
+def bulk(seconds, rows):
+    return {'seconds': round(seconds, 4), 'rows': rows,
+            'rows_per_s': round(rows / seconds) if seconds else None}
+
+
+def calls(fn, arg_lists):
+    """Call fn once per argument tuple; latency summary in milliseconds"""
+    latencies = []
+    for fn_args in arg_lists:
+        start = time.perf_counter()
+        fn(*fn_args)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    n = len(latencies)
+    if not n:
+        return {'calls': 0}
+    return {'calls': n,
+            'mean_ms': round(sum(latencies) / n * 1e3, 4),
+            'p50_ms': round(latencies[n // 2] * 1e3, 4),
+            'p99_ms': round(latencies[min(n - 1, n * 99 // 100)] * 1e3, 4),
+            'max_ms': round(latencies[-1] * 1e3, 4)}
+
+
+def search_terms(sample, rng):
+    """What desks type: reg no prefixes, name prefixes and "first last" prefixes"""
+    terms = []
+    for student in sample:
+        kind = rng.randrange(3)
+        if kind == 0:
+            terms.append(student['registration_no'][:rng.randint(3, 6)])
+        elif kind == 1:
+            terms.append(student['first_name'][:rng.randint(2, 4)])
+        else:
+            terms.append(f"{student['first_name']} {student['last_name'][:2]}")
+    return terms
+
+
+def run_size(count, args, workdir, photo_paths):
+    rng = random.Random(args.seed)
+    results = {}
+
+    def report(step, result):
+        results[step] = result
+        summary = (f"{result['seconds']:.3f}s {result['rows_per_s'] or 0:,} rows/s" if 'seconds' in result
+                   else f"p50={result.get('p50_ms', 0):.3f}ms p99={result.get('p99_ms', 0):.3f}ms"
+                   if result.get('calls') else result.get('skipped', ''))
+        print(f"{count:>8} {step:<16} {summary}", file=sys.stderr, flush=True)
+
+    # First pass: generation alone, plus the room counts and a reservoir sample for the per-call steps
+    start = time.perf_counter()
+    genders = {'M': 0, 'F': 0}
+    sample = []
+    for i, student in enumerate(generate_students(count, args.seed, photo_paths)):
+        genders[student['gender']] += 1
+        if len(sample) < args.samples:
+            sample.append(student)
+        elif rng.randrange(i + 1) < args.samples:
+            sample[rng.randrange(args.samples)] = student
+    report('generate', bulk(time.perf_counter() - start, count))
+
+    config = Config(data_root=os.path.join(workdir, str(count)), memory=args.memory)
+    db = Database(config=config)
+    rooms = room_layout(genders['M'], genders['F'])
+    start = time.perf_counter()
+    db.add_rooms(rooms)
+    report('add_rooms', bulk(time.perf_counter() - start, len(rooms)))
+
+    # Second pass: the import path, timing validation and inserts separately
+    validate_seconds = insert_seconds = 0.0
+    batch = []
+    students = generate_students(count, args.seed, photo_paths)
+    while True:
+        batch.clear()
+        for student in students:
+            batch.append(student)
+            if len(batch) == IMPORT_BATCH_SIZE:
+                break
+        if not batch:
+            break
+        start = time.perf_counter()
+        failures = Validator.validate_batch(batch)
+        validate_seconds += time.perf_counter() - start
+        if failures:
+            raise SystemExit(f"population.py produced {len(failures)} invalid rows")
+        start = time.perf_counter()
+        _, db_failures = db.add_students([prepare_student(student) for student in batch])
+        insert_seconds += time.perf_counter() - start
+        if db_failures:
+            raise SystemExit(f"insert failed: {db_failures[:3]}")
+    report('validate', bulk(validate_seconds, count))
+    report('add_students', bulk(insert_seconds, count))
+
+    terms = search_terms(sample, rng)
+    repeat = [()] * min(args.samples, 50)
+    report('get_student', calls(db.get_student, [(student['registration_no'],) for student in sample]))
+    report('count_students', calls(db.count_students, repeat))
+    report('get_stats', calls(db.get_stats, repeat))
+    soon = (date.today() + timedelta(days=30)).isoformat()
+    report('count_expiring', calls(db.count_expiring, [(soon,)] * len(repeat)))
+    report('search_db', calls(db.search_students, [(term,) for term in terms]))
+
+    index = prefix_index.PrefixIndex()
+    start = time.perf_counter()
+    for students_page in db.iter_students(LOAD_BATCH_SIZE):
+        for row in students_page:
+            prefix_index.add_student(index, row[0], row[1], row[2])
+    report('list_load', bulk(time.perf_counter() - start, count))
+    report('search_index', calls(index.search, [(term,) for term in terms]))
+
+    detector = DuplicateDetector(db)
+    start = time.perf_counter()
+    detector.sync()
+    report('duplicates_load', bulk(time.perf_counter() - start, count))
+    report('find_duplicates', calls(detector.find_matches, [(student,) for student in sample]))
+
+    report('update_student', calls(db.update_student, [
+        (student['registration_no'], {'address': f"House {i}, Benchmark Road"})
+        for i, student in enumerate(sample)]))
+    new_students = [dict(student, registration_no=f"ZZ{i:08d}", room_no='BENCH')
+                    for i, student in enumerate(sample)]
+    report('add_student', calls(db.add_student, [(prepare_student(student),) for student in new_students]))
+
+    start = time.perf_counter()
+    exported = export_students(db, os.devnull, 'csv')
+    report('export_csv', bulk(time.perf_counter() - start, exported))
+
+    try:
+        from id_card import IDCardGenerator
+    except ImportError as e:
+        report('generate_card', {'skipped': f"{e.name} not installed"})
+    else:
+        generator = IDCardGenerator(config)
+        cards_dir = os.path.join(workdir, 'cards')
+        os.makedirs(cards_dir, exist_ok=True)
+        report('generate_card', calls(generator.generate, [
+            (prepare_student(student), os.path.join(cards_dir, f"{student['registration_no']}.pdf"))
+            for student in sample[:args.cards]]))
+
+    if not config.memory:
+        results['database_bytes'] = os.path.getsize(db.db_path)
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=APP_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline, tolerance):
+    """Print step-by-step changes against a baseline; returns the regressed (size, step) pairs"""
+    regressions = []
+    for key in ('machine', 'python', 'sqlite', 'memory'):
+        if baseline.get(key) != report.get(key):
+            print(f"note: {key} differs from the baseline ({baseline.get(key)} -> {report.get(key)})",
+                  file=sys.stderr)
+    for size, steps in report['sizes'].items():
+        for step, result in steps.items():
+            old = baseline.get('sizes', {}).get(size, {}).get(step)
+            if not isinstance(result, dict) or not isinstance(old, dict):
+                continue
+            metric, noise = ('seconds', NOISE_SECONDS) if 'seconds' in result else ('p50_ms', NOISE_MS)
+            if metric not in result or not old.get(metric):
+                continue
+            change = result[metric] / old[metric] - 1
+            slower = change > tolerance and result[metric] - old[metric] > noise
+            if slower:
+                regressions.append((size, step))
+            print(f"{size:>8} {step:<16} {metric:<8} {old[metric]:>10.4f} -> {result[metric]:>10.4f} "
+                  f"{change:+7.1%}{'  REGRESSION' if slower else ''}", file=sys.stderr)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1k,10k,100k', help="comma-separated; 1k/10k/100k/1m or row counts")
+    parser.add_argument('--samples', type=int, default=200, help="calls per per-call step")
+    parser.add_argument('--cards', type=int, default=20, help="ID cards to generate per size")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--memory', action='store_true', help="in-memory databases (no disk I/O)")
+    parser.add_argument('--photos', action='store_true', help="give students synthetic photos (needs Pillow)")
+    parser.add_argument('-o', '--output', default='-', help="JSON report file, or - for stdout")
+    parser.add_argument('--baseline', help="earlier report to compare with")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed slowdown before failing (0.25 = 25%%)")
+    parser.add_argument('--keep', action='store_true', help="keep the working directory")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='hostel-suite-')
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'machine': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'memory': args.memory,
+        'seed': args.seed,
+        'samples': args.samples,
+        'sizes': {},
+    }
+    try:
+        photo_paths = make_photos(os.path.join(workdir, 'photos'), seed=args.seed) if args.photos else ()
+        for count in (parse_size(size) for size in args.sizes.split(',')):
+            report['sizes'][str(count)] = run_size(count, args, workdir, photo_paths)
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    text = json.dumps(report, indent=1)
+    if args.output == '-':
+        print(text)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print(f"FAIL: {len(regressions)} step(s) slower than the baseline by more than "
+                  f"{args.tolerance:.0%}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
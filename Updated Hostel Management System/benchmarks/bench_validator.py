@@ -0,0 +1,66 @@
+"""Throughput benchmark for Validator.validate_batch.
+
+Usage: python benchmarks/bench_validator.py [--rows N] [--min-rate R]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from validator import Validator  # noqa: E402
+
+
+def make_rows(count, invalid_ratio=0.05, seed=42):
+    rng = random.Random(seed)
+    first_names = ['Ali', 'Sana', 'Ahmed', 'Fatima', 'Usman', 'Ayesha', 'Bilal', 'Hina']
+    last_names = ['Khan', 'Ahmed', 'Malik', 'Hussain', 'Raza', 'Iqbal', 'Sheikh', 'Butt']
+    departments = ['COMPUTER SCIENCE', 'ELECTRICAL ENGINEERING', 'MATHEMATICS', 'PHYSICS']
+    rows = []
+    for i in range(count):
+        row = {
+            'registration_no': f"{rng.choice(['CS', 'EE', 'MTH'])}{2023000 + i}",
+            'first_name': rng.choice(first_names),
+            'last_name': rng.choice(last_names),
+            'father_name': f"{rng.choice(first_names)} {rng.choice(last_names)}",
+            'department': rng.choice(departments),
+            'room_no': f"{rng.choice('ABCD')}{rng.randint(100, 450)}",
+            'phone': f"03{rng.randint(0, 499999999):09d}",
+            'email': f"student{i}@example.com" if rng.random() < 0.7 else '',
+            'join_date': f"2023-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        }
+        if rng.random() < invalid_ratio:
+            row[rng.choice(list(row))] = '!!'
+        rows.append(row)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--min-rate', type=float, default=100000,
+                        help="fail (exit 1) if the best rate is below this many rows/second")
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    best = None
+    failures = {}
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        failures = Validator.validate_batch(rows)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    rate = args.rows / best
+    print(f"rows={args.rows} invalid={len(failures)} best={best:.3f}s rate={rate:,.0f} rows/s")
+    if rate < args.min_rate:
+        print(f"FAIL: below {args.min_rate:,.0f} rows/s")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""Load generator for the gate log: N gate processes scanning against one SQLite file.
+
+Usage: python benchmarks/load_gate.py [--gates 4] [--rate 50] [--seconds 10] [--batch-size 200]
+
+Each gate is a separate process with its own Database and GateRecorder
+and scans random students at Poisson-distributed intervals (--rate scans
+per second per gate; --rate 0 scans flat out). Reports scan() latency,
+committed events per second and batches, then checks that every scan
+reached gate_events and that gate_presence matches the simulated state.
+Run with --batch-size 1 --flush-interval 0 to compare with unbuffered writes.
+"""
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+from database import Database  # noqa: E402
+from gate import GateRecorder  # noqa: E402
+
+
+def make_student(reg_no):
+    return {
+        'registration_no': reg_no, 'first_name': 'Gate', 'last_name': 'Test',
+        'father_name': 'Load Test', 'department': 'CS', 'room_no': 'A101',
+        'phone': '03001234567', 'email': '', 'address': '', 'photo_path': '',
+        'join_date': '2024-09-01', 'expiry_date': '2030-09-01',
+    }
+
+
+def gate(workdir, gate_no, gates, students, rate, seconds, batch_size, flush_interval):
+    rng = random.Random(gate_no)
+    db = Database(config=Config(data_root=workdir))
+    # Each gate owns a disjoint slice of students so the expected final state is known
+    mine = [f"GT{i:06d}" for i in range(gate_no, students, gates)]
+    recorder = GateRecorder(db, gate=f"G{gate_no}", batch_size=batch_size, flush_interval=flush_interval)
+    latencies = []
+    inside = set()
+    deadline = time.perf_counter() + seconds
+    with contextlib.redirect_stdout(io.StringIO()):
+        while time.perf_counter() < deadline:
+            if rate:
+                time.sleep(rng.expovariate(rate))
+            reg_no = rng.choice(mine)
+            t0 = time.perf_counter()
+            _, direction = recorder.scan(f"UNIVERSITY HOSTEL ID\nReg No: {reg_no}\n")
+            latencies.append(time.perf_counter() - t0)
+            (inside.add if direction == 'IN' else inside.discard)(reg_no)
+        t0 = time.perf_counter()
+        recorder.close()
+        drain = time.perf_counter() - t0
+    return {'scans': len(latencies), 'recorded': recorder.recorded, 'batches': recorder.batches,
+            'failed_flushes': recorder.failed_flushes, 'retries': db.write_retries,
+            'latencies': latencies, 'inside': sorted(inside), 'drain': drain}
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] if values else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--gates', type=int, default=4)
+    parser.add_argument('--rate', type=float, default=50, help="scans per second per gate (0 = flat out)")
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--students', type=int, default=5000)
+    parser.add_argument('--batch-size', type=int, default=200)
+    parser.add_argument('--flush-interval', type=float, default=0.5)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='hostel-gate-')
+    db = Database(config=Config(data_root=workdir))
+    db.add_students([make_student(f"GT{i:06d}") for i in range(args.students)])
+
+    started = time.perf_counter()
+    with multiprocessing.Pool(args.gates) as pool:
+        results = pool.starmap(gate, [(workdir, n, args.gates, args.students, args.rate, args.seconds,
+                                       args.batch_size, args.flush_interval) for n in range(args.gates)])
+    elapsed = time.perf_counter() - started
+
+    scans = sum(r['scans'] for r in results)
+    recorded = sum(r['recorded'] for r in results)
+    latencies = [latency for r in results for latency in r['latencies']]
+    expected_inside = sorted(reg_no for r in results for reg_no in r['inside'])
+    conn = db.connect()
+    stored = conn.execute("SELECT COUNT(*) FROM gate_events").fetchone()[0]
+    conn.close()
+    actual_inside = sorted(row[0] for row in db.get_inside())
+
+    print(f"gates={args.gates} rate={args.rate:g}/s/gate seconds={args.seconds:g} "
+          f"batch_size={args.batch_size} flush_interval={args.flush_interval:g}")
+    print(f"scans={scans} ({scans / args.seconds * 60:.0f}/min) committed={stored} "
+          f"({stored / elapsed:.0f}/s incl. drain)")
+    print(f"scan latency p50={percentile(latencies, 50) * 1e6:.0f}us "
+          f"p99={percentile(latencies, 99) * 1e6:.0f}us max={max(latencies) * 1e3:.1f}ms")
+    print(f"batches={sum(r['batches'] for r in results)} "
+          f"failed_flushes={sum(r['failed_flushes'] for r in results)} "
+          f"lock_retries={sum(r['retries'] for r in results)} "
+          f"max_drain={max(r['drain'] for r in results) * 1e3:.0f}ms")
+    ok = stored == scans == recorded and actual_inside == expected_inside
+    print(f"inside_now={len(actual_inside)} consistent={'yes' if ok else 'NO'}")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""Load test for server.py: N simulated desks against one server on this machine.
+
+Usage: python benchmarks/load_test_server.py [--desks 1,2,4,8] [--seconds 5] [--seed-rows 10000]
+
+Each desk is a separate process with its own RemoteDatabase and runs a mix
+of 70% searches, 20% lookups and 10% registrations.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+from client import RemoteDatabase  # noqa: E402
+
+
+def make_student(reg_no, rng):
+    return {
+        'registration_no': reg_no,
+        'first_name': rng.choice(['Ali', 'Sana', 'Ahmed', 'Fatima', 'Usman', 'Ayesha']),
+        'last_name': rng.choice(['Khan', 'Ahmed', 'Malik', 'Hussain', 'Raza']),
+        'father_name': 'Farooq Ahmed',
+        'department': rng.choice(['CS', 'EE', 'ME', 'MATH']),
+        'room_no': f"{rng.choice('ABCD')}{rng.randint(100, 450)}",
+        'phone': f"03{rng.randint(0, 499999999):09d}",
+        'email': '',
+        'address': '',
+        'photo_path': '',
+        'join_date': '2024-09-01',
+        'expiry_date': '2025-09-01',
+    }
+
+
+def desk(url, desk_no, seconds, seed_rows):
+    rng = random.Random(desk_no)
+    db = RemoteDatabase(url)
+    latencies = {'search': [], 'lookup': [], 'register': []}
+    deadline = time.perf_counter() + seconds
+    counter = 0
+    while time.perf_counter() < deadline:
+        roll = rng.random()
+        start = time.perf_counter()
+        if roll < 0.7:
+            db.search_students(rng.choice(['ali', 'sa', 'kh', 'cs', 'a1', 'ee']), 200)
+            kind = 'search'
+        elif roll < 0.9:
+            db.get_student(f"LT{rng.randrange(seed_rows):07d}")
+            kind = 'lookup'
+        else:
+            counter += 1
+            db.add_student(make_student(f"D{desk_no:02d}{counter:06d}", rng))
+            kind = 'register'
+        latencies[kind].append(time.perf_counter() - start)
+    return latencies
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--desks', default='1,2,4,8')
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--seed-rows', type=int, default=10000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='hostel-load-')
+    server = subprocess.Popen([sys.executable, os.path.join(APP_DIR, 'server.py'), '--port', '0'],
+                              cwd=workdir, stdout=subprocess.PIPE, text=True)
+    try:
+        url = server.stdout.readline().split()[-1]
+        rng = random.Random(0)
+        inserted, _ = RemoteDatabase(url).add_students(
+            [make_student(f"LT{i:07d}", rng) for i in range(args.seed_rows)])
+        print(f"server {url}, seeded {inserted} students in {workdir}")
+
+        print(f"{'desks':>5} {'ops/s':>9} {'search p50/p95 ms':>19} {'lookup p50/p95 ms':>19} "
+              f"{'register p50/p95 ms':>21}")
+        for desks in (int(n) for n in args.desks.split(',')):
+            with multiprocessing.Pool(desks) as pool:
+                results = pool.starmap(desk, [(url, n, args.seconds, args.seed_rows) for n in range(desks)])
+            merged = {kind: [v for r in results for v in r[kind]] for kind in results[0]}
+            total = sum(len(v) for v in merged.values())
+            cols = [f"{percentile(merged[k], 0.5) * 1000:.1f}/{percentile(merged[k], 0.95) * 1000:.1f}"
+                    for k in ('search', 'lookup', 'register')]
+            print(f"{desks:>5} {total / args.seconds:>9.0f} {cols[0]:>19} {cols[1]:>19} {cols[2]:>21}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == '__main__':
+    main()
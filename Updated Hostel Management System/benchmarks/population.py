@@ -0,0 +1,203 @@
+"""Synthetic student population for benchmarks and load tests.
+
+Usage: python benchmarks/population.py --rows 100k [-o students.jsonl] [--photos DIR]
+
+Students are deterministic for a --seed and pass Validator, so the output
+imports with `cli.py import`. Registration numbers follow department and
+intake year, departments and surnames are skewed the way real intakes
+are, about 1% of students share a phone and father's name with a
+"sibling" (work for the duplicate detector), and rooms are filled in
+order so no room is over capacity. --photos writes a small pool of
+synthetic JPEG portraits (needs Pillow) that students share.
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+# Named sizes accepted wherever a row count is
+SIZES = {'1k': 1000, '10k': 10000, '100k': 100000, '1m': 1000000}
+
+# (code, name, weight): larger departments get proportionally more students
+DEPARTMENTS = [
+    ('CS', 'COMPUTER SCIENCE', 18), ('EE', 'ELECTRICAL ENGINEERING', 14),
+    ('ME', 'MECHANICAL ENGINEERING', 12), ('CE', 'CIVIL ENGINEERING', 10),
+    ('BBA', 'BUSINESS ADMINISTRATION', 12), ('ECO', 'ECONOMICS', 6),
+    ('MTH', 'MATHEMATICS', 6), ('PHY', 'PHYSICS', 5), ('CHM', 'CHEMISTRY', 5),
+    ('ENG', 'ENGLISH', 4), ('BIO', 'BIOLOGY', 5), ('ARC', 'ARCHITECTURE', 3),
+]
+MALE_NAMES = ['Ali', 'Ahmed', 'Muhammad', 'Usman', 'Bilal', 'Hassan', 'Hamza', 'Umar', 'Zain', 'Saad',
+              'Fahad', 'Imran', 'Kamran', 'Danish', 'Faisal', 'Haris', 'Junaid', 'Owais', 'Talha', 'Waqas',
+              'Asad', 'Shahzaib', 'Rehan', 'Adeel', 'Noman', 'Yasir', 'Arsalan', 'Salman', 'Tariq', 'Zubair']
+FEMALE_NAMES = ['Ayesha', 'Fatima', 'Sana', 'Hina', 'Maryam', 'Zainab', 'Amna', 'Iqra', 'Mahnoor', 'Sara',
+                'Noor', 'Rabia', 'Sadia', 'Khadija', 'Aiman', 'Hira', 'Laiba', 'Mehwish', 'Nida', 'Rida',
+                'Saba', 'Sidra', 'Tooba', 'Uzma', 'Warda', 'Areeba', 'Eman', 'Hafsa', 'Kiran', 'Alina']
+# Ordered roughly by frequency; weights fall off as 1/rank
+LAST_NAMES = ['Khan', 'Ahmed', 'Ali', 'Malik', 'Hussain', 'Shah', 'Iqbal', 'Raza', 'Qureshi', 'Sheikh',
+              'Butt', 'Chaudhry', 'Siddiqui', 'Mirza', 'Abbasi', 'Javed', 'Rana', 'Bhatti', 'Akhtar', 'Aslam',
+              'Anwar', 'Baig', 'Hashmi', 'Jamil', 'Kazmi', 'Latif', 'Memon', 'Nawaz', 'Rashid', 'Rizvi',
+              'Saleem', 'Tahir', 'Usmani', 'Waheed', 'Yousaf', 'Zaidi', 'Gillani', 'Dar', 'Niazi', 'Awan']
+CITIES = ['Karachi', 'Lahore', 'Islamabad', 'Rawalpindi', 'Faisalabad', 'Multan', 'Peshawar', 'Quetta',
+          'Hyderabad', 'Sialkot', 'Gujranwala', 'Abbottabad']
+
+# Room layout: blocks of FLOORS x ROOMS_PER_FLOOR rooms, ROOM_CAPACITY beds each
+FLOORS = 5
+ROOMS_PER_FLOOR = 40
+ROOM_CAPACITY = 3
+
+# Distinct portraits written with --photos; students share them round-robin
+PHOTO_POOL = 50
+
+
+def parse_size(text):
+    """'10k', '1m' or a plain integer"""
+    text = text.strip().lower()
+    return SIZES[text] if text in SIZES else int(text)
+
+
+def block_name(i):
+    """A..Z, then A1..Z1, A2..."""
+    return chr(ord('A') + i % 26) + (str(i // 26) if i >= 26 else '')
+
+
+def bed_room(gender, bed):
+    """(block, floor, number) of the bed-th bed given to a gender: even blocks men, odd women"""
+    room, _ = divmod(bed, ROOM_CAPACITY)
+    block, rest = divmod(room, FLOORS * ROOMS_PER_FLOOR)
+    floor, number = divmod(rest, ROOMS_PER_FLOOR)
+    return 2 * block + (gender == 'F'), floor + 1, number + 1
+
+
+def room_name(block, floor, number):
+    return f"{block_name(block)}-{floor}{number:02d}"
+
+
+def room_layout(men, women):
+    """add_rooms dicts for every room generate_students fills with this many men and women"""
+    rooms = []
+    for gender, count in (('M', men), ('F', women)):
+        for bed in range(0, count, ROOM_CAPACITY):
+            block, floor, number = bed_room(gender, bed)
+            rooms.append({'room_no': room_name(block, floor, number), 'block': block_name(block),
+                          'floor': floor, 'capacity': ROOM_CAPACITY, 'gender': gender})
+    return rooms
+
+
+def generate_students(count, seed=42, photo_paths=(), today=None):
+    """Yield `count` valid student dicts (STUDENT_COLUMNS plus gender, year, preferred_block)"""
+    rng = random.Random(seed)
+    today = today or date.today()
+    # Intakes join in September; the latest one is this year's once September has come
+    latest = today.year if today >= date(today.year, 9, 1) else today.year - 1
+    years = [latest - offset for offset in range(5)]
+    codes, names, weights = zip(*DEPARTMENTS)
+    surname_weights = [1 / rank for rank in range(1, len(LAST_NAMES) + 1)]
+    beds = {'M': 0, 'F': 0}
+    sequence = {}
+    previous = None
+
+    for i in range(count):
+        department = rng.choices(range(len(codes)), weights)[0]
+        year = rng.choice(years)
+        key = (codes[department], year)
+        sequence[key] = sequence.get(key, 0) + 1
+        gender = 'M' if rng.random() < 0.55 else 'F'
+        first_name = rng.choice(MALE_NAMES if gender == 'M' else FEMALE_NAMES)
+        last_name = rng.choices(LAST_NAMES, surname_weights)[0]
+        father_name = f"{rng.choice(MALE_NAMES)} {last_name}"
+        phone = f"03{rng.randint(0, 499999999):09d}"
+        if previous and rng.random() < 0.01:
+            # A sibling: same family, same phone
+            last_name = previous['last_name']
+            father_name = previous['father_name']
+            phone = previous['phone']
+        join_date = date(year, 9, 1) + timedelta(days=rng.randint(0, 30))
+        student = {
+            'registration_no': f"{codes[department]}{year % 100:02d}{sequence[key]:06d}",
+            'first_name': first_name,
+            'last_name': last_name,
+            'father_name': father_name,
+            'department': names[department],
+            'room_no': room_name(*bed_room(gender, beds[gender])),
+            'phone': phone,
+            'email': f"{first_name}.{last_name}{i}@students.example.edu".lower() if rng.random() < 0.8 else '',
+            'address': f"House {rng.randint(1, 999)}, {rng.choice(CITIES)}",
+            'photo_path': photo_paths[i % len(photo_paths)] if photo_paths else '',
+            'join_date': join_date.isoformat(),
+            # Renewed yearly to the next September; about 5% of older students have lapsed
+            'expiry_date': (date(latest + 1 - (year < latest and rng.random() < 0.05), 9, 1)
+                            + timedelta(days=rng.randint(0, 30))).isoformat(),
+            'gender': gender,
+            'year': str(latest - year + 1),
+            'preferred_block': '',
+        }
+        beds[gender] += 1
+        previous = student
+        yield student
+
+
+def make_photos(directory, count=PHOTO_POOL, seed=42):
+    """Write `count` synthetic 150x180 JPEG portraits; returns their paths"""
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(count):
+        background = tuple(rng.randint(150, 230) for _ in range(3))
+        skin = tuple(rng.randint(120, 220) for _ in range(3))
+        img = Image.new('RGB', (150, 180), background)
+        draw = ImageDraw.Draw(img)
+        draw.ellipse((45, 30, 105, 100), fill=skin)
+        draw.rectangle((30, 110, 120, 180), fill=tuple(rng.randint(20, 120) for _ in range(3)))
+        path = os.path.join(directory, f"synthetic_{i:03d}.jpg")
+        img.save(path, quality=85)
+        paths.append(path)
+    return paths
+
+
+def write_students(students, out, fmt):
+    writer = None
+    count = 0
+    for student in students:
+        if fmt == 'csv':
+            if writer is None:
+                writer = csv.DictWriter(out, list(student))
+                writer.writeheader()
+            writer.writerow(student)
+        else:
+            out.write(json.dumps(student) + '\n')
+        count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', default='10k', help="row count or 1k/10k/100k/1m")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--format', choices=('csv', 'jsonl'), default='jsonl')
+    parser.add_argument('-o', '--output', default='-', help="output file, or - for stdout")
+    parser.add_argument('--photos', metavar='DIR', help="write a pool of synthetic photos here")
+    args = parser.parse_args()
+
+    photo_paths = make_photos(args.photos, seed=args.seed) if args.photos else ()
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', newline='', encoding='utf-8')
+    try:
+        count = write_students(generate_students(parse_size(args.rows), args.seed, photo_paths),
+                               out, args.format)
+    except BrokenPipeError:
+        # Downstream closed the pipe (e.g. `| head`); not an error
+        sys.stderr.close()
+        return 0
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"wrote {count} students", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""Multi-process write stress test for Database against one SQLite file.
+
+Usage: python benchmarks/stress_concurrency.py [--procs 4] [--seconds 5] [--hot-rows 20]
+
+Each process registers new students and applies optimistic updates to a
+small shared "hot" set of rows, then reports throughput, version
+conflicts, retried lock waits and writes that failed outright.
+"""
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+from database import Database, ConcurrencyError  # noqa: E402
+
+
+def make_student(reg_no):
+    return {
+        'registration_no': reg_no, 'first_name': 'Stress', 'last_name': 'Test',
+        'father_name': 'Load Test', 'department': 'CS', 'room_no': 'A101',
+        'phone': '03001234567', 'email': '', 'address': '', 'photo_path': '',
+        'join_date': '2024-09-01', 'expiry_date': '2025-09-01',
+    }
+
+
+def worker(workdir, proc_no, seconds, hot_rows):
+    rng = random.Random(proc_no)
+    db = Database(config=Config(data_root=workdir))
+    stats = {'inserts': 0, 'updates': 0, 'conflicts': 0, 'failed': 0}
+    deadline = time.perf_counter() + seconds
+    counter = 0
+    # Database reports failed writes on stdout; keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        while time.perf_counter() < deadline:
+            if rng.random() < 0.5:
+                counter += 1
+                ok = db.add_student(make_student(f"SP{proc_no:02d}{counter:06d}"))
+                stats['inserts' if ok else 'failed'] += 1
+            else:
+                reg_no = f"HOT{rng.randrange(hot_rows):04d}"
+                record = db.get_student_record(reg_no)
+                try:
+                    ok = db.update_student(reg_no, {'room_no': f"B{rng.randint(100, 450)}"},
+                                           expected_version=record['version'])
+                    stats['updates' if ok else 'failed'] += 1
+                except ConcurrencyError:
+                    stats['conflicts'] += 1
+    stats['retries'] = db.write_retries
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--procs', default='1,2,4,8', help="comma-separated process counts")
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--hot-rows', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'procs':>5} {'writes/s':>9} {'inserts':>8} {'updates':>8} {'conflicts':>9} "
+          f"{'conflict%':>9} {'retries':>8} {'failed':>7}")
+    for procs in (int(n) for n in args.procs.split(',')):
+        workdir = tempfile.mkdtemp(prefix='hostel-stress-')
+        Database(config=Config(data_root=workdir)).add_students([make_student(f"HOT{i:04d}") for i in range(args.hot_rows)])
+
+        with multiprocessing.Pool(procs) as pool:
+            results = pool.starmap(worker, [(workdir, n, args.seconds, args.hot_rows) for n in range(procs)])
+        total = {key: sum(r[key] for r in results) for key in results[0]}
+        attempted_updates = total['updates'] + total['conflicts']
+        conflict_pct = 100.0 * total['conflicts'] / attempted_updates if attempted_updates else 0.0
+        writes = total['inserts'] + total['updates']
+        print(f"{procs:>5} {writes / args.seconds:>9.0f} {total['inserts']:>8} {total['updates']:>8} "
+              f"{total['conflicts']:>9} {conflict_pct:>8.1f}% {total['retries']:>8} {total['failed']:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+import os
+import queue
+import threading
+
+from database import STUDENT_COLUMNS
+
+
+def card_generator(config):
+    # fpdf/qrcode are only imported once the first card is actually built
+    from id_card import IDCardGenerator
+    return IDCardGenerator(config).generate
+
+
+class CardRegenerationQueue:
+    """Regenerates ID card PDFs on background threads after bulk changes.
+
+    A student already waiting in the queue is not queued twice, and each
+    job reads the student when it runs, so the card always shows the
+    latest expiry date even if the row changed again meanwhile.
+
+    Each worker thread builds its own generator (make_generate(db.config))
+    when it picks up its first job, so the database's assets are used and
+    the artwork setup is paid once per thread, not once per card.
+    """
+
+    def __init__(self, db, output_dir=None, workers=2, make_generate=card_generator):
+        self.db = db
+        self.output_dir = output_dir or db.config.id_cards_dir
+        self.make_generate = make_generate
+        self.jobs = queue.Queue()
+        self.pending = set()
+        self.lock = threading.Lock()
+        self.done = 0
+        self.failed = []
+        self.threads = [threading.Thread(target=self.run, daemon=True) for _ in range(workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def put(self, reg_nos):
+        """Queue students for regeneration; returns how many were newly queued"""
+        queued = 0
+        with self.lock:
+            for reg_no in reg_nos:
+                if reg_no not in self.pending:
+                    self.pending.add(reg_no)
+                    self.jobs.put(reg_no)
+                    queued += 1
+        return queued
+
+    def pending_count(self):
+        with self.lock:
+            return len(self.pending)
+
+    def run(self):
+        generate = None
+        while True:
+            reg_no = self.jobs.get()
+            if reg_no is None:
+                self.jobs.task_done()
+                return
+            with self.lock:
+                self.pending.discard(reg_no)
+            try:
+                generate = generate or self.make_generate(self.db.config)
+                self.regenerate(reg_no, generate)
+            except Exception as e:
+                self.failed.append(reg_no)
+                print("Card Error:", reg_no, e)  # Debugging
+            finally:
+                self.jobs.task_done()
+
+    def regenerate(self, reg_no, generate):
+        student = self.db.get_student(reg_no)
+        if student is None:
+            return
+        os.makedirs(self.output_dir, exist_ok=True)
+        output_path = os.path.join(self.output_dir, f"{reg_no}_id_card.pdf")
+        if generate(dict(zip(STUDENT_COLUMNS, student)), output_path) is False:
+            self.failed.append(reg_no)
+        else:
+            with self.lock:
+                self.done += 1
+
+    def join(self):
+        """Block until every queued card has been processed"""
+        self.jobs.join()
+
+    def stop(self):
+        for _ in self.threads:
+            self.jobs.put(None)
+        for thread in self.threads:
+            thread.join()
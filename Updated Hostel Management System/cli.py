@@ -0,0 +1,699 @@
+"""Headless command-line interface for batch jobs.
+
+Examples:
+    python cli.py import students.csv
+    python cli.py export --format jsonl > students.jsonl
+    python cli.py export -o cs.csv.gz --columns registration_no,first_name --filter department=CS
+    python cli.py search "ali kh"
+    python cli.py generate-cards --all --jobs 4
+    python cli.py stats
+    python cli.py allocate intake.csv --dry-run
+    python cli.py post-fees --term 2025-FALL --amount 15000
+    python cli.py meal-counts
+    python cli.py gate-scan --gate NORTH < /dev/ttyACM0
+    python cli.py renew --department CS --expiring-within 30
+    python cli.py archive --grace-days 90
+    python cli.py --hostel NORTH stats
+    python cli.py search --all-hostels "ali kh"
+    python cli.py move-student 2021-CS-045 SOUTH
+    python cli.py --trace traces/ --slow-ms 20 export -o students.csv
+
+Nothing here imports tkinter, so it runs on servers without a display.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime, timedelta
+
+from config import Config
+from database import Database, STUDENT_COLUMNS, RECORD_FILTERS, MEALS
+from exporter import EXPORT_FORMATS, export_students
+from partitions import HostelFederation, open_hostel
+import tracing
+from validator import Validator
+
+# Rows validated and inserted per transaction during import
+IMPORT_BATCH_SIZE = 1000
+
+# generate-cards keeps this many jobs per worker process in flight
+CARD_JOBS_PER_WORKER = 2
+
+
+def read_rows(path, fmt):
+    """Yield dict rows from a CSV or JSONL file ('-' reads stdin)"""
+    stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+    try:
+        if fmt == 'csv':
+            yield from csv.DictReader(stream)
+        else:
+            for line in stream:
+                if line.strip():
+                    yield json.loads(line)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def prepare_student(row):
+    """Apply the same clean-up as the registration form"""
+    join_date = row['join_date'].strip()
+    return {
+        'registration_no': row['registration_no'].strip().upper(),
+        'first_name': row['first_name'].strip().title(),
+        'last_name': row['last_name'].strip().title(),
+        'father_name': row['father_name'].strip().title(),
+        'department': row['department'].strip().upper(),
+        'room_no': row['room_no'].strip().upper(),
+        'phone': row['phone'].strip(),
+        'email': (row.get('email') or '').strip(),
+        'address': (row.get('address') or '').strip(),
+        'photo_path': (row.get('photo_path') or '').strip(),
+        'join_date': join_date,
+        'expiry_date': (row.get('expiry_date') or '').strip() or
+                       (datetime.strptime(join_date, '%Y-%m-%d') + timedelta(days=365)).strftime('%Y-%m-%d'),
+    }
+
+
+def cmd_import(db, args):
+    inserted = rejected = 0
+    batch = []
+    line_no = 0
+
+    def flush():
+        nonlocal inserted, rejected
+        failures = Validator.validate_batch(row for _, row in batch)
+        students = [prepare_student(row) for i, (_, row) in enumerate(batch) if i not in failures]
+        for i, errors in failures.items():
+            details = ", ".join(f"{field}={code}" for field, code in errors.items())
+            print(f"line {batch[i][0]}: rejected ({details})", file=sys.stderr)
+        rejected += len(failures)
+        if args.dry_run:
+            inserted += len(students)
+        else:
+            count, db_failures = db.add_students(students)
+            inserted += count
+            rejected += len(db_failures)
+            for reg_no, error in db_failures:
+                print(f"{reg_no}: rejected ({error})", file=sys.stderr)
+        batch.clear()
+
+    for row in read_rows(args.file, args.format):
+        line_no += 1
+        batch.append((line_no, row))
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            flush()
+    if batch:
+        flush()
+
+    print(f"{'validated' if args.dry_run else 'imported'} {inserted}, rejected {rejected}")
+    return 0 if not rejected else 1
+
+
+def parse_filters(specs):
+    filters = {}
+    for spec in specs:
+        name, sep, value = spec.partition('=')
+        if not sep or name not in RECORD_FILTERS:
+            raise SystemExit(f"invalid --filter {spec!r}; expected NAME=VALUE with NAME in: "
+                             f"{', '.join(RECORD_FILTERS)}")
+        filters[name] = value
+    return filters
+
+
+def cmd_export(db, args):
+    columns = args.columns.split(',') if args.columns else None
+    if columns is None and isinstance(db, HostelFederation):
+        columns = ('hostel',) + STUDENT_COLUMNS
+    count = export_students(db, args.output, args.format, columns=columns,
+                            filters=parse_filters(args.filter),
+                            compress=True if args.gzip else None)
+    print(f"exported {count}", file=sys.stderr)
+    return 0
+
+
+def cmd_search(db, args):
+    if isinstance(db, HostelFederation):
+        for hostel, reg_no, first_name, last_name, department, room_no in db.search_students(args.term, args.limit):
+            print(f"{hostel}\t{reg_no}\t{first_name} {last_name}\t{department}\t{room_no}")
+        return 0
+    rows = db.search_students(args.term, args.limit, include_archive=args.include_archive)
+    for reg_no, first_name, last_name, department, room_no in rows:
+        print(f"{reg_no}\t{first_name} {last_name}\t{department}\t{room_no}")
+    return 0
+
+
+# Set once per generate-cards worker process by init_card_worker
+card_generator = None
+
+
+def init_card_worker(config):
+    # Runs in each worker process; fpdf/qrcode are imported there, not in the parent
+    global card_generator
+    from id_card import IDCardGenerator
+    card_generator = IDCardGenerator(config)
+
+
+def generate_card(student_data, output_path):
+    return card_generator.generate(student_data, output_path)
+
+
+def cmd_generate_cards(db, args):
+    if args.all:
+        records = (dict(zip(STUDENT_COLUMNS, row)) for row in db.iter_student_records())
+    else:
+        records = []
+        for reg_no in args.reg_nos:
+            row = db.get_student(reg_no.strip().upper())
+            if row is None:
+                print(f"{reg_no}: not found", file=sys.stderr)
+            else:
+                records.append(dict(zip(STUDENT_COLUMNS, row)))
+
+    output_dir = args.output_dir or db.config.id_cards_dir
+    os.makedirs(output_dir, exist_ok=True)
+    failed = 0
+
+    def report(done):
+        nonlocal failed
+        for future in done:
+            output_path = pending.pop(future)
+            if future.result():
+                print(output_path, flush=True)
+            else:
+                failed += 1
+                print(f"{output_path}: failed", file=sys.stderr)
+
+    # A bounded window of jobs in flight: records keep streaming and cards are reported as they finish
+    window = max(1, args.jobs) * CARD_JOBS_PER_WORKER
+    with ProcessPoolExecutor(max_workers=args.jobs, initializer=init_card_worker,
+                             initargs=(db.config,)) as pool:
+        pending = {}
+        for student in records:
+            output_path = os.path.join(output_dir, f"{student['registration_no']}_id_card.pdf")
+            pending[pool.submit(generate_card, student, output_path)] = output_path
+            if len(pending) >= window:
+                report(wait(pending, return_when=FIRST_COMPLETED).done)
+        report(wait(pending).done)
+    return 0 if not failed else 1
+
+
+def cmd_stats(db, args):
+    if args.rebuild:
+        for partition in getattr(db, 'partitions', {'': db}).values():
+            partition.run_write(partition.rebuild_stats)
+    soon = (datetime.now() + timedelta(days=args.expiring_days)).strftime('%Y-%m-%d')
+    stats = db.get_stats()
+    print(f"total\t{stats['students']}")
+    print(f"expiring_within_{args.expiring_days}_days\t{db.count_expiring(soon)}")
+    print(f"expiring_in_{stats['month']}\t{stats['expiring_this_month']}")
+    for hostel, count in stats.get('hostels', ()):
+        print(f"hostel\t{hostel}\t{count}")
+    for department, count in sorted(stats['departments']):
+        print(f"department\t{department}\t{count}")
+    for block, rooms, beds, occupied, free in stats['blocks']:
+        print(f"block\t{block or '-'}\trooms={rooms}\tbeds={beds}\toccupied={occupied}\tfree={free}")
+    return 0
+
+
+def cmd_duplicates(db, args):
+    from duplicates import DuplicateDetector
+
+    for score, reg_a, reg_b in DuplicateDetector(db, threshold=args.threshold).report():
+        print(f"{score:.3f}\t{reg_a}\t{reg_b}")
+    return 0
+
+
+def cmd_backup(db, args):
+    from backup import BackupManager
+
+    try:
+        manager = BackupManager(db, backup_dir=args.backup_dir, keep=args.keep, compress=not args.no_compress)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    if args.verify:
+        failed = 0
+        for manifest in manager.list_manifests():
+            problems = manager.verify_snapshot(manifest)
+            failed += bool(problems)
+            print(f"{manifest['name']}\t{'ok' if not problems else '; '.join(problems)}")
+        return 0 if not failed else 1
+
+    manifest = manager.create_snapshot()
+    print(f"{manifest['database']}\tstudents={manifest['students']}\tphotos={len(manifest['photos'])}")
+    return 0
+
+
+def cmd_import_rooms(db, args):
+    rooms = list(read_rows(args.file, args.format))
+    print(f"imported {db.add_rooms(rooms)} rooms")
+    return 0
+
+
+def cmd_vacancies(db, args):
+    if args.summary:
+        for block, rooms, beds, free in db.get_block_vacancy():
+            print(f"{block or '-'}\trooms={rooms}\tbeds={beds}\tfree={free}")
+        return 0
+    for room_no, block, floor, capacity, occupied in db.get_vacancies(args.block, args.limit):
+        print(f"{room_no}\t{block or '-'}\tfloor {floor}\t{capacity - occupied} of {capacity} free")
+    return 0
+
+
+def cmd_allocate(db, args):
+    """Plan (and commit) rooms for an intake of already-registered students.
+
+    room_no is NOT NULL, so there is no "unassigned" value: a student
+    counts as unassigned when their room_no is not a room in the rooms
+    table (a placeholder such as 'TBD' typed at registration). Students
+    already in a registered room are reported and left where they are.
+    """
+    from allocation import RoomAllocator
+
+    students = []
+    unplaced = []
+    for row in read_rows(args.file, args.format):
+        reg_no = row['registration_no'].strip().upper()
+        record = db.get_student(reg_no)
+        if record is None:
+            unplaced.append((reg_no, "not registered"))
+        elif db.get_room(record[5]) is not None:
+            unplaced.append((reg_no, f"already in room {record[5]}"))
+        else:
+            students.append(dict(row, registration_no=reg_no, department=row.get('department') or record[4]))
+
+    allocator = RoomAllocator(db)
+    assignments, not_placed, report = allocator.plan(students)
+    for reg_no, room_no in sorted(assignments.items()):
+        print(f"{reg_no}\t{room_no}")
+    for reg_no, reason in unplaced + not_placed:
+        print(f"{reg_no}: unplaced ({reason})", file=sys.stderr)
+    report['unplaced'] += len(unplaced)
+    print(" ".join(f"{key}={value}" for key, value in report.items()), file=sys.stderr)
+
+    if not args.dry_run and assignments:
+        moved = allocator.commit(assignments)
+        print(f"committed {moved}", file=sys.stderr)
+        if not moved:
+            return 1
+    return 0 if not report['unplaced'] else 1
+
+
+def cmd_gate_scan(db, args):
+    """Record one scan per stdin line (a USB QR scanner types the card payload)"""
+    from gate import GateRecorder
+
+    recorder = GateRecorder(db, gate=args.gate)
+    payload = []
+    try:
+        for line in sys.stdin:
+            # Card payloads span several lines; a blank line or a bare reg no ends one
+            if line.strip():
+                payload.append(line)
+                if 'Reg No:' in line or len(payload) == 1 and len(line.split()) == 1:
+                    result = recorder.scan(''.join(payload), args.direction)
+                    payload = []
+                    print(f"{result[0]}\t{result[1]}" if result else "unknown card", flush=True)
+            else:
+                payload = []
+    except KeyboardInterrupt:
+        pass
+    finally:
+        recorder.close()
+    print(f"recorded {recorder.recorded}, rejected {recorder.rejected}", file=sys.stderr)
+    return 0
+
+
+def cmd_inside(db, args):
+    if args.count:
+        print(db.count_inside())
+        return 0
+    for reg_no, first_name, last_name, room_no, since, gate in db.get_inside(args.limit):
+        print(f"{reg_no}\t{first_name} {last_name}\t{room_no}\t{since}\t{gate}")
+    return 0
+
+
+def cmd_gate_history(db, args):
+    for direction, at, gate in db.get_gate_history(args.reg_no, args.since, args.limit):
+        print(f"{at}\t{direction}\t{gate}")
+    return 0
+
+
+def parse_amount(text):
+    amount = Validator.parse_amount(text)
+    if amount is None:
+        raise SystemExit(f"invalid amount {text!r}; expected e.g. 15000 or 1250.50")
+    return amount
+
+
+def cmd_post_fees(db, args):
+    count = db.post_term_charges(args.term, parse_amount(args.amount), args.description, args.department)
+    print(f"posted {count} charges of {Validator.format_amount(parse_amount(args.amount))} for {args.term}")
+    return 0
+
+
+def cmd_payment(db, args):
+    reg_no = args.reg_no.strip().upper()
+    if args.adjust:
+        entry = (reg_no, 'ADJUSTMENT', parse_amount(args.amount), args.note, None)
+    else:
+        entry = (reg_no, 'PAYMENT', -abs(parse_amount(args.amount)), args.note, None)
+    try:
+        db.post_fee_entries([entry])
+    except ValueError as e:
+        raise SystemExit(str(e))
+    print(f"{reg_no}\tbalance {Validator.format_amount(db.get_balance(reg_no))}")
+    return 0
+
+
+def cmd_debtors(db, args):
+    for reg_no, first_name, last_name, balance in db.get_debtors(parse_amount(args.min), args.limit):
+        print(f"{reg_no}\t{first_name or ''} {last_name or ''}\t{Validator.format_amount(balance)}")
+    return 0
+
+
+def cmd_statement(db, args):
+    for _, posted_at, entry_type, description, term, amount, balance in db.get_statement(args.reg_no, args.limit):
+        print(f"{posted_at}\t{entry_type}\t{description}{' ' + term if term else ''}\t"
+              f"{Validator.format_amount(amount)}\t{Validator.format_amount(balance)}")
+    return 0
+
+
+def cmd_book_meals(db, args):
+    try:
+        count = db.book_default_meals(args.start, args.end, args.meals.split(','), args.department)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    print(f"added {count} bookings from {args.start} to {args.end}")
+    return 0
+
+
+def cmd_meal_opt_out(db, args):
+    try:
+        count = db.set_meal_booking(args.reg_no, args.start, args.end, args.meals.split(','), booked=args.book)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    if not count and db.get_student(args.reg_no.upper()) is None:
+        print(f"{args.reg_no}: not found", file=sys.stderr)
+        return 1
+    print(f"{'booked' if args.book else 'opted out of'} {count} meals")
+    return 0
+
+
+def cmd_meal_counts(db, args):
+    meal_date = args.date or (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
+    totals = dict.fromkeys(MEALS, 0)
+    for block, meal, booked in db.get_meal_counts(meal_date):
+        print(f"{meal_date}\t{block or '-'}\t{meal}\t{booked}")
+        totals[meal] += booked
+    for meal, booked in totals.items():
+        print(f"{meal_date}\tTOTAL\t{meal}\t{booked}")
+    return 0
+
+
+def cmd_expiring(db, args):
+    today = datetime.now().strftime('%Y-%m-%d')
+    until = (datetime.now() + timedelta(days=args.days)).strftime('%Y-%m-%d')
+    for row in db.get_expiring(today, until, args.department, args.limit):
+        student = dict(zip(STUDENT_COLUMNS, row))
+        print(f"{student['expiry_date']}\t{student['registration_no']}\t"
+              f"{student['first_name']} {student['last_name']}\t{student['department']}")
+    return 0
+
+
+def cmd_renew(db, args):
+    from card_queue import CardRegenerationQueue
+
+    expiring_before = None
+    if args.expiring_within is not None:
+        expiring_before = (datetime.now() + timedelta(days=args.expiring_within)).strftime('%Y-%m-%d')
+    reg_nos = [reg_no.strip().upper() for reg_no in args.reg_nos] or None
+    if not (args.department or expiring_before or reg_nos):
+        raise SystemExit("renew needs --department, --expiring-within or registration numbers")
+
+    renewed = db.renew_students(args.days, args.department, expiring_before, reg_nos)
+    print(f"renewed {len(renewed)} students by {args.days} days", file=sys.stderr)
+    if args.no_cards or not renewed:
+        return 0
+
+    cards = CardRegenerationQueue(db, output_dir=args.output_dir, workers=args.jobs)
+    cards.put(renewed)
+    cards.join()
+    cards.stop()
+    print(f"regenerated {cards.done} cards, {len(cards.failed)} failed", file=sys.stderr)
+    return 0 if not cards.failed else 1
+
+
+def cmd_archive(db, args):
+    before = args.before or (datetime.now() - timedelta(days=args.grace_days)).strftime('%Y-%m-%d')
+    count = db.archive_expired(before, args.batch_size)
+    print(f"archived {count} students expired before {before}")
+    return 0
+
+
+def cmd_changes(db, args):
+    """Stream change-log entries after --since as JSONL; last seq goes to stderr"""
+    last_seq = args.since
+    for seq, op, reg_no, columns, changed_at in db.iter_changes(args.since):
+        change = {'seq': seq, 'op': op, 'registration_no': reg_no,
+                  'changed_columns': columns, 'changed_at': changed_at}
+        if args.with_rows and op != 'DELETE':
+            record = db.get_student_record(reg_no)
+            change['row'] = {column: record[column] for column in columns} if record else None
+        sys.stdout.write(json.dumps(change) + '\n')
+        last_seq = seq
+    print(f"last_seq {last_seq}", file=sys.stderr)
+    return 0
+
+
+def cmd_hostels(federation, args):
+    for name in args.create:
+        federation.add_hostel(name)
+    for hostel, count in federation.get_hostel_counts():
+        print(f"{hostel}\t{count}\t{federation.hostel(hostel).db_path}")
+    return 0
+
+
+def cmd_move_student(federation, args):
+    room_no = federation.move_student(args.reg_no, args.to_hostel, args.room)
+    if room_no is None:
+        print(f"{args.reg_no}: not moved", file=sys.stderr)
+        return 1
+    print(f"{args.reg_no.upper()}\t{args.to_hostel.upper()}\t{room_no}")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='cli.py', description="Hostel Management System batch operations")
+    parser.add_argument('--data-dir', help="data root (default: $HOSTEL_DATA_DIR or ./data)")
+    parser.add_argument('--hostel', help="work on one hostel's database (DATA_DIR/hostels/NAME/hostel.db)")
+    parser.add_argument('--trace', metavar='DIR', nargs='?', const='',
+                        help="record timing spans and slow queries; the report goes to stderr and DIR "
+                             "(default DATA_DIR/traces)")
+    parser.add_argument('--slow-ms', type=float, default=tracing.SLOW_QUERY_MS,
+                        help="slow-query log threshold with --trace")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('import', help="import students from CSV or JSONL")
+    p.add_argument('file', help="input file, or - for stdin")
+    p.add_argument('--format', choices=('csv', 'jsonl'), default='csv')
+    p.add_argument('--dry-run', action='store_true', help="validate only")
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser('export', help="stream students to CSV/JSONL")
+    p.add_argument('--format', choices=EXPORT_FORMATS, default='csv')
+    p.add_argument('-o', '--output', default='-', help="output file (.gz compresses), or - for stdout")
+    p.add_argument('--gzip', action='store_true', help="gzip-compress the output")
+    p.add_argument('--columns', help="comma-separated columns (default: all)")
+    p.add_argument('--filter', action='append', default=[], metavar='NAME=VALUE',
+                   help=f"repeatable; NAME is one of: {', '.join(RECORD_FILTERS)}")
+    p.add_argument('--all-hostels', action='store_true', help="every hostel, with a hostel column")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser('search', help="prefix search over reg no, name, department and room")
+    p.add_argument('term')
+    p.add_argument('--limit', type=int, default=50)
+    p.add_argument('--include-archive', action='store_true', help="also search archived students")
+    p.add_argument('--all-hostels', action='store_true', help="search every hostel")
+    p.set_defaults(func=cmd_search)
+
+    p = sub.add_parser('generate-cards', help="generate ID card PDFs")
+    target = p.add_mutually_exclusive_group(required=True)
+    target.add_argument('--all', action='store_true')
+    target.add_argument('reg_nos', nargs='*', default=[])
+    p.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help="worker processes")
+    p.add_argument('--output-dir', help="default: DATA_DIR/id_cards")
+    p.set_defaults(func=cmd_generate_cards)
+
+    p = sub.add_parser('stats', help="student counts")
+    p.add_argument('--expiring-days', type=int, default=30)
+    p.add_argument('--rebuild', action='store_true', help="recompute the summary tables first")
+    p.add_argument('--all-hostels', action='store_true', help="totals over every hostel")
+    p.set_defaults(func=cmd_stats)
+
+    p = sub.add_parser('duplicates', help="report likely duplicate registrations")
+    p.add_argument('--threshold', type=float, default=0.7)
+    p.set_defaults(func=cmd_duplicates)
+
+    p = sub.add_parser('changes', help="stream change-log entries after a sequence number")
+    p.add_argument('--since', type=int, default=0, help="last sequence number already applied")
+    p.add_argument('--with-rows', action='store_true', help="include current values of changed columns")
+    p.set_defaults(func=cmd_changes)
+
+    p = sub.add_parser('import-rooms', help="create/update rooms from CSV or JSONL (room_no,block,floor,capacity)")
+    p.add_argument('file', help="input file, or - for stdin")
+    p.add_argument('--format', choices=('csv', 'jsonl'), default='csv')
+    p.set_defaults(func=cmd_import_rooms)
+
+    p = sub.add_parser('vacancies', help="rooms with free beds")
+    p.add_argument('--block')
+    p.add_argument('--limit', type=int, default=100)
+    p.add_argument('--summary', action='store_true', help="free beds per block instead of rooms")
+    p.set_defaults(func=cmd_vacancies)
+
+    p = sub.add_parser('allocate', help="assign rooms to an intake (registration_no,gender,year,preferred_block); "
+                                        "students whose room_no is not a registered room count as unassigned")
+    p.add_argument('file', help="input file, or - for stdin")
+    p.add_argument('--format', choices=('csv', 'jsonl'), default='csv')
+    p.add_argument('--dry-run', action='store_true', help="print the plan without writing it")
+    p.set_defaults(func=cmd_allocate)
+
+    p = sub.add_parser('gate-scan', help="record gate scans read from stdin (card QR payloads or reg nos)")
+    p.add_argument('--gate', default='MAIN')
+    p.add_argument('--direction', choices=('IN', 'OUT'), help="default: toggle per student")
+    p.set_defaults(func=cmd_gate_scan)
+
+    p = sub.add_parser('inside', help="students inside the hostel now")
+    p.add_argument('--limit', type=int)
+    p.add_argument('--count', action='store_true')
+    p.set_defaults(func=cmd_inside)
+
+    p = sub.add_parser('gate-history', help="one student's gate scans, newest first")
+    p.add_argument('reg_no')
+    p.add_argument('--since', help="YYYY-MM-DD[THH:MM]")
+    p.add_argument('--limit', type=int, default=100)
+    p.set_defaults(func=cmd_gate_history)
+
+    p = sub.add_parser('post-fees', help="charge every student (or a department) for a term")
+    p.add_argument('--term', required=True, help="e.g. 2025-FALL; re-running the same term is a no-op")
+    p.add_argument('--amount', required=True)
+    p.add_argument('--description', default='Hostel fee')
+    p.add_argument('--department')
+    p.set_defaults(func=cmd_post_fees)
+
+    p = sub.add_parser('payment', help="record a payment (or --adjust with a signed amount)")
+    p.add_argument('reg_no')
+    p.add_argument('amount')
+    p.add_argument('--note', default='')
+    p.add_argument('--adjust', action='store_true', help="post an adjustment; positive adds to what is owed")
+    p.set_defaults(func=cmd_payment)
+
+    p = sub.add_parser('debtors', help="students who owe money, largest balance first")
+    p.add_argument('--min', default='0.01', help="smallest balance listed")
+    p.add_argument('--limit', type=int, default=100)
+    p.set_defaults(func=cmd_debtors)
+
+    p = sub.add_parser('statement', help="one student's fee ledger, newest first")
+    p.add_argument('reg_no')
+    p.add_argument('--limit', type=int, default=50)
+    p.set_defaults(func=cmd_statement)
+
+    p = sub.add_parser('book-meals', help="default-book every student's meals for a date range (a term)")
+    p.add_argument('--from', dest='start', required=True, help="YYYY-MM-DD")
+    p.add_argument('--to', dest='end', required=True, help="YYYY-MM-DD")
+    p.add_argument('--meals', default=','.join(MEALS))
+    p.add_argument('--department')
+    p.set_defaults(func=cmd_book_meals)
+
+    p = sub.add_parser('meal-opt-out', help="opt a student out of meals (or --book back in)")
+    p.add_argument('reg_no')
+    p.add_argument('--from', dest='start', required=True, help="YYYY-MM-DD")
+    p.add_argument('--to', dest='end', help="YYYY-MM-DD (default: same day)")
+    p.add_argument('--meals', default=','.join(MEALS))
+    p.add_argument('--book', action='store_true', help="book instead of opting out")
+    p.set_defaults(func=cmd_meal_opt_out)
+
+    p = sub.add_parser('meal-counts', help="booked headcount per block and meal (default: tomorrow)")
+    p.add_argument('--date', help="YYYY-MM-DD")
+    p.set_defaults(func=cmd_meal_counts)
+
+    p = sub.add_parser('expiring', help="students whose registration expires within N days")
+    p.add_argument('--days', type=int, default=30)
+    p.add_argument('--department')
+    p.add_argument('--limit', type=int)
+    p.set_defaults(func=cmd_expiring)
+
+    p = sub.add_parser('renew', help="extend expiry dates in bulk and regenerate ID cards")
+    p.add_argument('reg_nos', nargs='*', default=[])
+    p.add_argument('--days', type=int, default=365, help="days added to max(expiry date, today)")
+    p.add_argument('--department')
+    p.add_argument('--expiring-within', type=int, metavar='DAYS',
+                   help="only students expiring within this many days")
+    p.add_argument('--no-cards', action='store_true', help="skip ID card regeneration")
+    p.add_argument('-j', '--jobs', type=int, default=2, help="card regeneration threads")
+    p.add_argument('--output-dir', help="default: DATA_DIR/id_cards")
+    p.set_defaults(func=cmd_renew)
+
+    p = sub.add_parser('archive', help="move long-expired students to the archive database")
+    p.add_argument('--before', help="archive expiry dates before this YYYY-MM-DD (default: today - grace)")
+    p.add_argument('--grace-days', type=int, default=0)
+    p.add_argument('--batch-size', type=int, default=500, help="students moved per transaction")
+    p.set_defaults(func=cmd_archive)
+
+    p = sub.add_parser('backup', help="take a verified online snapshot (or --verify existing ones)")
+    p.add_argument('--backup-dir', help="default: backups/ beside the database")
+    p.add_argument('--keep', type=int, default=7, help="snapshots to retain")
+    p.add_argument('--no-compress', action='store_true')
+    p.add_argument('--verify', action='store_true', help="check stored snapshots instead of taking one")
+    p.set_defaults(func=cmd_backup)
+
+    p = sub.add_parser('hostels', help="list hostel databases with student counts")
+    p.add_argument('--create', action='append', default=[], metavar='NAME', help="repeatable; create a hostel")
+    p.set_defaults(func=cmd_hostels)
+
+    p = sub.add_parser('move-student', help="move a student (row, room and fee balance) to another hostel")
+    p.add_argument('reg_no')
+    p.add_argument('to_hostel')
+    p.add_argument('--room', help="room in the new hostel (default: first free bed)")
+    p.set_defaults(func=cmd_move_student)
+
+    return parser
+
+
+def open_database(args):
+    """The hostel's own database, every hostel for --all-hostels, else the single-site default"""
+    config = Config(data_root=args.data_dir)
+    if getattr(args, 'all_hostels', False) or args.func in (cmd_hostels, cmd_move_student):
+        return HostelFederation(config)
+    if args.hostel:
+        try:
+            return open_hostel(args.hostel, config)
+        except ValueError as e:
+            raise SystemExit(str(e))
+    return Database(config=config)
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    default_trace_dir = os.path.join(Config(data_root=args.data_dir).data_root, 'traces')
+    trace_report = tracing.enable_from_env(default_trace_dir)
+    if args.trace is not None:
+        trace_report = tracing.enable(args.trace or default_trace_dir, args.slow_ms)
+    try:
+        with tracing.span(f"cli.{args.command}"):
+            return args.func(open_database(args), args)
+    except BrokenPipeError:
+        # Downstream closed the pipe (e.g. `| head`); not an error
+        sys.stderr.close()
+        return 0
+    finally:
+        if trace_report and not sys.stderr.closed:
+            # stderr, since stdout may be the command's output
+            print(tracing.tracer.format_report(), file=sys.stderr)
+            print("Trace report:", tracing.tracer.export(trace_report), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,243 @@
+import http.client
+import json
+import threading
+import uuid
+from urllib.parse import urlsplit
+
+from database import MEALS
+from membership import RegistrationIndex
+from tracing import span
+
+
+class RemoteError(Exception):
+    """The server reported an error for a call"""
+
+
+class _RemoteSearch:
+    """Stands in for the sqlite connection the students tab interrupts.
+
+    Passed to search_students as conn, it tags the search with an id the
+    server can cancel. A cancel that reaches the server before the search
+    does is a no-op; the desk drops that search's stale results anyway.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.search_id = uuid.uuid4().hex
+
+    def interrupt(self):
+        # Called on the Tk thread, so the RPC goes out on its own thread
+        threading.Thread(target=self.cancel, daemon=True).start()
+
+    def cancel(self):
+        try:
+            self.db.call('interrupt_search', self.search_id)
+        except Exception as e:
+            print("Server Error:", e)  # Debugging
+
+    def close(self):
+        pass
+
+
+class RemoteDatabase:
+    """Thin client with the Database methods the desktop app uses, served by server.py"""
+
+    def __init__(self, url, token=None, timeout=30):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.token = token
+        self.timeout = timeout
+        # One keep-alive HTTP connection per thread (the GUI searches on workers)
+        self.local = threading.local()
+        self.reg_numbers = RegistrationIndex(self)
+
+    def call(self, method, *params):
+        data = json.dumps({'method': method, 'params': params}).encode('utf-8')
+        headers = {'Content-Type': 'application/json'}
+        if self.token:
+            headers['X-Hostel-Token'] = self.token
+
+        with span(f"rpc.{method}", request_bytes=len(data)) as rpc_span:
+            for attempt in range(2):
+                conn = getattr(self.local, 'conn', None)
+                if conn is None:
+                    conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+                    self.local.conn = conn
+                try:
+                    conn.request('POST', '/rpc', body=data, headers=headers)
+                    response = conn.getresponse()
+                    payload = response.read()
+                    break
+                except (http.client.HTTPException, ConnectionError):
+                    # Server closed an idle keep-alive connection; retry once on a fresh one
+                    conn.close()
+                    self.local.conn = None
+                    if attempt:
+                        raise
+            rpc_span.set(response_bytes=len(payload), attempts=attempt + 1)
+
+        if response.status != 200:
+            raise RemoteError(f"HTTP {response.status} {response.reason}")
+        body = json.loads(payload)
+        if 'error' in body:
+            raise RemoteError(body['error'])
+        return body['result']
+
+    @staticmethod
+    def _rows(rows):
+        return [tuple(row) for row in rows]
+
+    def connect(self):
+        return _RemoteSearch(self)
+
+    def add_student(self, student_data, allocate=False, block=None):
+        added = self.call('add_student', student_data, allocate, block)
+        if added:
+            self.reg_numbers.add(student_data['registration_no'])
+        return added
+
+    def add_students(self, students):
+        inserted, failures = self.call('add_students', students)
+        return inserted, self._rows(failures)
+
+    def update_student(self, reg_no, changes, expected_version=None):
+        return self.call('update_student', reg_no, changes, expected_version)
+
+    def get_student(self, reg_no, include_archive=False):
+        row = self.call('get_student', reg_no, include_archive)
+        return tuple(row) if row is not None else None
+
+    def get_student_record(self, reg_no):
+        return self.call('get_student_record', reg_no)
+
+    def get_all_students(self):
+        return self._rows(self.call('get_all_students'))
+
+    def count_students(self):
+        return self.call('count_students')
+
+    def iter_students(self, batch_size=500):
+        after = None
+        while True:
+            rows, after = self.call('get_students_page', after, batch_size)
+            if rows:
+                yield self._rows(rows)
+            if after is None:
+                return
+
+    def iter_registration_numbers(self, batch_size=10000):
+        after = ''
+        while True:
+            reg_nos = self.call('get_registration_numbers_page', after, batch_size)
+            yield from reg_nos
+            if len(reg_nos) < batch_size:
+                return
+            after = reg_nos[-1]
+
+    def get_students_since(self, last_id=0, limit=None):
+        return self._rows(self.call('get_students_since', last_id, limit))
+
+    def search_students(self, term, limit=200, conn=None, include_archive=False):
+        if isinstance(conn, _RemoteSearch):
+            return self._rows(self.call('search', term, limit, include_archive, conn.search_id))
+        return self._rows(self.call('search_students', term, limit, None, include_archive))
+
+    def find_by_phone(self, phone):
+        return self._rows(self.call('find_by_phone', phone))
+
+    def find_by_email(self, email):
+        return self._rows(self.call('find_by_email', email))
+
+    def get_department_counts(self):
+        return self._rows(self.call('get_department_counts'))
+
+    def get_stats(self, month=None):
+        stats = self.call('get_stats', month)
+        stats['departments'] = self._rows(stats['departments'])
+        stats['blocks'] = self._rows(stats['blocks'])
+        return stats
+
+    def count_expiring(self, before_date):
+        return self.call('count_expiring', before_date)
+
+    def get_expiring(self, from_date, to_date, department=None, limit=None):
+        return self._rows(self.call('get_expiring', from_date, to_date, department, limit))
+
+    def renew_students(self, extend_days=365, department=None, expiring_before=None, reg_nos=None):
+        return self.call('renew_students', extend_days, department, expiring_before, reg_nos)
+
+    def add_rooms(self, rooms):
+        return self.call('add_rooms', rooms)
+
+    def find_free_room(self, block=None, conn=None):
+        return self.call('find_free_room', block)
+
+    def get_vacancies(self, block=None, limit=100):
+        return self._rows(self.call('get_vacancies', block, limit))
+
+    def get_free_rooms(self):
+        return self._rows(self.call('get_free_rooms'))
+
+    def assign_rooms(self, assignments):
+        return self.call('assign_rooms', assignments)
+
+    def add_gate_events(self, events):
+        return self.call('add_gate_events', list(events))
+
+    def get_inside(self, limit=None):
+        return self._rows(self.call('get_inside', limit))
+
+    def count_inside(self):
+        return self.call('count_inside')
+
+    def get_gate_history(self, reg_no, since=None, limit=100):
+        return self._rows(self.call('get_gate_history', reg_no, since, limit))
+
+    def post_fee_entries(self, entries):
+        return self.call('post_fee_entries', list(entries))
+
+    def post_term_charges(self, term, amount, description='Hostel fee', department=None):
+        return self.call('post_term_charges', term, amount, description, department)
+
+    def get_balance(self, reg_no):
+        return self.call('get_balance', reg_no)
+
+    def get_debtors(self, min_balance=1, limit=100):
+        return self._rows(self.call('get_debtors', min_balance, limit))
+
+    def get_statement(self, reg_no, limit=50, before_id=None):
+        return self._rows(self.call('get_statement', reg_no, limit, before_id))
+
+    def book_default_meals(self, from_date, to_date, meals=MEALS, department=None):
+        return self.call('book_default_meals', from_date, to_date, list(meals), department)
+
+    def set_meal_booking(self, reg_no, from_date, to_date=None, meals=MEALS, booked=False):
+        return self.call('set_meal_booking', reg_no, from_date, to_date, list(meals), booked)
+
+    def get_meal_counts(self, meal_date):
+        return self._rows(self.call('get_meal_counts', meal_date))
+
+    def get_student_meals(self, reg_no, from_date, to_date):
+        return self._rows(self.call('get_student_meals', reg_no, from_date, to_date))
+
+    def get_room(self, room_no):
+        row = self.call('get_room', room_no)
+        return tuple(row) if row is not None else None
+
+    def get_block_vacancy(self):
+        return self._rows(self.call('get_block_vacancy'))
+
+    def get_changes(self, since_seq=0, limit=1000):
+        return self._rows(self.call('get_changes', since_seq, limit))
+
+    def iter_changes(self, since_seq=0, batch_size=1000):
+        while True:
+            changes = self.get_changes(since_seq, batch_size)
+            yield from changes
+            if len(changes) < batch_size:
+                return
+            since_seq = changes[-1][0]
+
+    def get_change_seq(self):
+        return self.call('get_change_seq')
@@ -0,0 +1,80 @@
+import itertools
+import os
+
+# Card artwork ships with the code, so it is found relative to this file, not the working directory
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets')
+
+# Names for in-memory databases, unique within the process
+_memory_names = itertools.count(1)
+
+
+class Config:
+    """Where the application keeps its files.
+
+    data_root (default $HOSTEL_DATA_DIR, else "data") holds the database,
+    photos, ID cards and per-hostel files; db_path and assets_dir can be set
+    on their own. With memory=True (or db_path=':memory:') the database is a
+    named shared-cache in-memory database, so every connection a Database
+    opens sees the same data: it lives as long as a Database using it and
+    never touches the disk. Meant for fixtures and benchmarks; shared-cache
+    locking is per table, so keep concurrent writers for file databases.
+
+    desk_backup_hours (default $HOSTEL_DESK_BACKUP_HOURS, else 0) is how
+    often the desktop app snapshots the database itself. It is off unless
+    set, because desks sharing one file would each back it up; server.py
+    takes the backups for shared databases.
+
+    A hostel's config (for_db with a hostel name) also carries the shared
+    registry_path, where every hostel claims its registration numbers.
+    """
+
+    def __init__(self, data_root=None, db_path=None, assets_dir=None, memory=False, desk_backup_hours=None):
+        self.data_root = data_root or os.environ.get('HOSTEL_DATA_DIR') or 'data'
+        self.assets_dir = assets_dir or os.environ.get('HOSTEL_ASSETS_DIR') or ASSETS_DIR
+        if desk_backup_hours is None:
+            desk_backup_hours = float(os.environ.get('HOSTEL_DESK_BACKUP_HOURS') or 0)
+        self.desk_backup_hours = desk_backup_hours
+        self.memory = memory or db_path == ':memory:'
+        if self.memory:
+            self.memory_name = f"hostel-{os.getpid()}-{next(_memory_names)}"
+            self.db_path = f"file:{self.memory_name}?mode=memory&cache=shared"
+            self.archive_path = f"file:{self.memory_name}-archive?mode=memory&cache=shared"
+            self.registry_path = f"file:{self.memory_name}-registry?mode=memory&cache=shared"
+        else:
+            self.db_path = db_path or os.path.join(self.data_root, 'hostel.db')
+            # Archive and backups sit beside the database file (one set per hostel when partitioned)
+            self.archive_path = os.path.join(os.path.dirname(self.db_path), 'archive.db')
+            self.registry_path = os.path.join(self.hostels_dir, 'registry.db')
+        # Set by for_db for one hostel's database
+        self.hostel = None
+
+    @property
+    def images_dir(self):
+        return os.path.join(self.data_root, 'images')
+
+    @property
+    def id_cards_dir(self):
+        return os.path.join(self.data_root, 'id_cards')
+
+    @property
+    def hostels_dir(self):
+        return os.path.join(self.data_root, 'hostels')
+
+    @property
+    def backups_dir(self):
+        if self.memory:
+            return os.path.join(self.data_root, 'backups')
+        return os.path.join(os.path.dirname(self.db_path), 'backups')
+
+    def asset(self, filename):
+        """Path of an asset file, or None if it is not installed"""
+        path = os.path.join(self.assets_dir, filename)
+        return path if os.path.exists(path) else None
+
+    def for_db(self, db_path, hostel=None):
+        """Same data root and assets, another database file (or a fresh in-memory one)"""
+        config = Config(self.data_root, db_path, self.assets_dir, self.memory, self.desk_backup_hours)
+        if hostel:
+            config.hostel = hostel
+            config.registry_path = self.registry_path
+        return config
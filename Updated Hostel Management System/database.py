@@ -1,24 +1,119 @@
 import sqlite3
+import json
 import os
+import random
+import time
 from datetime import datetime
+from config import Config
+from tracing import connection_factory, traced_methods
+from validator import Validator
+from membership import RegistrationIndex
 
+# Columns returned by get_student and the lookup helpers, in order
+STUDENT_COLUMNS = ('registration_no', 'first_name', 'last_name', 'father_name',
+                   'department', 'room_no', 'phone', 'email', 'address', 'photo_path',
+                   'join_date', 'expiry_date')
 
+# Columns matched by search_students
+SEARCH_COLUMNS = ('registration_no', 'first_name', 'last_name', 'department', 'room_no')
+
+# Columns that may be changed through update_student
+UPDATABLE_COLUMNS = STUDENT_COLUMNS[1:]
+
+# Filters accepted by iter_student_records: name -> (SQL clause, value adapter)
+RECORD_FILTERS = {
+    'department': ('department = ?', str.upper),
+    'room_no': ('room_no = ?', str.upper),
+    'registration_prefix': ('registration_no LIKE ?', lambda v: v.upper() + '%'),
+    'joined_from': ('join_date >= ?', str),
+    'joined_to': ('join_date <= ?', str),
+    'expires_from': ('expiry_date >= ?', str),
+    'expires_to': ('expiry_date <= ?', str),
+}
+
+# Columns added after the original schema, migrated in place on startup
+ADDED_COLUMNS = (('phone_norm', 'TEXT'), ('email_norm', 'TEXT'),
+                 ('version', 'INTEGER NOT NULL DEFAULT 1'))
+
+# How long SQLite waits on a lock per attempt, and how writes retry after that
+BUSY_TIMEOUT = 2.0
+WRITE_RETRIES = 6
+RETRY_BASE_DELAY = 0.02
+RETRY_MAX_DELAY = 1.0
+
+# Fee ledger entry types; amounts are integer minor units, positive = owed
+FEE_ENTRY_TYPES = ('CHARGE', 'PAYMENT', 'ADJUSTMENT')
+
+# Meals that can be booked, in serving order
+MEALS = ('BREAKFAST', 'LUNCH', 'DINNER')
+
+# Bump when the trigger bodies change so existing files get the new triggers
+CHANGE_LOG_VERSION = 1
+
+INSERT_STUDENT_SQL = '''INSERT INTO students
+                        (registration_no, first_name, last_name, father_name,
+                         department, room_no, phone, email, address, photo_path, join_date, expiry_date,
+                         phone_norm, email_norm)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'''
+
+
+def stats_upsert(table, key_column, key, deltas, sign=1):
+    """Trigger statement adding `deltas` ({column: SQL expr}) to one summary row"""
+    columns = ", ".join(deltas)
+    values = ", ".join(expr if sign > 0 else f"-({expr})" for expr in deltas.values())
+    updates = ", ".join(f"{column} = {column} + excluded.{column}" for column in deltas)
+    return (f"INSERT INTO {table} ({key_column}, {columns}) VALUES ({key}, {values}) "
+            f"ON CONFLICT({key_column}) DO UPDATE SET {updates};")
+
+
+def check_meals(meals):
+    """Upper-cased meal names, or ValueError naming any not in MEALS"""
+    meals = [meal.strip().upper() for meal in meals]
+    unknown = [meal for meal in meals if meal not in MEALS]
+    if unknown:
+        raise ValueError(f"Unknown meals: {', '.join(unknown)}")
+    return meals
+
+
+class ConcurrencyError(Exception):
+    """An optimistic update found the row changed since it was read"""
+
+
+def is_busy_error(error):
+    code = getattr(error, 'sqlite_errorcode', None)
+    if code is not None:
+        # The low byte is the primary code: covers SQLITE_BUSY_SNAPSHOT (WAL), SQLITE_LOCKED_SHAREDCACHE, ...
+        return (code & 0xFF) in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+    message = str(error)
+    return 'locked' in message or 'busy' in message
+
+
+@traced_methods('db')
 class Database:
-    def __init__(self):
-        self.db_path = 'data/hostel.db'
+    def __init__(self, db_path=None, config=None):
+        # db_path is shorthand for Config(db_path=...); one file per hostel when partitioned
+        self.config = config or Config(db_path=db_path)
+        self.db_path = self.config.db_path
+        self.archive_path = self.config.archive_path
+        self.write_retries = 0
+        # An in-memory database disappears with its last connection, so hold one open
+        self.keepalive = self.connect() if self.config.memory else None
+        self.archive_keepalive = None
+        self.registry_keepalive = None
         self.init_db()
+        if self.config.hostel:
+            self.init_registry()
+        self.reg_numbers = RegistrationIndex(self)
 
     def init_db(self):
-        os.makedirs('data', exist_ok=True)
-        os.makedirs('data/images', exist_ok=True)
-        os.makedirs('data/id_cards', exist_ok=True)
+        if not self.config.memory:
+            os.makedirs(self.config.images_dir, exist_ok=True)
+            os.makedirs(self.config.id_cards_dir, exist_ok=True)
+            os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
 
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         c = conn.cursor()
 
-        # Drop table if exists for clean testing (remove in production)
-        c.execute("DROP TABLE IF EXISTS students")
-
         c.execute('''CREATE TABLE IF NOT EXISTS students
                      (id INTEGER PRIMARY KEY AUTOINCREMENT,
                       registration_no TEXT UNIQUE NOT NULL,
@@ -32,32 +127,464 @@ class Database:
                       address TEXT,
                       photo_path TEXT NOT NULL,
                       join_date TEXT NOT NULL,
-                      expiry_date TEXT NOT NULL)''')
+                      expiry_date TEXT NOT NULL,
+                      phone_norm TEXT,
+                      email_norm TEXT,
+                      version INTEGER NOT NULL DEFAULT 1)''')
+        self.migrate(c)
+
+        # Shadow columns keep lookups by phone/email to an index seek
+        c.execute("CREATE INDEX IF NOT EXISTS idx_students_phone_norm ON students(phone_norm)")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_students_email_norm ON students(email_norm)")
+
+        # Expiry-window scans (archival, renewals)
+        c.execute("CREATE INDEX IF NOT EXISTS idx_students_expiry ON students(expiry_date)")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_students_department_expiry "
+                  "ON students(department, expiry_date)")
+
+        # Serves the name-ordered student list page by page
+        c.execute("CREATE INDEX IF NOT EXISTS idx_students_name ON students(last_name, first_name)")
+
+        # NOCASE indexes let the students tab filter run prefix LIKEs as range scans
+        for column in SEARCH_COLUMNS:
+            c.execute(f"CREATE INDEX IF NOT EXISTS idx_students_{column}_nocase "
+                      f"ON students({column} COLLATE NOCASE)")
+
+        self.create_change_log(c)
+        self.create_rooms(c)
+        self.create_stats(c)
+        self.create_gate_log(c)
+        self.create_fee_ledger(c)
+        self.create_meal_bookings(c)
         conn.commit()
         conn.close()
 
-    def add_student(self, student_data):
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
+    @staticmethod
+    def create_change_log(c):
+        """Append-only change log on students, filled by triggers.
+
+        seq is AUTOINCREMENT so it only ever grows, even across deletes;
+        downstream syncs remember the last seq they applied and ask for more.
+        """
+        c.execute('''CREATE TABLE IF NOT EXISTS student_changes
+                     (seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                      op TEXT NOT NULL,
+                      registration_no TEXT NOT NULL,
+                      changed_columns TEXT,
+                      changed_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')))''')
+
+        suffix = f"v{CHANGE_LOG_VERSION}"
+        all_columns = ",".join(STUDENT_COLUMNS)
+        diff = " || ".join(f"CASE WHEN OLD.{column} IS NOT NEW.{column} THEN '{column},' ELSE '' END"
+                           for column in STUDENT_COLUMNS)
+        any_change = " OR ".join(f"OLD.{column} IS NOT NEW.{column}" for column in STUDENT_COLUMNS)
+
+        c.execute(f'''CREATE TRIGGER IF NOT EXISTS students_log_insert_{suffix}
+                      AFTER INSERT ON students BEGIN
+                          INSERT INTO student_changes (op, registration_no, changed_columns)
+                          VALUES ('INSERT', NEW.registration_no, '{all_columns}');
+                      END''')
+        c.execute(f'''CREATE TRIGGER IF NOT EXISTS students_log_update_{suffix}
+                      AFTER UPDATE ON students WHEN {any_change} BEGIN
+                          INSERT INTO student_changes (op, registration_no, changed_columns)
+                          VALUES ('UPDATE', NEW.registration_no, rtrim({diff}, ','));
+                      END''')
+        c.execute(f'''CREATE TRIGGER IF NOT EXISTS students_log_delete_{suffix}
+                      AFTER DELETE ON students BEGIN
+                          INSERT INTO student_changes (op, registration_no, changed_columns)
+                          VALUES ('DELETE', OLD.registration_no, NULL);
+                      END''')
+
+    @staticmethod
+    def create_rooms(c):
+        """Rooms with a bed capacity and an occupancy counter kept by triggers.
+
+        The partial index holds only rooms with a free bed, so finding one is
+        a single index seek no matter how full the hostel is. Students in
+        rooms that are not registered here are simply not counted.
+        """
+        c.execute('''CREATE TABLE IF NOT EXISTS rooms
+                     (room_no TEXT PRIMARY KEY,
+                      block TEXT NOT NULL DEFAULT '',
+                      floor INTEGER NOT NULL DEFAULT 0,
+                      capacity INTEGER NOT NULL CHECK (capacity >= 0),
+                      occupied INTEGER NOT NULL DEFAULT 0,
+                      gender TEXT NOT NULL DEFAULT '')''')
+        # '' = any gender; files created before the column existed get it here
+        if 'gender' not in {row[1] for row in c.execute("PRAGMA table_info(rooms)")}:
+            c.execute("ALTER TABLE rooms ADD COLUMN gender TEXT NOT NULL DEFAULT ''")
+        c.execute('''CREATE INDEX IF NOT EXISTS idx_rooms_vacant ON rooms(block, floor, room_no)
+                     WHERE occupied < capacity''')
+
+        full = "EXISTS (SELECT 1 FROM rooms WHERE room_no = NEW.room_no AND occupied >= capacity)"
+        c.execute(f'''CREATE TRIGGER IF NOT EXISTS students_room_check_insert
+                      BEFORE INSERT ON students WHEN {full} BEGIN
+                          SELECT RAISE(ABORT, 'room is full');
+                      END''')
+        c.execute(f'''CREATE TRIGGER IF NOT EXISTS students_room_check_update
+                      BEFORE UPDATE OF room_no ON students
+                      WHEN OLD.room_no IS NOT NEW.room_no AND {full} BEGIN
+                          SELECT RAISE(ABORT, 'room is full');
+                      END''')
+        c.execute('''CREATE TRIGGER IF NOT EXISTS students_room_insert
+                     AFTER INSERT ON students BEGIN
+                         UPDATE rooms SET occupied = occupied + 1 WHERE room_no = NEW.room_no;
+                     END''')
+        c.execute('''CREATE TRIGGER IF NOT EXISTS students_room_delete
+                     AFTER DELETE ON students BEGIN
+                         UPDATE rooms SET occupied = occupied - 1 WHERE room_no = OLD.room_no;
+                     END''')
+        c.execute('''CREATE TRIGGER IF NOT EXISTS students_room_move
+                     AFTER UPDATE OF room_no ON students WHEN OLD.room_no IS NOT NEW.room_no BEGIN
+                         UPDATE rooms SET occupied = occupied - 1 WHERE room_no = OLD.room_no;
+                         UPDATE rooms SET occupied = occupied + 1 WHERE room_no = NEW.room_no;
+                     END''')
+
+    def create_stats(self, c):
+        """Summary tables kept current by triggers, so dashboard figures are row reads.
+
+        Totals, students per department, students per expiry month and bed
+        occupancy per block each change by +/-1 inside the same transaction
+        as the write that caused them, so they are exact, never stale.
+        """
+        c.execute("CREATE TABLE IF NOT EXISTS stats_totals (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        c.execute('''CREATE TABLE IF NOT EXISTS stats_departments
+                     (department TEXT PRIMARY KEY, students INTEGER NOT NULL)''')
+        c.execute('''CREATE TABLE IF NOT EXISTS stats_expiry_months
+                     (month TEXT PRIMARY KEY, students INTEGER NOT NULL)''')
+        c.execute('''CREATE TABLE IF NOT EXISTS stats_blocks
+                     (block TEXT PRIMARY KEY, rooms INTEGER NOT NULL, beds INTEGER NOT NULL,
+                      occupied INTEGER NOT NULL, free INTEGER NOT NULL)''')
+
+        def student(row, sign):
+            return (stats_upsert('stats_totals', 'name', "'students'", {'value': '1'}, sign) +
+                    stats_upsert('stats_departments', 'department', f"{row}.department",
+                                 {'students': '1'}, sign) +
+                    stats_upsert('stats_expiry_months', 'month', f"substr({row}.expiry_date, 1, 7)",
+                                 {'students': '1'}, sign))
+
+        def room(row, sign):
+            return stats_upsert('stats_blocks', 'block', f"{row}.block",
+                                {'rooms': '1', 'beds': f"{row}.capacity", 'occupied': f"{row}.occupied",
+                                 'free': f"MAX({row}.capacity - {row}.occupied, 0)"}, sign)
+
+        c.execute(f'''CREATE TRIGGER IF NOT EXISTS students_stats_insert
+                      AFTER INSERT ON students BEGIN {student('NEW', 1)} END''')
+        c.execute(f'''CREATE TRIGGER IF NOT EXISTS students_stats_delete
+                      AFTER DELETE ON students BEGIN {student('OLD', -1)} END''')
+        c.execute(f'''CREATE TRIGGER IF NOT EXISTS students_stats_department
+                      AFTER UPDATE OF department ON students
+                      WHEN OLD.department IS NOT NEW.department BEGIN
+                          {stats_upsert('stats_departments', 'department', 'OLD.department', {'students': '1'}, -1)}
+                          {stats_upsert('stats_departments', 'department', 'NEW.department', {'students': '1'})}
+                      END''')
+        c.execute(f'''CREATE TRIGGER IF NOT EXISTS students_stats_expiry
+                      AFTER UPDATE OF expiry_date ON students
+                      WHEN substr(OLD.expiry_date, 1, 7) IS NOT substr(NEW.expiry_date, 1, 7) BEGIN
+                          {stats_upsert('stats_expiry_months', 'month', 'substr(OLD.expiry_date, 1, 7)',
+                                        {'students': '1'}, -1)}
+                          {stats_upsert('stats_expiry_months', 'month', 'substr(NEW.expiry_date, 1, 7)',
+                                        {'students': '1'})}
+                      END''')
+        c.execute(f'''CREATE TRIGGER IF NOT EXISTS rooms_stats_insert
+                      AFTER INSERT ON rooms BEGIN {room('NEW', 1)} END''')
+        c.execute(f'''CREATE TRIGGER IF NOT EXISTS rooms_stats_delete
+                      AFTER DELETE ON rooms BEGIN {room('OLD', -1)} END''')
+        c.execute(f'''CREATE TRIGGER IF NOT EXISTS rooms_stats_update
+                      AFTER UPDATE ON rooms BEGIN {room('OLD', -1)} {room('NEW', 1)} END''')
+
+        # First start with these tables: fill them from the existing rows
+        if c.execute("SELECT 1 FROM stats_totals WHERE name = 'students'").fetchone() is None:
+            self.rebuild_stats(c)
+
+    @staticmethod
+    def rebuild_stats(c):
+        """Recompute every summary table from scratch"""
+        for table in ('stats_totals', 'stats_departments', 'stats_expiry_months', 'stats_blocks'):
+            c.execute(f"DELETE FROM {table}")
+        c.execute("INSERT INTO stats_totals VALUES ('students', (SELECT COUNT(*) FROM students))")
+        c.execute('''INSERT INTO stats_departments
+                     SELECT department, COUNT(*) FROM students GROUP BY department''')
+        c.execute('''INSERT INTO stats_expiry_months
+                     SELECT substr(expiry_date, 1, 7), COUNT(*) FROM students GROUP BY 1''')
+        c.execute('''INSERT INTO stats_blocks
+                     SELECT block, COUNT(*), SUM(capacity), SUM(occupied), SUM(MAX(capacity - occupied, 0))
+                     FROM rooms GROUP BY block''')
+
+    @staticmethod
+    def create_gate_log(c):
+        """Append-only gate scans plus a presence table of who is inside.
+
+        gate_presence holds one row per student currently inside, kept by a
+        trigger on gate_events, so "who is inside" never scans the log.
+        An event older than the presence row (a late batch) does not
+        override it.
+        """
+        c.execute('''CREATE TABLE IF NOT EXISTS gate_events
+                     (id INTEGER PRIMARY KEY,
+                      registration_no TEXT NOT NULL,
+                      direction TEXT NOT NULL CHECK (direction IN ('IN', 'OUT')),
+                      at TEXT NOT NULL,
+                      gate TEXT NOT NULL DEFAULT '')''')
+        c.execute("CREATE INDEX IF NOT EXISTS idx_gate_events_student ON gate_events(registration_no, at)")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_gate_events_at ON gate_events(at)")
+        c.execute('''CREATE TABLE IF NOT EXISTS gate_presence
+                     (registration_no TEXT PRIMARY KEY,
+                      since TEXT NOT NULL,
+                      gate TEXT NOT NULL)''')
+
+        c.execute('''CREATE TRIGGER IF NOT EXISTS gate_events_in
+                     AFTER INSERT ON gate_events WHEN NEW.direction = 'IN' BEGIN
+                         INSERT INTO gate_presence (registration_no, since, gate)
+                         VALUES (NEW.registration_no, NEW.at, NEW.gate)
+                         ON CONFLICT(registration_no) DO UPDATE SET since = excluded.since, gate = excluded.gate
+                         WHERE excluded.since >= gate_presence.since;
+                     END''')
+        c.execute('''CREATE TRIGGER IF NOT EXISTS gate_events_out
+                     AFTER INSERT ON gate_events WHEN NEW.direction = 'OUT' BEGIN
+                         DELETE FROM gate_presence
+                         WHERE registration_no = NEW.registration_no AND since <= NEW.at;
+                     END''')
+
+    @staticmethod
+    def create_fee_ledger(c):
+        """Append-only fee ledger with a balance row per student kept by trigger.
+
+        Each entry stores the balance after it (computed by the INSERT from
+        fee_balances), so a statement never sums earlier entries, and the
+        debtors list is a walk down the balance index.
+        """
+        c.execute(f'''CREATE TABLE IF NOT EXISTS fee_ledger
+                      (id INTEGER PRIMARY KEY,
+                       registration_no TEXT NOT NULL,
+                       entry_type TEXT NOT NULL CHECK (entry_type IN {FEE_ENTRY_TYPES}),
+                       amount INTEGER NOT NULL,
+                       description TEXT NOT NULL DEFAULT '',
+                       term TEXT,
+                       posted_at TEXT NOT NULL,
+                       balance_after INTEGER NOT NULL,
+                       move_id TEXT)''')
+        if 'move_id' not in {row[1] for row in c.execute("PRAGMA table_info(fee_ledger)")}:
+            c.execute("ALTER TABLE fee_ledger ADD COLUMN move_id TEXT")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_fee_ledger_student ON fee_ledger(registration_no, id)")
+        # One balance carried per student and hostel move, so finishing an interrupted move never posts twice
+        c.execute('''CREATE UNIQUE INDEX IF NOT EXISTS idx_fee_ledger_move
+                     ON fee_ledger(registration_no, move_id) WHERE move_id IS NOT NULL''')
+        # One charge per student, term and description, so re-running a term posting is harmless
+        c.execute('''CREATE UNIQUE INDEX IF NOT EXISTS idx_fee_ledger_term_charge
+                     ON fee_ledger(registration_no, term, description)
+                     WHERE entry_type = 'CHARGE' AND term IS NOT NULL''')
+        c.execute('''CREATE TABLE IF NOT EXISTS fee_balances
+                     (registration_no TEXT PRIMARY KEY,
+                      balance INTEGER NOT NULL,
+                      updated_at TEXT NOT NULL)''')
+        c.execute("CREATE INDEX IF NOT EXISTS idx_fee_balances_balance ON fee_balances(balance)")
+
+        c.execute('''CREATE TRIGGER IF NOT EXISTS fee_ledger_balance
+                     AFTER INSERT ON fee_ledger BEGIN
+                         INSERT INTO fee_balances (registration_no, balance, updated_at)
+                         VALUES (NEW.registration_no, NEW.balance_after, NEW.posted_at)
+                         ON CONFLICT(registration_no) DO UPDATE SET
+                             balance = excluded.balance, updated_at = excluded.updated_at;
+                     END''')
+        for event in ('UPDATE', 'DELETE'):
+            c.execute(f'''CREATE TRIGGER IF NOT EXISTS fee_ledger_no_{event.lower()}
+                          BEFORE {event} ON fee_ledger BEGIN
+                              SELECT RAISE(ABORT, 'fee ledger is append-only; post an adjustment');
+                          END''')
+
+    @staticmethod
+    def create_meal_bookings(c):
+        """Meal bookings per student, date and meal, with headcounts kept by triggers.
+
+        An opt-out is a booking row with booked = 0, so the term default can
+        be re-applied without undoing it. meal_counts holds booked totals
+        per (date, meal, block); tomorrow's headcount is a prefix read.
+        """
+        c.execute(f'''CREATE TABLE IF NOT EXISTS meal_bookings
+                      (registration_no TEXT NOT NULL,
+                       meal_date TEXT NOT NULL,
+                       meal TEXT NOT NULL CHECK (meal IN {MEALS}),
+                       booked INTEGER NOT NULL DEFAULT 1,
+                       block TEXT NOT NULL DEFAULT '',
+                       PRIMARY KEY (registration_no, meal_date, meal)) WITHOUT ROWID''')
+        c.execute('''CREATE TABLE IF NOT EXISTS meal_counts
+                     (meal_date TEXT NOT NULL,
+                      meal TEXT NOT NULL,
+                      block TEXT NOT NULL,
+                      booked INTEGER NOT NULL,
+                      PRIMARY KEY (meal_date, meal, block)) WITHOUT ROWID''')
+
+        key_columns = "meal_date, meal, block"
+
+        def count(row, sign):
+            return stats_upsert('meal_counts', key_columns, f"{row}.meal_date, {row}.meal, {row}.block",
+                                {'booked': f"{row}.booked"}, sign)
+
+        c.execute(f'''CREATE TRIGGER IF NOT EXISTS meal_bookings_insert
+                      AFTER INSERT ON meal_bookings BEGIN {count('NEW', 1)} END''')
+        c.execute(f'''CREATE TRIGGER IF NOT EXISTS meal_bookings_delete
+                      AFTER DELETE ON meal_bookings BEGIN {count('OLD', -1)} END''')
+        c.execute(f'''CREATE TRIGGER IF NOT EXISTS meal_bookings_update
+                      AFTER UPDATE ON meal_bookings BEGIN {count('OLD', -1)} {count('NEW', 1)} END''')
+
+        # Future bookings follow a student to a new block and go when the student leaves
+        c.execute('''CREATE TRIGGER IF NOT EXISTS students_meal_room
+                     AFTER UPDATE OF room_no ON students WHEN OLD.room_no IS NOT NEW.room_no BEGIN
+                         UPDATE meal_bookings
+                         SET block = COALESCE((SELECT block FROM rooms WHERE room_no = NEW.room_no), '')
+                         WHERE registration_no = NEW.registration_no
+                           AND meal_date >= date('now', 'localtime');
+                     END''')
+        c.execute('''CREATE TRIGGER IF NOT EXISTS students_meal_delete
+                     AFTER DELETE ON students BEGIN
+                         DELETE FROM meal_bookings
+                         WHERE registration_no = OLD.registration_no
+                           AND meal_date >= date('now', 'localtime');
+                     END''')
+
+    def migrate(self, c):
+        """Add columns introduced after a database file was created"""
+        existing = {row[1] for row in c.execute("PRAGMA table_info(students)")}
+        for name, declaration in ADDED_COLUMNS:
+            if name not in existing:
+                c.execute(f"ALTER TABLE students ADD COLUMN {name} {declaration}")
+
+        if 'phone_norm' not in existing:
+            rows = c.execute("SELECT id, phone, email FROM students").fetchall()
+            c.executemany("UPDATE students SET phone_norm = ?, email_norm = ? WHERE id = ?",
+                          [(Validator.normalize_phone(phone), Validator.normalize_email(email), row_id)
+                           for row_id, phone, email in rows])
+
+    @staticmethod
+    def student_params(student_data):
+        return (student_data['registration_no'],
+                student_data['first_name'],
+                student_data['last_name'],
+                student_data['father_name'],
+                student_data['department'],
+                student_data['room_no'],
+                student_data['phone'],
+                student_data.get('email', ''),
+                student_data.get('address', ''),
+                student_data['photo_path'],
+                student_data['join_date'],
+                student_data['expiry_date'],
+                Validator.normalize_phone(student_data['phone']),
+                Validator.normalize_email(student_data.get('email')))
+
+    def connect(self):
+        """Open a connection the caller owns (and may interrupt from another thread)"""
+        return sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT, uri=self.config.memory,
+                               factory=connection_factory())
+
+    def run_write(self, work, attach=None):
+        """Run work(cursor) inside BEGIN IMMEDIATE and return its result.
+
+        Taking the write lock up front avoids the deferred-transaction upgrade
+        deadlock between processes. If the lock stays busy past BUSY_TIMEOUT the
+        whole transaction is retried with jittered exponential backoff.
+        `attach` maps schema names to database files to ATTACH beforehand.
+        """
+        for attempt in range(WRITE_RETRIES + 1):
+            conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT, isolation_level=None,
+                                   uri=self.config.memory, factory=connection_factory())
+            try:
+                c = conn.cursor()
+                for schema, path in (attach or {}).items():
+                    c.execute(f"ATTACH DATABASE ? AS {schema}", (path,))
+                if 'registry' in (attach or {}):
+                    self.create_claim_trigger(c)
+                c.execute("BEGIN IMMEDIATE")
+                try:
+                    result = work(c)
+                    c.execute("COMMIT")
+                    return result
+                except BaseException:
+                    if conn.in_transaction:
+                        c.execute("ROLLBACK")
+                    raise
+            except sqlite3.OperationalError as e:
+                if not is_busy_error(e) or attempt == WRITE_RETRIES:
+                    raise
+                self.write_retries += 1
+                delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt)
+                time.sleep(delay * random.uniform(0.5, 1.5))
+            finally:
+                conn.close()
+
+    def init_registry(self):
+        """Registration numbers claimed by each hostel, in a file all hostels share.
+
+        Student inserts attach it (registry_attach) and a TEMP trigger claims
+        the number in the same transaction, so two hostels can never both
+        register one number, even from different desks at the same moment.
+        Claims outlive archival: a number stays with its hostel. Rows from
+        before the registry existed are claimed the first time a hostel opens.
+        Under WAL a crash between the two files' commits can leave a claim
+        without its student (the number can still be registered in that
+        hostel) or the reverse (re-claimed by the next insert or move).
+        """
+        conn = sqlite3.connect(self.config.registry_path, timeout=BUSY_TIMEOUT, uri=self.config.memory)
+        conn.execute('''CREATE TABLE IF NOT EXISTS registrations
+                        (registration_no TEXT PRIMARY KEY, hostel TEXT NOT NULL) WITHOUT ROWID''')
+        conn.execute("CREATE TABLE IF NOT EXISTS claimed_hostels (hostel TEXT PRIMARY KEY)")
+        conn.commit()
+        if self.config.memory:
+            self.registry_keepalive = conn
+        else:
+            conn.close()
+
+        hostel = self.config.hostel
+
+        def backfill(c):
+            if c.execute("SELECT 1 FROM registry.claimed_hostels WHERE hostel = ?", (hostel,)).fetchone():
+                return 0
+            c.execute('''INSERT OR IGNORE INTO registry.registrations (registration_no, hostel)
+                         SELECT registration_no, ? FROM main.students''', (hostel,))
+            c.execute("INSERT INTO registry.claimed_hostels VALUES (?)", (hostel,))
+            c.execute('''SELECT COUNT(*) FROM main.students s JOIN registry.registrations r
+                         ON r.registration_no = s.registration_no WHERE r.hostel != ?''', (hostel,))
+            return c.fetchone()[0]
+
+        conflicts = self.run_write(backfill, attach=self.registry_attach())
+        if conflicts:
+            print("Database Error:", f"{conflicts} students in {hostel} are registered in another hostel")  # Debugging
+
+    def registry_attach(self):
+        """ATTACH mapping for writes that insert students ({} outside a partitioned setup)"""
+        return {'registry': self.config.registry_path} if self.config.hostel else {}
+
+    def create_claim_trigger(self, c):
+        # TEMP, so it exists only on this connection, which has the registry attached.
+        # Triggers cannot qualify INSERT targets; no other schema has a registrations table
+        c.execute(f'''CREATE TEMP TRIGGER IF NOT EXISTS students_claim AFTER INSERT ON main.students BEGIN
+                          INSERT INTO registrations (registration_no, hostel)
+                          VALUES (NEW.registration_no, '{self.config.hostel}')
+                          ON CONFLICT(registration_no) DO NOTHING;
+                          SELECT RAISE(ABORT, 'registration number is registered in another hostel')
+                          WHERE (SELECT hostel FROM registrations
+                                 WHERE registration_no = NEW.registration_no) != '{self.config.hostel}';
+                      END''')
+
+    def add_student(self, student_data, allocate=False, block=None):
+        """Insert one student; with allocate, room_no is taken from the first free bed.
+
+        Allocation happens inside the insert transaction, so two desks can
+        never be given the same last bed. The chosen room is written back
+        to student_data['room_no'].
+        """
+        def insert(c):
+            if allocate:
+                room_no = self.find_free_room(block, c)
+                if room_no is None:
+                    raise sqlite3.IntegrityError(f"no free bed{' in block ' + block if block else ''}")
+                student_data['room_no'] = room_no
+            c.execute(INSERT_STUDENT_SQL, self.student_params(student_data))
 
         try:
-            c.execute('''INSERT INTO students 
-                         (registration_no, first_name, last_name, father_name, 
-                          department, room_no, phone, email, address, photo_path, join_date, expiry_date)
-                         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-                      (student_data['registration_no'],
-                       student_data['first_name'],
-                       student_data['last_name'],
-                       student_data['father_name'],
-                       student_data['department'],
-                       student_data['room_no'],
-                       student_data['phone'],
-                       student_data['email'],
-                       student_data['address'],
-                       student_data['photo_path'],
-                       student_data['join_date'],
-                       student_data['expiry_date']))
-            conn.commit()
+            self.run_write(insert, attach=self.registry_attach())
+            self.reg_numbers.add(student_data['registration_no'])
             return True
         except sqlite3.IntegrityError as e:
             print("Database Error:", e)  # Debugging
@@ -65,11 +592,35 @@ class Database:
         except Exception as e:
             print("General Error:", e)  # Debugging
             return False
-        finally:
-            conn.close()
 
-    def get_student(self, reg_no):
-        conn = sqlite3.connect(self.db_path)
+    def add_students(self, students):
+        """Insert many students in one transaction.
+
+        Rows that violate a constraint are skipped, not fatal. Returns
+        (inserted_count, [(registration_no, error_message), ...]).
+        """
+        def insert_all(c):
+            inserted = 0
+            failures = []
+            for student_data in students:
+                try:
+                    c.execute(INSERT_STUDENT_SQL, self.student_params(student_data))
+                    inserted += 1
+                except sqlite3.IntegrityError as e:
+                    failures.append((student_data['registration_no'], str(e)))
+            return inserted, failures
+
+        inserted, failures = self.run_write(insert_all, attach=self.registry_attach())
+
+        if inserted and self.reg_numbers.members is not None:
+            failed = {reg_no for reg_no, _ in failures}
+            for student_data in students:
+                if student_data['registration_no'] not in failed:
+                    self.reg_numbers.add(student_data['registration_no'])
+        return inserted, failures
+
+    def get_student(self, reg_no, include_archive=False):
+        conn = self.connect()
         c = conn.cursor()
 
         c.execute('''SELECT registration_no, first_name, last_name, father_name,
@@ -78,10 +629,797 @@ class Database:
         student = c.fetchone()
 
         conn.close()
+        if student is None and include_archive:
+            archive = self.connect_archive()
+            if archive is not None:
+                student = archive.execute(f'''SELECT {", ".join(STUDENT_COLUMNS)}
+                                              FROM students_archive WHERE registration_no = ?''',
+                                          (reg_no,)).fetchone()
+                archive.close()
         return student
 
+    def get_student_record(self, reg_no):
+        """One student as a dict of STUDENT_COLUMNS plus 'version', or None"""
+        conn = self.connect()
+        c = conn.cursor()
+
+        c.execute(f'''SELECT {", ".join(STUDENT_COLUMNS)}, version
+                      FROM students WHERE registration_no = ?''', (reg_no,))
+        row = c.fetchone()
+
+        conn.close()
+        return dict(zip(STUDENT_COLUMNS + ('version',), row)) if row else None
+
+    def update_student(self, reg_no, changes, expected_version=None):
+        """Update the given columns of one student, keeping shadow columns in sync.
+
+        With expected_version (from get_student_record) the update only applies
+        if nobody changed the row since it was read; otherwise ConcurrencyError
+        is raised so the caller can reload and retry.
+        """
+        changes = {k: v for k, v in changes.items() if k in UPDATABLE_COLUMNS}
+        if not changes:
+            return False
+        if 'phone' in changes:
+            changes['phone_norm'] = Validator.normalize_phone(changes['phone'])
+        if 'email' in changes:
+            changes['email_norm'] = Validator.normalize_email(changes['email'])
+
+        assignments = ", ".join(f"{column} = ?" for column in changes)
+        query = f"UPDATE students SET {assignments}, version = version + 1 WHERE registration_no = ?"
+        params = [*changes.values(), reg_no]
+        if expected_version is not None:
+            query += " AND version = ?"
+            params.append(expected_version)
+
+        def update(c):
+            c.execute(query, params)
+            if c.rowcount == 1:
+                return True
+            if expected_version is not None:
+                c.execute("SELECT version FROM students WHERE registration_no = ?", (reg_no,))
+                current = c.fetchone()
+                if current is not None:
+                    raise ConcurrencyError(f"{reg_no} is at version {current[0]}, "
+                                           f"expected {expected_version}")
+            return False
+
+        try:
+            return self.run_write(update)
+        except sqlite3.Error as e:
+            print("Database Error:", e)  # Debugging
+            return False
+
+    def find_by_phone(self, phone):
+        """Students whose phone normalizes to the same number"""
+        phone_norm = Validator.normalize_phone(phone)
+        if not phone_norm:
+            return []
+        return self._find_by('phone_norm', phone_norm)
+
+    def find_by_email(self, email):
+        """Students with the given email, ignoring case and surrounding spaces"""
+        email_norm = Validator.normalize_email(email)
+        if not email_norm:
+            return []
+        return self._find_by('email_norm', email_norm)
+
+    def _find_by(self, column, value):
+        conn = self.connect()
+        c = conn.cursor()
+
+        c.execute(f'''SELECT {", ".join(STUDENT_COLUMNS)}
+                      FROM students WHERE {column} = ?''', (value,))
+        students = c.fetchall()
+
+        conn.close()
+        return students
+
+    def search_students(self, term, limit=200, conn=None, include_archive=False):
+        """Prefix match over reg no, name, department and room.
+
+        Returns at most `limit` rows shaped like get_all_students. A term with
+        a space is read as "first-name-prefix last-name-prefix". With
+        include_archive, archived students fill whatever room `limit` leaves.
+        """
+        term = term.replace('%', '').replace('_', '').strip()
+        own_conn = conn is None
+        if own_conn:
+            conn = self.connect()
+
+        try:
+            rows = conn.execute(*self.search_query('students', term, limit)).fetchall()
+        finally:
+            if own_conn:
+                conn.close()
+
+        if include_archive and len(rows) < limit:
+            archive = self.connect_archive()
+            if archive is not None:
+                rows += archive.execute(*self.search_query('students_archive', term,
+                                                           limit - len(rows))).fetchall()
+                archive.close()
+        return rows
+
+    @staticmethod
+    def search_query(table, term, limit):
+        select = f"SELECT registration_no, first_name, last_name, department, room_no FROM {table}"
+        first, _, rest = term.partition(' ')
+        if rest.strip():
+            query = f"{select} WHERE first_name LIKE ? AND last_name LIKE ? LIMIT ?"
+            return query, (first + '%', rest.strip() + '%', limit)
+        where = " OR ".join(f"{column} LIKE :prefix" for column in SEARCH_COLUMNS)
+        return f"{select} WHERE {where} LIMIT :limit", {'prefix': term + '%', 'limit': limit}
+
+    def has_archive(self):
+        if self.config.memory:
+            return self.archive_keepalive is not None
+        return os.path.exists(self.archive_path)
+
+    def connect_archive(self):
+        """Connection to the archive file, or None if nothing was ever archived"""
+        if not self.has_archive():
+            return None
+        return sqlite3.connect(self.archive_path, timeout=BUSY_TIMEOUT, uri=self.config.memory,
+                               factory=connection_factory())
+
+    def init_archive(self):
+        conn = sqlite3.connect(self.archive_path, timeout=BUSY_TIMEOUT, uri=self.config.memory)
+        c = conn.cursor()
+
+        c.execute('''CREATE TABLE IF NOT EXISTS students_archive
+                     (registration_no TEXT PRIMARY KEY,
+                      first_name TEXT NOT NULL,
+                      last_name TEXT NOT NULL,
+                      father_name TEXT NOT NULL,
+                      department TEXT NOT NULL,
+                      room_no TEXT NOT NULL,
+                      phone TEXT NOT NULL,
+                      email TEXT,
+                      address TEXT,
+                      photo_path TEXT NOT NULL,
+                      join_date TEXT NOT NULL,
+                      expiry_date TEXT NOT NULL,
+                      phone_norm TEXT,
+                      email_norm TEXT,
+                      archived_at TEXT NOT NULL)''')
+        # Same prefix-search indexes as the hot table, so include_archive stays cheap
+        for column in SEARCH_COLUMNS:
+            c.execute(f"CREATE INDEX IF NOT EXISTS idx_archive_{column}_nocase "
+                      f"ON students_archive({column} COLLATE NOCASE)")
+
+        conn.commit()
+        if self.config.memory and self.archive_keepalive is None:
+            self.archive_keepalive = conn
+        else:
+            conn.close()
+
+    def archive_expired(self, before_date=None, batch_size=500):
+        """Move students whose expiry_date is before `before_date` into the archive file.
+
+        Works in batches, each its own short write transaction over both files
+        (ATTACH), so registrations are never blocked for long and the hot table
+        and its indexes shrink. INSERT OR REPLACE makes a repeated batch
+        harmless. Returns the number of students archived.
+        """
+        before_date = before_date or datetime.now().strftime('%Y-%m-%d')
+        self.init_archive()
+        columns = ", ".join(STUDENT_COLUMNS + ('phone_norm', 'email_norm'))
+        archived_at = datetime.now().isoformat(timespec='seconds')
+
+        def move_batch(c):
+            c.execute("SELECT id FROM main.students WHERE expiry_date < ? ORDER BY expiry_date LIMIT ?",
+                      (before_date, batch_size))
+            ids = [row[0] for row in c.fetchall()]
+            if ids:
+                marks = ", ".join("?" * len(ids))
+                c.execute(f'''INSERT OR REPLACE INTO archive.students_archive ({columns}, archived_at)
+                              SELECT {columns}, ? FROM main.students WHERE id IN ({marks})''',
+                          (archived_at, *ids))
+                c.execute(f"DELETE FROM main.students WHERE id IN ({marks})", ids)
+            return len(ids)
+
+        total = 0
+        while True:
+            moved = self.run_write(move_batch, attach={'archive': self.archive_path})
+            total += moved
+            if moved < batch_size:
+                return total
+
+    def restore_student(self, reg_no):
+        """Move one archived student back into the students table (re-admission)"""
+        if not self.has_archive():
+            return False
+        columns = ", ".join(STUDENT_COLUMNS + ('phone_norm', 'email_norm'))
+
+        def restore(c):
+            c.execute(f'''INSERT INTO main.students ({columns})
+                          SELECT {columns} FROM archive.students_archive WHERE registration_no = ?''',
+                      (reg_no,))
+            if c.rowcount != 1:
+                return False
+            c.execute("DELETE FROM archive.students_archive WHERE registration_no = ?", (reg_no,))
+            return True
+
+        try:
+            return self.run_write(restore, attach={'archive': self.archive_path, **self.registry_attach()})
+        except sqlite3.IntegrityError as e:
+            print("Database Error:", e)  # Debugging
+            return False
+
+    def iter_students(self, batch_size=500):
+        """Yield get_all_students rows in batches, in the same order.
+
+        Each batch is a separate keyset query, so no read lock is held
+        between batches and writers are never blocked by a slow consumer.
+        """
+        after = None
+        while True:
+            rows, after = self.get_students_page(after, batch_size)
+            if rows:
+                yield rows
+            if after is None:
+                return
+
+    def get_students_page(self, after=None, limit=500):
+        """One page of get_all_students rows plus the cursor for the next page.
+
+        The cursor is None once the last page has been returned.
+        """
+        conn = self.connect()
+        c = conn.cursor()
+
+        c.execute('''SELECT registration_no, first_name, last_name, department, room_no,
+                            last_name, first_name, id
+                     FROM students
+                     WHERE (last_name, first_name, id) > (?, ?, ?)
+                     ORDER BY last_name, first_name, id LIMIT ?''', (*(after or ('', '', 0)), limit))
+        rows = c.fetchall()
+
+        conn.close()
+        next_after = list(rows[-1][5:]) if len(rows) == limit else None
+        return [row[:5] for row in rows], next_after
+
+    def iter_student_records(self, batch_size=1000, columns=None, filters=None):
+        """Stream student rows by registration number using fetchmany.
+
+        `columns` selects a subset of STUDENT_COLUMNS (default: all).
+        `filters` maps RECORD_FILTERS names to values and is applied in SQL,
+        so rows that are filtered out never reach Python.
+        """
+        columns = tuple(columns or STUDENT_COLUMNS)
+        unknown = [column for column in columns if column not in STUDENT_COLUMNS + ('version',)]
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+        where, params = self.record_filters(filters)
+
+        conn = self.connect()
+        try:
+            c = conn.execute(f'''SELECT {", ".join(columns)}
+                                 FROM students {where} ORDER BY registration_no''', params)
+            while True:
+                rows = c.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            conn.close()
+
+    @staticmethod
+    def record_filters(filters):
+        """WHERE clause (or '') and parameters for RECORD_FILTERS values"""
+        clauses = []
+        params = []
+        for name, value in (filters or {}).items():
+            if name not in RECORD_FILTERS:
+                raise ValueError(f"Unknown filter: {name}")
+            clause, to_param = RECORD_FILTERS[name]
+            clauses.append(clause)
+            params.append(to_param(value))
+        return (f"WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+    def get_changes(self, since_seq=0, limit=1000):
+        """Change log entries after since_seq, oldest first.
+
+        Each entry is (seq, op, registration_no, [changed columns], changed_at).
+        """
+        conn = self.connect()
+        c = conn.cursor()
+
+        c.execute('''SELECT seq, op, registration_no, changed_columns, changed_at
+                     FROM student_changes WHERE seq > ? ORDER BY seq LIMIT ?''', (since_seq, limit))
+        changes = [(seq, op, reg_no, columns.split(',') if columns else [], changed_at)
+                   for seq, op, reg_no, columns, changed_at in c.fetchall()]
+
+        conn.close()
+        return changes
+
+    def iter_changes(self, since_seq=0, batch_size=1000):
+        """Stream every change after since_seq, one short query per batch"""
+        while True:
+            changes = self.get_changes(since_seq, batch_size)
+            yield from changes
+            if len(changes) < batch_size:
+                return
+            since_seq = changes[-1][0]
+
+    def get_change_seq(self):
+        """Latest change sequence number (0 when the log is empty)"""
+        conn = self.connect()
+        c = conn.cursor()
+
+        c.execute("SELECT COALESCE(MAX(seq), 0) FROM student_changes")
+        seq = c.fetchone()[0]
+
+        conn.close()
+        return seq
+
+    def get_department_counts(self):
+        conn = self.connect()
+        c = conn.cursor()
+
+        c.execute('''SELECT department, students FROM stats_departments
+                     WHERE students > 0 ORDER BY department''')
+        counts = c.fetchall()
+
+        conn.close()
+        return counts
+
+    def get_stats(self, month=None):
+        """Dashboard figures read from the summary tables, never from students itself.
+
+        `month` (YYYY-MM, default the current one) selects which month's
+        expiries are reported.
+        """
+        month = month or datetime.now().strftime('%Y-%m')
+        conn = self.connect()
+        c = conn.cursor()
+
+        c.execute("SELECT value FROM stats_totals WHERE name = 'students'")
+        total = c.fetchone()[0]
+        c.execute('''SELECT COALESCE(SUM(CASE WHEN month = ? THEN students END), 0),
+                            COALESCE(SUM(CASE WHEN month < ? THEN students END), 0)
+                     FROM stats_expiry_months''', (month, month))
+        expiring, expired = c.fetchone()
+        c.execute('''SELECT department, students FROM stats_departments
+                     WHERE students > 0 ORDER BY students DESC, department''')
+        departments = c.fetchall()
+        c.execute('''SELECT block, rooms, beds, occupied, free FROM stats_blocks
+                     WHERE rooms > 0 ORDER BY block''')
+        blocks = c.fetchall()
+
+        conn.close()
+        return {
+            'students': total,
+            'month': month,
+            'expiring_this_month': expiring,
+            'expired_before_this_month': expired,
+            'departments': departments,
+            'blocks': blocks,
+            'beds': sum(block[2] for block in blocks),
+            'free_beds': sum(block[4] for block in blocks),
+        }
+
+    def count_expiring(self, before_date):
+        """Students whose expiry date is before the given YYYY-MM-DD date"""
+        conn = self.connect()
+        c = conn.cursor()
+
+        c.execute("SELECT COUNT(*) FROM students WHERE expiry_date < ?", (before_date,))
+        count = c.fetchone()[0]
+
+        conn.close()
+        return count
+
+    def get_expiring(self, from_date, to_date, department=None, limit=None):
+        """Students with from_date <= expiry_date < to_date, soonest first.
+
+        Both forms are range scans: idx_students_expiry, or
+        idx_students_department_expiry when a department is given.
+        """
+        query = f"SELECT {', '.join(STUDENT_COLUMNS)} FROM students WHERE expiry_date >= ? AND expiry_date < ?"
+        params = [from_date, to_date]
+        if department:
+            query += " AND department = ?"
+            params.append(department.upper())
+        query += " ORDER BY expiry_date"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        conn = self.connect()
+        c = conn.cursor()
+
+        c.execute(query, params)
+        students = c.fetchall()
+
+        conn.close()
+        return students
+
+    def renew_students(self, extend_days=365, department=None, expiring_before=None, reg_nos=None):
+        """Extend expiry dates in one transaction; returns the renewed registration numbers.
+
+        Selects students by department and/or expiring_before (YYYY-MM-DD),
+        or an explicit reg_nos list. Each new expiry date counts from the
+        later of the current expiry date and today, so renewing early never
+        shortens a registration. Versions are bumped like update_student.
+        """
+        if department is None and expiring_before is None and reg_nos is None:
+            raise ValueError("renew_students needs department, expiring_before or reg_nos")
+        today = datetime.now().strftime('%Y-%m-%d')
+        assignment = "expiry_date = date(MAX(expiry_date, ?), ?), version = version + 1"
+        shift = (today, f'+{int(extend_days)} days')
+
+        clauses = []
+        params = []
+        if department is not None:
+            clauses.append("department = ?")
+            params.append(department.upper())
+        if expiring_before is not None:
+            clauses.append("expiry_date < ?")
+            params.append(expiring_before)
+
+        def renew(c):
+            if reg_nos is None:
+                where = " AND ".join(clauses)
+                c.execute(f"SELECT registration_no FROM students WHERE {where}", params)
+                renewed = [row[0] for row in c.fetchall()]
+                c.execute(f"UPDATE students SET {assignment} WHERE {where}", (*shift, *params))
+                return renewed
+
+            renewed = []
+            where = " AND ".join(clauses + ["registration_no = ?"])
+            for reg_no in reg_nos:
+                c.execute(f"UPDATE students SET {assignment} WHERE {where}", (*shift, *params, reg_no))
+                if c.rowcount:
+                    renewed.append(reg_no)
+            return renewed
+
+        return self.run_write(renew)
+
+    def add_rooms(self, rooms):
+        """Create or update rooms from dicts with room_no, block, floor, capacity and gender.
+
+        Occupancy is recounted from the students table afterwards, so rooms
+        can be registered after students already live in them.
+        """
+        def upsert(c):
+            c.executemany('''INSERT INTO rooms (room_no, block, floor, capacity, gender)
+                             VALUES (:room_no, :block, :floor, :capacity, :gender)
+                             ON CONFLICT(room_no) DO UPDATE SET
+                                 block = excluded.block, floor = excluded.floor,
+                                 capacity = excluded.capacity, gender = excluded.gender''',
+                          [{'room_no': room['room_no'].strip().upper(),
+                            'block': (room.get('block') or '').strip().upper(),
+                            'floor': int(room.get('floor') or 0),
+                            'capacity': int(room['capacity']),
+                            'gender': (room.get('gender') or '').strip().upper()[:1]} for room in rooms])
+            self.recount_rooms(c)
+            return len(rooms)
+
+        return self.run_write(upsert)
+
+    @staticmethod
+    def recount_rooms(c):
+        """Rebuild every occupancy counter from the students table"""
+        c.execute('''UPDATE rooms SET occupied =
+                         (SELECT COUNT(*) FROM students WHERE students.room_no = rooms.room_no)''')
+
+    def find_free_room(self, block=None, conn=None):
+        """First room with a free bed (by block, floor, room), or None"""
+        query = "SELECT room_no FROM rooms WHERE occupied < capacity"
+        params = ()
+        if block:
+            query += " AND block = ?"
+            params = (block.upper(),)
+        query += " ORDER BY block, floor, room_no LIMIT 1"
+
+        own_conn = conn is None
+        if own_conn:
+            conn = self.connect()
+        try:
+            row = conn.execute(query, params).fetchone()
+        finally:
+            if own_conn:
+                conn.close()
+        return row[0] if row else None
+
+    def get_vacancies(self, block=None, limit=100):
+        """Rooms with free beds: (room_no, block, floor, capacity, occupied)"""
+        query = "SELECT room_no, block, floor, capacity, occupied FROM rooms WHERE occupied < capacity"
+        params = []
+        if block:
+            query += " AND block = ?"
+            params.append(block.upper())
+        query += " ORDER BY block, floor, room_no LIMIT ?"
+        params.append(limit)
+
+        conn = self.connect()
+        c = conn.cursor()
+
+        c.execute(query, params)
+        rooms = c.fetchall()
+
+        conn.close()
+        return rooms
+
+    def get_free_rooms(self):
+        """Every room with a free bed: (room_no, block, floor, gender, free_beds)"""
+        conn = self.connect()
+        c = conn.cursor()
+
+        c.execute('''SELECT room_no, block, floor, gender, capacity - occupied FROM rooms
+                     WHERE occupied < capacity ORDER BY block, floor, room_no''')
+        rooms = c.fetchall()
+
+        conn.close()
+        return rooms
+
+    def assign_rooms(self, assignments):
+        """Apply {registration_no: room_no} in one transaction; all or nothing.
+
+        The room triggers still check capacity, so if another desk took a
+        bed since the plan was made the whole batch rolls back. Returns the
+        number of students moved, or 0 on failure.
+        """
+        def assign(c):
+            c.executemany('''UPDATE students SET room_no = ?, version = version + 1
+                             WHERE registration_no = ? AND room_no IS NOT ?''',
+                          [(room_no, reg_no, room_no) for reg_no, room_no in assignments.items()])
+            return c.rowcount
+
+        try:
+            return self.run_write(assign)
+        except sqlite3.IntegrityError as e:
+            print("Database Error:", e)  # Debugging
+            return 0
+
+    def add_gate_events(self, events):
+        """Append (registration_no, direction, at, gate) scans in one transaction"""
+        events = list(events)
+        self.run_write(lambda c: c.executemany(
+            "INSERT INTO gate_events (registration_no, direction, at, gate) VALUES (?, ?, ?, ?)", events))
+        return len(events)
+
+    def get_inside(self, limit=None):
+        """Students inside now: (registration_no, first_name, last_name, room_no, since, gate)"""
+        query = '''SELECT p.registration_no, s.first_name, s.last_name, s.room_no, p.since, p.gate
+                   FROM gate_presence p LEFT JOIN students s ON s.registration_no = p.registration_no
+                   ORDER BY p.since DESC'''
+        params = ()
+        if limit:
+            query += " LIMIT ?"
+            params = (limit,)
+
+        conn = self.connect()
+        c = conn.cursor()
+
+        c.execute(query, params)
+        inside = c.fetchall()
+
+        conn.close()
+        return inside
+
+    def count_inside(self):
+        conn = self.connect()
+        c = conn.cursor()
+
+        c.execute("SELECT COUNT(*) FROM gate_presence")
+        count = c.fetchone()[0]
+
+        conn.close()
+        return count
+
+    def get_gate_history(self, reg_no, since=None, limit=100):
+        """One student's scans, newest first: (direction, at, gate)"""
+        conn = self.connect()
+        c = conn.cursor()
+
+        c.execute('''SELECT direction, at, gate FROM gate_events
+                     WHERE registration_no = ? AND at >= ?
+                     ORDER BY at DESC, id DESC LIMIT ?''', (reg_no.upper(), since or '', limit))
+        history = c.fetchall()
+
+        conn.close()
+        return history
+
+    def post_fee_entries(self, entries):
+        """Append (registration_no, entry_type, amount, description, term) entries in one transaction.
+
+        Amounts are integer minor units, positive when the student owes
+        more: charges are positive, payments negative, adjustments either.
+        Each entry must name a current student, or one archived with a
+        balance still open; otherwise ValueError is raised and nothing is
+        posted. Returns the number of entries posted.
+        """
+        posted_at = datetime.now().isoformat(timespec='seconds')
+        rows = []
+        for reg_no, entry_type, amount, description, term in entries:
+            if entry_type not in FEE_ENTRY_TYPES:
+                raise ValueError(f"Unknown fee entry type: {entry_type}")
+            reg_no = reg_no.strip().upper()
+            rows.append((reg_no, entry_type, int(amount), description or '', term, posted_at,
+                         reg_no, int(amount), reg_no, reg_no))
+
+        def post(c):
+            for row in rows:
+                c.execute('''INSERT INTO fee_ledger
+                                 (registration_no, entry_type, amount, description, term, posted_at, balance_after)
+                             SELECT ?, ?, ?, ?, ?, ?,
+                                    COALESCE((SELECT balance FROM fee_balances WHERE registration_no = ?), 0) + ?
+                             WHERE EXISTS (SELECT 1 FROM students WHERE registration_no = ?)
+                                OR EXISTS (SELECT 1 FROM fee_balances WHERE registration_no = ? AND balance != 0)''',
+                          row)
+                if c.rowcount != 1:
+                    raise ValueError(f"Unknown registration number: {row[0]}")
+            return len(rows)
+
+        return self.run_write(post)
+
+    def post_term_charges(self, term, amount, description='Hostel fee', department=None):
+        """Charge every current student (optionally one department) for a term in one statement.
+
+        Students already charged for this term and description are
+        skipped, so the posting can be re-run safely. Returns how many
+        charges were posted.
+        """
+        posted_at = datetime.now().isoformat(timespec='seconds')
+        query = '''INSERT OR IGNORE INTO fee_ledger
+                       (registration_no, entry_type, amount, description, term, posted_at, balance_after)
+                   SELECT s.registration_no, 'CHARGE', :amount, :description, :term, :posted_at,
+                          COALESCE(b.balance, 0) + :amount
+                   FROM students s LEFT JOIN fee_balances b ON b.registration_no = s.registration_no'''
+        params = {'amount': int(amount), 'description': description, 'term': term, 'posted_at': posted_at}
+        if department:
+            query += " WHERE s.department = :department"
+            params['department'] = department.upper()
+
+        def post(c):
+            c.execute(query, params)
+            return c.rowcount
+
+        return self.run_write(post)
+
+    def get_balance(self, reg_no):
+        conn = self.connect()
+        c = conn.cursor()
+
+        c.execute("SELECT balance FROM fee_balances WHERE registration_no = ?", (reg_no.upper(),))
+        row = c.fetchone()
+
+        conn.close()
+        return row[0] if row else 0
+
+    def get_debtors(self, min_balance=1, limit=100):
+        """Students owing at least min_balance, largest first: (reg_no, first, last, balance)"""
+        conn = self.connect()
+        c = conn.cursor()
+
+        c.execute('''SELECT b.registration_no, s.first_name, s.last_name, b.balance
+                     FROM fee_balances b LEFT JOIN students s ON s.registration_no = b.registration_no
+                     WHERE b.balance >= ? ORDER BY b.balance DESC LIMIT ?''', (min_balance, limit))
+        debtors = c.fetchall()
+
+        conn.close()
+        return debtors
+
+    def get_statement(self, reg_no, limit=50, before_id=None):
+        """Ledger entries newest first: (id, posted_at, entry_type, description, term, amount, balance_after)
+
+        Pass the last id of a page as before_id for the next (older) page.
+        """
+        conn = self.connect()
+        c = conn.cursor()
+
+        c.execute('''SELECT id, posted_at, entry_type, description, term, amount, balance_after
+                     FROM fee_ledger WHERE registration_no = ? AND id < ?
+                     ORDER BY id DESC LIMIT ?''', (reg_no.upper(), before_id or (1 << 62), limit))
+        entries = c.fetchall()
+
+        conn.close()
+        return entries
+
+    def book_default_meals(self, from_date, to_date, meals=MEALS, department=None):
+        """Book every current student for each meal from from_date to to_date in one statement.
+
+        Days after a student's expiry date are not booked, and existing
+        rows (including opt-outs) are left alone, so re-running a term's
+        default booking only fills gaps. Returns the number of bookings added.
+        """
+        meals = check_meals(meals)
+        query = '''WITH RECURSIVE days(day) AS
+                        (SELECT date(?) UNION ALL SELECT date(day, '+1 day') FROM days WHERE day < date(?))
+                    INSERT OR IGNORE INTO meal_bookings (registration_no, meal_date, meal, block)
+                    SELECT s.registration_no, days.day, m.meal, COALESCE(r.block, '')
+                    FROM students s
+                    JOIN days ON days.day <= s.expiry_date
+                    JOIN (SELECT value AS meal FROM json_each(?)) m
+                    LEFT JOIN rooms r ON r.room_no = s.room_no'''
+        params = [from_date, to_date, json.dumps(meals)]
+        if department:
+            query += " WHERE s.department = ?"
+            params.append(department.upper())
+
+        def book(c):
+            c.execute(query, params)
+            # rowcount is -1 for statements that start with WITH
+            return c.execute("SELECT changes()").fetchone()[0]
+
+        return self.run_write(book)
+
+    def set_meal_booking(self, reg_no, from_date, to_date=None, meals=MEALS, booked=False):
+        """Opt a student out of (or back into) meals for a date range; returns rows changed"""
+        meals = check_meals(meals)
+        query = '''WITH RECURSIVE days(day) AS
+                       (SELECT date(?) UNION ALL SELECT date(day, '+1 day') FROM days WHERE day < date(?))
+                   INSERT INTO meal_bookings (registration_no, meal_date, meal, booked, block)
+                   SELECT s.registration_no, days.day, m.meal, ?, COALESCE(r.block, '')
+                   FROM students s
+                   JOIN days
+                   JOIN (SELECT value AS meal FROM json_each(?)) m
+                   LEFT JOIN rooms r ON r.room_no = s.room_no
+                   WHERE s.registration_no = ?
+                   ON CONFLICT(registration_no, meal_date, meal) DO UPDATE SET booked = excluded.booked'''
+        params = (from_date, to_date or from_date, int(booked), json.dumps(meals), reg_no.upper())
+
+        def book(c):
+            c.execute(query, params)
+            # rowcount is -1 for statements that start with WITH
+            return c.execute("SELECT changes()").fetchone()[0]
+
+        return self.run_write(book)
+
+    def get_meal_counts(self, meal_date):
+        """Booked headcount for one day: [(block, meal, booked)] from meal_counts"""
+        conn = self.connect()
+        c = conn.cursor()
+
+        c.execute('''SELECT block, meal, booked FROM meal_counts
+                     WHERE meal_date = ? AND booked > 0 ORDER BY block, meal''', (meal_date,))
+        counts = c.fetchall()
+
+        conn.close()
+        order = {meal: i for i, meal in enumerate(MEALS)}
+        return sorted(counts, key=lambda row: (row[0], order.get(row[1], len(MEALS))))
+
+    def get_student_meals(self, reg_no, from_date, to_date):
+        """(meal_date, meal, booked) rows for one student"""
+        conn = self.connect()
+        c = conn.cursor()
+
+        c.execute('''SELECT meal_date, meal, booked FROM meal_bookings
+                     WHERE registration_no = ? AND meal_date BETWEEN ? AND ?
+                     ORDER BY meal_date, meal''', (reg_no.upper(), from_date, to_date))
+        meals = c.fetchall()
+
+        conn.close()
+        return meals
+
+    def get_room(self, room_no):
+        """(room_no, block, floor, capacity, occupied) or None"""
+        conn = self.connect()
+        c = conn.cursor()
+
+        c.execute("SELECT room_no, block, floor, capacity, occupied FROM rooms WHERE room_no = ?",
+                  (room_no.upper(),))
+        room = c.fetchone()
+
+        conn.close()
+        return room
+
+    def get_block_vacancy(self):
+        """(block, rooms, beds, free beds) per block"""
+        conn = self.connect()
+        c = conn.cursor()
+
+        c.execute("SELECT block, rooms, beds, free FROM stats_blocks WHERE rooms > 0 ORDER BY block")
+        blocks = c.fetchall()
+
+        conn.close()
+        return blocks
+
     def get_all_students(self):
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         c = conn.cursor()
 
         c.execute('''SELECT registration_no, first_name, last_name, department, room_no
@@ -91,8 +1429,66 @@ class Database:
         conn.close()
         return students
 
+    def count_students(self):
+        conn = self.connect()
+        c = conn.cursor()
+
+        c.execute("SELECT value FROM stats_totals WHERE name = 'students'")
+        count = c.fetchone()[0]
+
+        conn.close()
+        return count
+
+    def iter_registration_numbers(self, batch_size=10000):
+        """Stream every registration number without materializing the table"""
+        conn = self.connect()
+        try:
+            c = conn.execute("SELECT registration_no FROM students")
+            while True:
+                rows = c.fetchmany(batch_size)
+                if not rows:
+                    break
+                for (reg_no,) in rows:
+                    yield reg_no
+        finally:
+            conn.close()
+
+    def get_registration_numbers_page(self, after='', limit=10000):
+        """Registration numbers greater than `after`, in order (keyset paging)"""
+        conn = self.connect()
+        c = conn.cursor()
+
+        c.execute('''SELECT registration_no FROM students WHERE registration_no > ?
+                     ORDER BY registration_no LIMIT ?''', (after, limit))
+        reg_nos = [row[0] for row in c.fetchall()]
+
+        conn.close()
+        return reg_nos
+
+    def enable_wal(self):
+        """Switch the file to WAL so readers and the writer do not block each other.
+
+        Only valid when every connection is on the same host (server mode);
+        WAL does not work over network shares.
+        """
+        conn = self.connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.close()
+
+    def get_students_since(self, last_id=0, limit=None):
+        """Rows used for duplicate matching, inserted after the given row id (at most `limit`)"""
+        conn = self.connect()
+        c = conn.cursor()
+
+        c.execute('''SELECT id, registration_no, first_name, last_name, father_name, phone
+                     FROM students WHERE id > ? ORDER BY id LIMIT ?''', (last_id, -1 if limit is None else limit))
+        students = c.fetchall()
+
+        conn.close()
+        return students
+
     def print_db_structure(self):
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         c = conn.cursor()
         c.execute("PRAGMA table_info(students)")
         print("Database structure:")
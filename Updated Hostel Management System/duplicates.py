@@ -0,0 +1,223 @@
+import threading
+from collections import defaultdict
+from difflib import SequenceMatcher
+from itertools import combinations
+
+from validator import Validator
+
+SOUNDEX_CODES = {}
+for _letters, _digit in (('BFPV', '1'), ('CGJKQSXZ', '2'), ('DT', '3'),
+                         ('L', '4'), ('MN', '5'), ('R', '6')):
+    for _letter in _letters:
+        SOUNDEX_CODES[_letter] = _digit
+
+
+def soundex(word):
+    """American Soundex code (e.g. 'Muhammad' and 'Mohammed' -> 'M530')"""
+    word = ''.join(ch for ch in (word or '').upper() if ch.isalpha())
+    if not word:
+        return ''
+    code = word[0]
+    last = SOUNDEX_CODES.get(word[0], '')
+    for ch in word[1:]:
+        digit = SOUNDEX_CODES.get(ch, '')
+        if digit and digit != last:
+            code += digit
+            if len(code) == 4:
+                break
+        if ch not in 'HW':
+            last = digit
+    return code.ljust(4, '0')
+
+
+def phonetic_key(*names):
+    """Soundex of every word in the given names, in order"""
+    return ' '.join(soundex(part) for name in names for part in (name or '').split())
+
+
+class DuplicateDetector:
+    """Finds likely duplicate registrations without comparing every pair.
+
+    Students are bucketed under blocking keys (normalized phone and the
+    phonetic form of name + father's name); only students sharing a bucket
+    are scored against each other. New rows are pulled by id; edits,
+    archivals and moves come from the change log, so keys never go stale.
+
+    preload() reads the table in batches outside the lock and only holds it
+    to add each batch. Until it finishes, find_matches does not sync and
+    scores against the students loaded so far, so a registration on the UI
+    thread waits for at most one batch, never for the whole load.
+    """
+
+    # Buckets larger than this are treated as noise (e.g. a placeholder phone)
+    MAX_BLOCK_SIZE = 200
+
+    # Name similarity below this never counts as a duplicate; siblings often
+    # share the father's name and phone
+    MIN_NAME_SIMILARITY = 0.7
+
+    # Edits to these columns change a student's blocking keys or score
+    MATCH_COLUMNS = {'first_name', 'last_name', 'father_name', 'phone'}
+
+    # Rows preload() reads per batch
+    PRELOAD_BATCH_SIZE = 5000
+
+    def __init__(self, db, threshold=0.7):
+        self.db = db
+        self.threshold = threshold
+        self.records = {}
+        self.blocks = defaultdict(set)
+        self.last_id = 0
+        self.change_seq = None
+        self.lock = threading.RLock()
+        self.loading = False
+
+    def preload(self):
+        """Do the first (full) load on a background thread"""
+        self.loading = True
+        threading.Thread(target=self.load, daemon=True).start()
+
+    def load(self):
+        try:
+            with self.lock:
+                if self.change_seq is None:
+                    # Changes before the full load are already in it
+                    self.change_seq = self.db.get_change_seq()
+            while True:
+                rows = self.db.get_students_since(self.last_id, self.PRELOAD_BATCH_SIZE)
+                with self.lock:
+                    self.add_rows(rows)
+                if len(rows) < self.PRELOAD_BATCH_SIZE:
+                    return
+        finally:
+            self.loading = False
+
+    def sync(self):
+        """Catch up with every write since the last sync, including other desks' writes"""
+        with self.lock:
+            if self.change_seq is None:
+                # Changes before the full load are already in it
+                self.change_seq = self.db.get_change_seq()
+            stale = set()
+            refetch = set()
+            for seq, op, reg_no, columns, _ in self.db.iter_changes(self.change_seq):
+                self.change_seq = seq
+                if op == 'DELETE':
+                    stale.add(reg_no)
+                elif op == 'UPDATE' and self.MATCH_COLUMNS.intersection(columns):
+                    stale.add(reg_no)
+                    refetch.add(reg_no)
+            for reg_no in stale:
+                self.remove(reg_no)
+            for reg_no in refetch:
+                row = self.db.get_student(reg_no)
+                if row is not None:
+                    self.add({'registration_no': row[0], 'first_name': row[1], 'last_name': row[2],
+                              'father_name': row[3], 'phone': row[6]})
+
+            # Inserts, restores and moves in all get a new row id
+            self.add_rows(self.db.get_students_since(self.last_id))
+
+    def add_rows(self, rows):
+        """Index rows from get_students_since"""
+        for row in rows:
+            # max(): a sync on another thread may already be past this batch
+            self.last_id = max(self.last_id, row[0])
+            self.add({
+                'registration_no': row[1],
+                'first_name': row[2],
+                'last_name': row[3],
+                'father_name': row[4],
+                'phone': row[5],
+            })
+
+    def add(self, student_data):
+        reg_no = student_data['registration_no']
+        self.remove(reg_no)
+        record = {
+            'registration_no': reg_no,
+            'name': f"{student_data['first_name']} {student_data['last_name']}".lower(),
+            'father_name': (student_data['father_name'] or '').lower(),
+            'phone': Validator.normalize_phone(student_data['phone']),
+            'keys': self.blocking_keys(student_data),
+        }
+        self.records[reg_no] = record
+        for key in record['keys']:
+            self.blocks[key].add(reg_no)
+
+    def remove(self, reg_no):
+        record = self.records.pop(reg_no, None)
+        if record is None:
+            return
+        for key in record['keys']:
+            block = self.blocks.get(key)
+            if block is not None:
+                block.discard(reg_no)
+                if not block:
+                    del self.blocks[key]
+
+    @staticmethod
+    def blocking_keys(student_data):
+        keys = []
+        phone = Validator.normalize_phone(student_data.get('phone'))
+        if phone:
+            keys.append(('phone', phone))
+        name_key = phonetic_key(student_data.get('first_name'), student_data.get('last_name'))
+        if name_key:
+            keys.append(('name', name_key, phonetic_key(student_data.get('father_name'))))
+        return keys
+
+    @staticmethod
+    def score(a, b):
+        """Similarity in [0, 1] between two normalized records"""
+        name = SequenceMatcher(None, a['name'], b['name']).ratio()
+        if name < DuplicateDetector.MIN_NAME_SIMILARITY:
+            return 0.0
+        father = SequenceMatcher(None, a['father_name'], b['father_name']).ratio()
+        phone = 1.0 if a['phone'] and a['phone'] == b['phone'] else 0.0
+        return round(0.5 * name + 0.3 * father + 0.2 * phone, 3)
+
+    def find_matches(self, student_data):
+        """Existing students likely to be the same person, best match first"""
+        with self.lock:
+            if not self.loading:
+                self.sync()
+            probe = {
+                'name': f"{student_data['first_name']} {student_data['last_name']}".lower(),
+                'father_name': (student_data['father_name'] or '').lower(),
+                'phone': Validator.normalize_phone(student_data['phone']),
+            }
+            candidates = set()
+            for key in self.blocking_keys(student_data):
+                block = self.blocks.get(key, ())
+                if len(block) <= self.MAX_BLOCK_SIZE:
+                    candidates.update(block)
+            candidates.discard(student_data.get('registration_no'))
+
+            matches = []
+            for reg_no in candidates:
+                score = self.score(probe, self.records[reg_no])
+                if score >= self.threshold:
+                    matches.append((score, reg_no))
+            matches.sort(reverse=True)
+            return matches
+
+    def report(self):
+        """Batch scan of the whole table: [(score, reg_no_a, reg_no_b)]"""
+        with self.lock:
+            self.sync()
+            seen = set()
+            pairs = []
+            for block in self.blocks.values():
+                if len(block) < 2 or len(block) > self.MAX_BLOCK_SIZE:
+                    continue
+                for a, b in combinations(sorted(block), 2):
+                    if (a, b) in seen:
+                        continue
+                    seen.add((a, b))
+                    score = self.score(self.records[a], self.records[b])
+                    if score >= self.threshold:
+                        pairs.append((score, a, b))
+            pairs.sort(reverse=True)
+            return pairs
+
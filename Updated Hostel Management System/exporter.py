@@ -0,0 +1,62 @@
+import csv
+import gzip
+import io
+import json
+import sys
+
+from database import STUDENT_COLUMNS
+
+EXPORT_FORMATS = ('csv', 'jsonl')
+
+
+def open_output(path, compress=None):
+    """Text stream for `path` ('-' is stdout); gzip when compress is set or path ends in .gz"""
+    if compress is None:
+        compress = path.endswith('.gz')
+    if path == '-':
+        if compress:
+            return io.TextIOWrapper(gzip.GzipFile(fileobj=sys.stdout.buffer, mode='wb'),
+                                    encoding='utf-8', newline='')
+        return sys.stdout
+    if compress:
+        return gzip.open(path, 'wt', encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+def write_rows(out, rows, columns, fmt):
+    """Write an iterable of row tuples; returns the number written"""
+    count = 0
+    if fmt == 'csv':
+        writer = csv.writer(out)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    elif fmt == 'jsonl':
+        dumps = json.dumps
+        for row in rows:
+            out.write(dumps(dict(zip(columns, row))))
+            out.write('\n')
+            count += 1
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+    return count
+
+
+def export_students(db, path, fmt='csv', columns=None, filters=None, compress=None, batch_size=1000):
+    """Stream students to a CSV/JSONL file (optionally gzip) in constant memory.
+
+    Rows are read with fetchmany and written one at a time, so memory does
+    not grow with the table. Column selection and filters are pushed into
+    the SQL query (see Database.iter_student_records).
+    """
+    columns = tuple(columns or STUDENT_COLUMNS)
+    rows = db.iter_student_records(batch_size, columns=columns, filters=filters)
+    out = open_output(path, compress)
+    try:
+        return write_rows(out, rows, columns, fmt)
+    finally:
+        if out is sys.stdout:
+            out.flush()
+        else:
+            out.close()
@@ -0,0 +1,105 @@
+import queue
+import re
+import threading
+import time
+from datetime import datetime
+
+# The ID card QR code is a small text block with a "Reg No: ..." line
+CARD_REG_NO_RE = re.compile(r'Reg No:\s*(\S+)')
+
+
+def parse_card_payload(payload):
+    """Registration number from a scanned ID card QR code (or a typed reg no)"""
+    match = CARD_REG_NO_RE.search(payload)
+    return (match.group(1) if match else payload).strip().upper()
+
+
+class GateRecorder:
+    """Buffers gate scans and commits them in batches on a background thread.
+
+    scan() only timestamps the event and queues it, so a burst of scans
+    never waits on the database. The writer commits whatever is queued
+    every `flush_interval` seconds (sooner once `batch_size` are
+    waiting) in one transaction. A batch that fails is kept and retried,
+    never dropped. Once `max_pending` scans are waiting, scan() blocks
+    until the writer catches up instead of growing without bound.
+    """
+
+    def __init__(self, db, gate='MAIN', batch_size=200, flush_interval=0.5, max_pending=10000):
+        self.db = db
+        self.gate = gate
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.events = queue.Queue(max_pending)
+        # lock orders each student's direction with its place in the queue, so
+        # scan() may block on a full queue while holding it; the writer only
+        # ever takes stats_lock, which guards the counters
+        self.lock = threading.Lock()
+        self.stats_lock = threading.Lock()
+        self.recorded = 0
+        self.rejected = 0
+        self.batches = 0
+        self.failed_flushes = 0
+        # Direction for scans without one: toggles per student from the last known state
+        self.inside = {row[0] for row in db.get_inside()}
+        self.stopped = False
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def scan(self, payload, direction=None):
+        """Record one scan; returns (reg_no, direction), or None for an unknown card"""
+        reg_no = parse_card_payload(payload)
+        if not reg_no or not self.db.reg_numbers.contains(reg_no):
+            with self.stats_lock:
+                self.rejected += 1
+            return None
+        with self.lock:
+            if direction is None:
+                direction = 'OUT' if reg_no in self.inside else 'IN'
+            if direction == 'IN':
+                self.inside.add(reg_no)
+            else:
+                self.inside.discard(reg_no)
+            at = datetime.now().isoformat(timespec='milliseconds')
+            self.events.put((reg_no, direction, at, self.gate))
+        return reg_no, direction
+
+    def run(self):
+        batch = []
+        while True:
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    event = self.events.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if event is None:
+                    self.stopped = True
+                    break
+                batch.append(event)
+
+            if batch:
+                try:
+                    self.db.add_gate_events(batch)
+                    for _ in batch:
+                        self.events.task_done()
+                    with self.stats_lock:
+                        self.recorded += len(batch)
+                        self.batches += 1
+                    batch = []
+                except Exception as e:
+                    with self.stats_lock:
+                        self.failed_flushes += 1
+                    print("Gate Error:", e)  # Debugging
+                    time.sleep(self.flush_interval)
+            if self.stopped and not batch:
+                self.events.task_done()
+                return
+
+    def flush(self):
+        """Block until every scan so far is committed"""
+        self.events.join()
+
+    def close(self):
+        self.events.put(None)
+        self.thread.join()
@@ -1,31 +1,41 @@
 from fpdf import FPDF
 import qrcode
 from PIL import Image
+import io
 import os
 from datetime import datetime
 
+from config import Config
+from tracing import span
+
 
 class IDCardGenerator:
-    def __init__(self):
+    def __init__(self, config=None):
+        config = config or Config()
         self.card_width = 85.6  # Standard ID card width in mm
         self.card_height = 54  # Standard ID card height in mm
         self.margin = 5
-        self.logo_path = 'assets/logo.png' if os.path.exists('assets/logo.png') else None
-        self.bg_path = 'assets/bg_pattern.png' if os.path.exists('assets/bg_pattern.png') else None
+        self.logo_path = config.asset('logo.png')
+        self.bg_path = config.asset('bg_pattern.png')
 
     def generate(self, student_data, output_path):
+        with span('card.generate'):
+            return self._generate(student_data, output_path)
+
+    def _generate(self, student_data, output_path):
         try:
-            # Create PDF in landscape orientation
-            pdf = FPDF('L', 'mm', (self.card_width, self.card_height))
-            pdf.add_page()
+            with span('card.artwork'):
+                # Create PDF in landscape orientation
+                pdf = FPDF('L', 'mm', (self.card_width, self.card_height))
+                pdf.add_page()
 
-            # Add background if available
-            if self.bg_path:
-                pdf.image(self.bg_path, 0, 0, self.card_width, self.card_height)
+                # Add background if available
+                if self.bg_path:
+                    pdf.image(self.bg_path, 0, 0, self.card_width, self.card_height)
 
-            # Add college logo if available
-            if self.logo_path:
-                pdf.image(self.logo_path, self.margin, self.margin, 15)
+                # Add college logo if available
+                if self.logo_path:
+                    pdf.image(self.logo_path, self.margin, self.margin, 15)
 
             # Add header
             pdf.set_font('Arial', 'B', 10)
@@ -33,11 +43,12 @@ class IDCardGenerator:
             pdf.cell(0, 5, "UNIVERSITY HOSTEL ID CARD", 0, 1, 'C')
 
             # Add student photo (right side)
-            if os.path.exists(student_data['photo_path']):
-                pdf.image(student_data['photo_path'],
-                          self.card_width - self.margin - 20,  # X position (right side)
-                          self.margin + 10,  # Y position
-                          20, 25)  # Width and height
+            with span('card.photo'):
+                if os.path.exists(student_data['photo_path']):
+                    pdf.image(student_data['photo_path'],
+                              self.card_width - self.margin - 20,  # X position (right side)
+                              self.margin + 10,  # Y position
+                              20, 25)  # Width and height
 
             # Add student information (left side)
             pdf.set_font('Arial', '', 8)
@@ -69,25 +80,27 @@ class IDCardGenerator:
             Valid Until: {student_data['expiry_date']}
             """
 
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_L,
-                box_size=2,
-                border=1,
-            )
-            qr.add_data(qr_data)
-            qr.make(fit=True)
-
-            # Save QR code temporarily
-            qr_img = qr.make_image(fill_color="black", back_color="white")
-            qr_temp_path = 'data/temp_qr.png'
-            qr_img.save(qr_temp_path)
-
-            # Add QR code to ID card
-            pdf.image(qr_temp_path,
-                      self.card_width - self.margin - 15,  # X position
-                      self.card_height - self.margin - 15,  # Y position
-                      15, 15)  # Width and height
+            with span('card.qr'):
+                qr = qrcode.QRCode(
+                    version=1,
+                    error_correction=qrcode.constants.ERROR_CORRECT_L,
+                    box_size=2,
+                    border=1,
+                )
+                qr.add_data(qr_data)
+                qr.make(fit=True)
+
+                # Render QR code in memory so parallel generators never share a temp file
+                qr_img = qr.make_image(fill_color="black", back_color="white")
+                qr_buffer = io.BytesIO()
+                qr_img.save(qr_buffer)
+                qr_buffer.seek(0)
+
+                # Add QR code to ID card
+                pdf.image(qr_buffer,
+                          self.card_width - self.margin - 15,  # X position
+                          self.card_height - self.margin - 15,  # Y position
+                          15, 15)  # Width and height
 
             # Add footer
             pdf.set_font('Arial', 'I', 6)
@@ -95,14 +108,11 @@ class IDCardGenerator:
             pdf.cell(0, 3, f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M')}", 0, 0, 'C')
 
             # Save PDF
-            pdf.output(output_path)
-
-            # Clean up temporary files
-            if os.path.exists(qr_temp_path):
-                os.remove(qr_temp_path)
+            with span('card.output'):
+                pdf.output(output_path)
 
             return True
 
         except Exception as e:
             print(f"Error generating ID card: {str(e)}")
-            return False
\ No newline at end of file
+            return False
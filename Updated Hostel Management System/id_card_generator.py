@@ -2,6 +2,7 @@ from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4, landscape
 from reportlab.lib.utils import ImageReader
 from reportlab.lib.colors import HexColor
+import io
 import os
 from datetime import datetime
 
@@ -52,17 +53,17 @@ def generate_id_card(student_data, photo_path, output_path):
     c.drawString(x + 220, y + card_height - 140, student_data['room_no'])
 
     # Generate and add QR code
-    from qr_generator import generate_qr_code
+    from qr_generator import make_qr_image
     qr_data = f"Student ID: {student_data['registration_no']}\nName: {student_data['first_name']} {student_data['last_name']}\nDepartment: {student_data['department']}"
-    qr_temp_path = os.path.join('data', 'temp_qr.png')
-    generate_qr_code(qr_data, qr_temp_path)
-
-    qr_img = ImageReader(qr_temp_path)
+    # Drawn from memory: no temp file in the working directory for parallel runs to clash on
+    qr_buffer = io.BytesIO()
+    make_qr_image(qr_data).save(qr_buffer)
+    qr_buffer.seek(0)
+    qr_img = ImageReader(qr_buffer)
     c.drawImage(qr_img, x + card_width - 90, y + 50, width=70, height=70)
 
     # Add footer
     c.setFont("Helvetica-Oblique", 8)
     c.drawCentredString(width / 2, y + 20, f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
-    c.save()
-    os.remove(qr_temp_path)  # Clean up temporary QR code file
\ No newline at end of file
+    c.save()
\ No newline at end of file
@@ -1,30 +1,134 @@
+import time
+
+STARTUP_T0 = time.perf_counter()
+
+import argparse
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-from PIL import Image, ImageTk
 from datetime import datetime, timedelta
 import os
-from database import Database
-from id_card import IDCardGenerator
+import queue
+import threading
+import prefix_index
+import tracing
+from config import Config
 from validator import Validator
 
+# PIL, id_card (fpdf, qrcode) and database are imported on first use so the
+# window can appear before they load.
+
+
+# Filter bar: keystroke debounce and how many matches to render
+SEARCH_DEBOUNCE_MS = 250
+SEARCH_PAGE_SIZE = 200
+
+# How often the main loop checks for a finished background search
+SEARCH_POLL_MS = 25
+
+# Rows inserted into the students list per event-loop tick while loading
+LOAD_BATCH_SIZE = 500
+
+# Dashboard refresh interval while its tab is showing
+DASHBOARD_REFRESH_MS = 5000
+
+
+class StartupTimer:
+    """Records named startup phases and prints how long each one took"""
+
+    def __init__(self, t0):
+        self.t0 = t0
+        self.last = t0
+        self.phases = []
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def report(self):
+        lines = ["Startup timing:"]
+        for phase, seconds in self.phases:
+            lines.append(f"  {phase:<24}{seconds * 1000:9.1f} ms")
+        lines.append(f"  {'total':<24}{(self.last - self.t0) * 1000:9.1f} ms")
+        return "\n".join(lines)
+
 
 class StylishHostelApp:
-    def __init__(self, root):
+    def __init__(self, root, timer=None, startup_report=False, server_url=None, server_token=None,
+                 hostel=None, config=None):
         self.root = root
         self.root.title("🏠 Hostel Management System")
         self.root.geometry("1000x700")
         self.root.configure(bg="#f0f2f5")
+        self.timer = timer or StartupTimer(time.perf_counter())
+        self.startup_report = startup_report
+        self.server_url = server_url
+        self.server_token = server_token
+        self.hostel = hostel
+        self.config = config or Config()
 
         # Initialize components
         self.setup_styles()
-        self.db = Database()
-        self.id_gen = IDCardGenerator()
-
-        # Setup UI
+        self.timer.mark("styles")
+        self.db = None
+        self.dup_detector = None
+        self._id_gen = None
+        self.student_index = prefix_index.PrefixIndex()
+        self.student_index_seq = None
+        self.students_tree = None
+        self.student_cb = None
+        self.dashboard_frame = None
+        self.load_generation = 0
+
+        # Setup UI (only the visible tab is built now)
         self.setup_ui()
-
-        # Load initial data
-        self.load_students()
+        self.timer.mark("ui (visible tab)")
+
+        # Open the database and stream students in once the first frame is drawn
+        # (the idle callback runs after the pending redraws queued above)
+        self.root.after_idle(self.root.after, 0, self.finish_startup)
+
+    def finish_startup(self):
+        """Second startup phase, run after the window has been painted"""
+        self.timer.mark("first frame")
+        from duplicates import DuplicateDetector
+
+        if self.server_url:
+            # Thin client: a desk talking to server.py
+            from client import RemoteDatabase
+            self.db = RemoteDatabase(self.server_url, token=self.server_token)
+        else:
+            from database import Database
+            if self.hostel:
+                from partitions import open_hostel
+                self.db = open_hostel(self.hostel, self.config)
+            else:
+                self.db = Database(config=self.config)
+            # Opt-in: desks sharing a database file would each snapshot and rotate the same backups/
+            if self.config.desk_backup_hours > 0:
+                from backup import BackupManager, BackupScheduler
+                self.backups = BackupScheduler(BackupManager(self.db),
+                                               interval=self.config.desk_backup_hours * 3600)
+                self.backups.start()
+        self.dup_detector = DuplicateDetector(self.db)
+        self.dup_detector.preload()
+        self.db.reg_numbers.preload()
+        self.timer.mark("database")
+
+        self.load_students(on_done=self.on_initial_load_done)
+
+    def on_initial_load_done(self):
+        self.timer.mark("initial student load")
+        if self.startup_report:
+            print(self.timer.report())
+
+    @property
+    def id_gen(self):
+        # fpdf and qrcode are only needed once a card is generated
+        if self._id_gen is None:
+            from id_card import IDCardGenerator
+            self._id_gen = IDCardGenerator(self.config)
+        return self._id_gen
 
     def setup_styles(self):
         """Configure custom styles for the application"""
@@ -79,10 +183,27 @@ class StylishHostelApp:
         self.notebook = ttk.Notebook(main_frame)
         self.notebook.pack(fill=tk.BOTH, expand=True)
 
-        # Setup tabs
+        # Setup tabs; all but the first are built when first selected
+        self.tab_builders = {}
         self.setup_registration_tab()
-        self.setup_students_tab()
-        self.setup_id_card_tab()
+        self.add_lazy_tab("👥 View Students", self.setup_students_tab)
+        self.add_lazy_tab("🪪 Generate ID Card", self.setup_id_card_tab)
+        self.add_lazy_tab("📊 Dashboard", self.setup_dashboard_tab)
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
+
+    def add_lazy_tab(self, text, builder):
+        """Add an empty tab whose contents are built on first selection"""
+        frame = ttk.Frame(self.notebook)
+        self.notebook.add(frame, text=text)
+        self.tab_builders[str(frame)] = (frame, builder)
+
+    def on_tab_changed(self, event=None):
+        pending = self.tab_builders.pop(self.notebook.select(), None)
+        if pending:
+            frame, builder = pending
+            builder(frame)
+        elif self.dashboard_frame is not None and self.notebook.select() == str(self.dashboard_frame):
+            self.refresh_dashboard(reschedule=False)
 
     def setup_registration_tab(self):
         """Setup the student registration tab"""
@@ -96,7 +217,7 @@ class StylishHostelApp:
             ("Last Name*:", "last_name"),
             ("Father's Name*:", "father_name"),
             ("Department*:", "department"),
-            ("Room No*:", "room_no"),
+            ("Room No* (AUTO = free bed):", "room_no"),
             ("Phone*:", "phone"),
             ("Email:", "email"),
             ("Address:", "address"),
@@ -110,6 +231,11 @@ class StylishHostelApp:
             entry.grid(row=i, column=1, padx=5, pady=5, sticky=tk.EW)
             self.entries[name] = entry
 
+        # Live uniqueness feedback for the registration number
+        self.reg_status = ttk.Label(reg_frame, text="", font=('Helvetica', 9))
+        self.reg_status.grid(row=0, column=3, padx=5, pady=5, sticky=tk.W)
+        self.entries['registration_no'].bind('<KeyRelease>', self.check_registration_no)
+
         # Photo upload section
         self.photo_path = ""
         self.photo_preview = ttk.Label(reg_frame, relief=tk.SUNKEN, background='white')
@@ -127,10 +253,27 @@ class StylishHostelApp:
         # Grid configuration
         reg_frame.grid_columnconfigure(1, weight=1)
 
-    def setup_students_tab(self):
+    def setup_students_tab(self, students_frame):
         """Setup the students list tab"""
-        students_frame = ttk.Frame(self.notebook)
-        self.notebook.add(students_frame, text="👥 View Students")
+        # Filter bar
+        filter_frame = ttk.Frame(students_frame)
+        filter_frame.pack(fill=tk.X, padx=10, pady=(10, 0))
+
+        ttk.Label(filter_frame, text="🔍 Filter (reg no, name, department, room):").pack(side=tk.LEFT)
+        self.filter_var = tk.StringVar()
+        self.filter_var.trace_add('write', self.on_filter_change)
+        ttk.Entry(filter_frame, textvariable=self.filter_var).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+
+        self.filter_status = ttk.Label(filter_frame, text="")
+        self.filter_status.pack(side=tk.LEFT)
+
+        self.filter_job = None
+        self.search_generation = 0
+        self.search_conn = None
+        # Worker threads never touch Tk: they post (generation, rows, error) here
+        self.search_results = queue.Queue()
+        self.search_poll_job = None
+        self.search_running = False
 
         # Treeview with scrollbars
         tree_frame = ttk.Frame(students_frame)
@@ -166,20 +309,23 @@ class StylishHostelApp:
 
         # Refresh button
         ttk.Button(students_frame, text="🔄 Refresh List",
-                   command=self.load_students,
+                   command=self.refresh_students,
                    style='Secondary.TButton').pack(pady=5)
 
-    def setup_id_card_tab(self):
-        """Setup the ID card generation tab"""
-        id_frame = ttk.Frame(self.notebook)
-        self.notebook.add(id_frame, text="🪪 Generate ID Card")
+        if self.db is not None:
+            self.load_students()
 
+    def setup_id_card_tab(self, id_frame):
+        """Setup the ID card generation tab"""
         # Student selection
         ttk.Label(id_frame, text="Select Student:").grid(row=0, column=0, padx=5, pady=5)
 
+        # Type-ahead: the drop-down only ever holds the top matches for what was typed
         self.student_var = tk.StringVar()
-        self.student_cb = ttk.Combobox(id_frame, textvariable=self.student_var, state='readonly')
+        self.student_cb = ttk.Combobox(id_frame, textvariable=self.student_var,
+                                       postcommand=self.update_student_suggestions)
         self.student_cb.grid(row=0, column=1, padx=5, pady=5, sticky=tk.EW)
+        self.student_cb.bind('<KeyRelease>', self.update_student_suggestions)
 
         # Buttons
         ttk.Button(id_frame, text="👀 Preview ID Card",
@@ -198,6 +344,100 @@ class StylishHostelApp:
         id_frame.grid_columnconfigure(1, weight=1)
         id_frame.grid_rowconfigure(2, weight=1)
 
+    def setup_dashboard_tab(self, dashboard_frame):
+        """Setup the statistics dashboard tab"""
+        self.dashboard_frame = dashboard_frame
+
+        # Headline figures
+        summary_frame = ttk.Frame(dashboard_frame)
+        summary_frame.pack(fill=tk.X, padx=10, pady=10)
+
+        self.dashboard_labels = {}
+        for i, (name, text) in enumerate((('students', "Students"),
+                                          ('expiring_this_month', "Expiring this month"),
+                                          ('expired_before_this_month', "Expired earlier"),
+                                          ('beds', "Beds"),
+                                          ('free_beds', "Free beds"))):
+            ttk.Label(summary_frame, text=text).grid(row=0, column=i, padx=15)
+            value = ttk.Label(summary_frame, text="-", font=('Helvetica', 16, 'bold'))
+            value.grid(row=1, column=i, padx=15)
+            self.dashboard_labels[name] = value
+
+        # Per-department and per-block tables
+        tables_frame = ttk.Frame(dashboard_frame)
+        tables_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        self.department_tree = ttk.Treeview(tables_frame, columns=("dept", "students"), show="headings")
+        self.department_tree.heading("dept", text="Department")
+        self.department_tree.heading("students", text="Students")
+        self.department_tree.column("students", width=80, anchor=tk.E)
+
+        self.block_tree = ttk.Treeview(tables_frame, columns=("block", "rooms", "beds", "occupied", "free"),
+                                       show="headings")
+        for column, text in (("block", "Block"), ("rooms", "Rooms"), ("beds", "Beds"),
+                             ("occupied", "Occupied"), ("free", "Free")):
+            self.block_tree.heading(column, text=text)
+            self.block_tree.column(column, width=80, anchor=tk.E if column != "block" else tk.W)
+
+        # Tomorrow's kitchen headcount, read from the precomputed meal counts
+        self.meal_tree = ttk.Treeview(tables_frame, columns=("block", "breakfast", "lunch", "dinner"),
+                                      show="headings", height=5)
+        for column in ("block", "breakfast", "lunch", "dinner"):
+            self.meal_tree.heading(column, text=column.title())
+            self.meal_tree.column(column, width=80, anchor=tk.E if column != "block" else tk.W)
+        self.meal_label = ttk.Label(tables_frame, text="Meals tomorrow")
+
+        self.department_tree.grid(row=0, column=0, rowspan=3, sticky=tk.NSEW, padx=(0, 5))
+        self.block_tree.grid(row=0, column=1, sticky=tk.NSEW, padx=(5, 0))
+        self.meal_label.grid(row=1, column=1, sticky=tk.W, padx=(5, 0), pady=(10, 0))
+        self.meal_tree.grid(row=2, column=1, sticky=tk.NSEW, padx=(5, 0))
+        tables_frame.grid_columnconfigure(0, weight=1)
+        tables_frame.grid_columnconfigure(1, weight=1)
+        tables_frame.grid_rowconfigure(0, weight=1)
+
+        ttk.Button(dashboard_frame, text="🔄 Refresh",
+                   command=lambda: self.refresh_dashboard(reschedule=False),
+                   style='Secondary.TButton').pack(pady=5)
+
+        self.refresh_dashboard()
+
+    def refresh_dashboard(self, reschedule=True):
+        """Redraw the dashboard from the summary tables (a handful of row reads)"""
+        if self.db is not None:
+            stats = self.db.get_stats()
+            for name, label in self.dashboard_labels.items():
+                label.config(text=f"{stats[name]:,}")
+
+            self.department_tree.delete(*self.department_tree.get_children())
+            for department, count in stats['departments']:
+                self.department_tree.insert("", tk.END, values=(department, count))
+
+            self.block_tree.delete(*self.block_tree.get_children())
+            for block in stats['blocks']:
+                self.block_tree.insert("", tk.END, values=(block[0] or "-", *block[1:]))
+
+            from database import MEALS
+            tomorrow = (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
+            meals = {}
+            for block, meal, booked in self.db.get_meal_counts(tomorrow):
+                meals.setdefault(block, dict.fromkeys(MEALS, 0))[meal] = booked
+            self.meal_label.config(text=f"Meals tomorrow ({tomorrow})")
+            self.meal_tree.delete(*self.meal_tree.get_children())
+            for block, counts in meals.items():
+                self.meal_tree.insert("", tk.END, values=(block or "-", *counts.values()))
+            if meals:
+                self.meal_tree.insert("", tk.END, values=("Total", *(sum(counts[meal] for counts in meals.values())
+                                                                     for meal in MEALS)))
+
+        # Keep refreshing only while the dashboard is the visible tab
+        if reschedule:
+            self.root.after(DASHBOARD_REFRESH_MS, self.poll_dashboard)
+
+    def poll_dashboard(self):
+        if self.notebook.select() == str(self.dashboard_frame):
+            self.refresh_dashboard(reschedule=False)
+        self.root.after(DASHBOARD_REFRESH_MS, self.poll_dashboard)
+
     def upload_photo(self):
         """Handle photo upload for student registration"""
         file_path = filedialog.askopenfilename(
@@ -206,9 +446,11 @@ class StylishHostelApp:
 
         if file_path:
             try:
+                from PIL import Image
+
                 # Save to images folder
                 filename = f"student_{datetime.now().strftime('%Y%m%d%H%M%S')}.jpg"
-                save_path = os.path.join('data', 'images', filename)
+                save_path = os.path.join(self.config.images_dir, filename)
 
                 # Process image
                 img = Image.open(file_path)
@@ -224,11 +466,24 @@ class StylishHostelApp:
 
     def update_photo_preview(self, img):
         """Update the photo preview label"""
+        from PIL import ImageTk
         img.thumbnail((150, 150))
         photo = ImageTk.PhotoImage(img)
         self.photo_preview.config(image=photo)
         self.photo_preview.image = photo
 
+    def check_registration_no(self, event=None):
+        """Flag taken or malformed registration numbers while typing"""
+        reg_no = self.entries['registration_no'].get().strip().upper()
+        if not reg_no or self.db is None:
+            self.reg_status.config(text="")
+        elif not Validator.validate_registration_no(reg_no):
+            self.reg_status.config(text="Invalid format", foreground='#7f8c8d')
+        elif self.db.reg_numbers.contains(reg_no):
+            self.reg_status.config(text="⚠ Already registered", foreground='#c0392b')
+        else:
+            self.reg_status.config(text="✔ Available", foreground='#27ae60')
+
     def validate_form(self):
         """Validate the registration form data"""
         required = {
@@ -281,14 +536,31 @@ class StylishHostelApp:
                                 timedelta(days=365)).strftime('%Y-%m-%d')
             }
 
-            # Add to database
-            if self.db.add_student(student_data):
-                messagebox.showinfo("Success", "Student registered successfully!")
+            # Warn about likely duplicates before writing
+            matches = self.dup_detector.find_matches(student_data)
+            if matches:
+                details = "\n".join(f"- {reg_no} (similarity {score:.0%})" for score, reg_no in matches[:5])
+                if not messagebox.askyesno("Possible Duplicate",
+                                           f"This student looks similar to:\n{details}\n\n"
+                                           "Register anyway?"):
+                    return
+
+            # Add to database; AUTO takes the first free bed in the same transaction
+            allocate = student_data['room_no'] == 'AUTO'
+            if self.db.add_student(student_data, allocate=allocate):
+                prefix_index.add_student(self.student_index, student_data['registration_no'],
+                                         student_data['first_name'], student_data['last_name'])
+                message = "Student registered successfully!"
+                if allocate:
+                    room_no = self.db.get_student(student_data['registration_no'])[5]
+                    message += f"\nAllocated room: {room_no}"
+                messagebox.showinfo("Success", message)
                 self.clear_form()
-                self.load_students()
+                self.refresh_students()
             else:
                 messagebox.showerror("Error", "Registration failed! Possible reasons:\n"
                                               "- Registration number already exists\n"
+                                              "- Room is full (or no free bed for AUTO)\n"
                                               "- Database error")
 
         except ValueError as e:
@@ -303,21 +575,147 @@ class StylishHostelApp:
         self.photo_preview.config(image='')
         self.photo_preview.image = None
         self.photo_path = ""
+        self.reg_status.config(text="")
 
-    def load_students(self):
-        """Load students from database and update UI"""
-        # Clear existing data
-        for item in self.students_tree.get_children():
-            self.students_tree.delete(item)
+    def load_students(self, on_done=None):
+        """Load students from database and update UI.
 
-        # Get students from database
-        students = self.db.get_all_students()
+        Rows are streamed in batches from the event loop so the window stays
+        responsive; starting a new load abandons the previous one.
+        """
+        self.load_generation += 1
+
+        # Clear existing data
+        if self.students_tree is not None:
+            self.students_tree.delete(*self.students_tree.get_children())
 
         # Update counter
-        self.student_counter.config(text=f"Total Students: {len(students)}")
+        self.student_counter.config(text=f"Total Students: {self.db.count_students()}")
+
+        # Archived, moved and renamed students leave the type-ahead; this load adds the current rows
+        if self.student_index_seq is None:
+            self.student_index_seq = self.db.get_change_seq()
+        else:
+            self.student_index_seq = prefix_index.apply_changes(
+                self.student_index, self.db.iter_changes(self.student_index_seq), self.student_index_seq)
+
+        batches = self.db.iter_students(LOAD_BATCH_SIZE)
+        self.root.after(0, self.load_next_batch, batches, self.load_generation, on_done)
+
+    def load_next_batch(self, batches, generation, on_done):
+        if generation != self.load_generation:
+            batches.close()
+            return
+
+        students = next(batches, None)
+        if students is None:
+            self.update_student_suggestions()
+            if on_done:
+                on_done()
+            return
 
         # Populate treeview
+        if self.students_tree is not None:
+            for student in students:
+                self.students_tree.insert("", tk.END, values=(
+                    student[0],  # reg_no
+                    f"{student[1]} {student[2]}",  # name
+                    student[3],  # dept
+                    student[4]  # room
+                ))
+
+        # Update the type-ahead index with students it has not seen yet
         for student in students:
+            if student[0] not in self.student_index:
+                prefix_index.add_student(self.student_index, student[0], student[1], student[2])
+
+        self.root.after(0, self.load_next_batch, batches, generation, on_done)
+
+    def update_student_suggestions(self, event=None):
+        """Show the top matches for the text typed into the student selector"""
+        if self.student_cb is None:
+            return
+        if event is not None and event.keysym in ('Up', 'Down', 'Return', 'Escape'):
+            return
+        self.student_cb['values'] = self.student_index.search(self.student_var.get())
+
+    def refresh_students(self):
+        """Reload the students list, keeping the active filter applied"""
+        if self.students_tree is not None and self.filter_var.get().strip():
+            self.run_filter()
+        else:
+            self.load_students()
+
+    def on_filter_change(self, *args):
+        """Debounce filter keystrokes so only the last one in a burst queries"""
+        if self.filter_job is not None:
+            self.root.after_cancel(self.filter_job)
+        self.filter_job = self.root.after(SEARCH_DEBOUNCE_MS, self.run_filter)
+
+    def run_filter(self):
+        """Start a background search, interrupting any search still running"""
+        self.filter_job = None
+        self.search_generation += 1
+        if self.search_conn is not None:
+            self.search_conn.interrupt()
+
+        term = self.filter_var.get().strip()
+        if not term:
+            self.search_running = False
+            self.filter_status.config(text="")
+            self.load_students()
+            return
+
+        self.search_running = True
+        self.filter_status.config(text="Searching...")
+        threading.Thread(target=self.search_worker,
+                         args=(term, self.search_generation), daemon=True).start()
+        if self.search_poll_job is None:
+            self.search_poll_job = self.root.after(SEARCH_POLL_MS, self.poll_search_results)
+
+    def search_worker(self, term, generation):
+        """Runs off the main thread; results go back through search_results"""
+        try:
+            conn = self.db.connect()
+            self.search_conn = conn
+            try:
+                rows = self.db.search_students(term, SEARCH_PAGE_SIZE, conn=conn)
+            finally:
+                if self.search_conn is conn:
+                    self.search_conn = None
+                conn.close()
+        except Exception as e:
+            # sqlite3.OperationalError locally, RemoteError from a server-side interrupt
+            if 'interrupted' in str(e):
+                return  # Interrupted by newer input
+            self.search_results.put((generation, None, str(e)))
+        else:
+            self.search_results.put((generation, rows, None))
+
+    def poll_search_results(self):
+        """Show the current search's results once its worker has posted them"""
+        self.search_poll_job = None
+        while True:
+            try:
+                generation, rows, error = self.search_results.get_nowait()
+            except queue.Empty:
+                break
+            if generation == self.search_generation:
+                self.search_running = False
+                self.show_search_results(rows, error)
+                return
+            # Older searches' results are dropped
+
+        if self.search_running:
+            self.search_poll_job = self.root.after(SEARCH_POLL_MS, self.poll_search_results)
+
+    def show_search_results(self, rows, error=None):
+        if error is not None:
+            self.filter_status.config(text=f"Search failed: {error}")
+            return
+
+        self.students_tree.delete(*self.students_tree.get_children())
+        for student in rows:
             self.students_tree.insert("", tk.END, values=(
                 student[0],  # reg_no
                 f"{student[1]} {student[2]}",  # name
@@ -325,11 +723,10 @@ class StylishHostelApp:
                 student[4]  # room
             ))
 
-        # Update combobox
-        self.student_cb['values'] = [
-            f"{student[0]} - {student[1]} {student[2]}"
-            for student in students
-        ]
+        if len(rows) >= SEARCH_PAGE_SIZE:
+            self.filter_status.config(text=f"Showing first {SEARCH_PAGE_SIZE} matches")
+        else:
+            self.filter_status.config(text=f"{len(rows)} matches")
 
     def load_demo_data(self):
         """Load demo data for testing"""
@@ -345,7 +742,7 @@ class StylishHostelApp:
                     "phone": "03001234567",
                     "email": "ali.khan@example.com",
                     "address": "Gulshan-e-Iqbal, Karachi",
-                    "photo_path": "data/images/demo1.jpg",
+                    "photo_path": os.path.join(self.config.images_dir, "demo1.jpg"),
                     "join_date": "2023-01-01",
                     "expiry_date": "2024-01-01"
                 },
@@ -359,7 +756,7 @@ class StylishHostelApp:
                     "phone": "03111234567",
                     "email": "sana.ahmed@example.com",
                     "address": "Defence, Lahore",
-                    "photo_path": "data/images/demo2.jpg",
+                    "photo_path": os.path.join(self.config.images_dir, "demo2.jpg"),
                     "join_date": "2023-02-15",
                     "expiry_date": "2024-02-15"
                 }
@@ -372,8 +769,9 @@ class StylishHostelApp:
                     success_count += 1
 
             messagebox.showinfo("Demo Data", f"Successfully loaded {success_count} demo students")
-            self.load_students()
+            self.refresh_students()
 
+    @tracing.traced('ui.generate_id_card')
     def generate_id_card(self):
         """Generate ID card for selected student"""
         selection = self.student_var.get()
@@ -402,7 +800,7 @@ class StylishHostelApp:
             }
 
             # Generate ID card
-            output_dir = os.path.join('data', 'id_cards')
+            output_dir = self.config.id_cards_dir
             os.makedirs(output_dir, exist_ok=True)
             output_path = os.path.join(output_dir, f"{reg_no}_id_card.pdf")
 
@@ -414,6 +812,7 @@ class StylishHostelApp:
         except Exception as e:
             messagebox.showerror("Error", f"Failed to generate ID card: {str(e)}")
 
+    @tracing.traced('ui.preview_id_card')
     def preview_id_card(self):
         """Preview ID card before generation"""
         selection = self.student_var.get()
@@ -442,7 +841,7 @@ class StylishHostelApp:
             }
 
             # Create temporary PDF
-            temp_path = os.path.join('data', 'temp_id_preview.pdf')
+            temp_path = os.path.join(self.config.data_root, 'temp_id_preview.pdf')
             self.id_gen.generate(student_data, temp_path)
 
             # Convert to image for preview
@@ -458,14 +857,17 @@ class StylishHostelApp:
     def show_id_preview(self, pdf_path):
         """Show preview of ID card"""
         try:
+            from PIL import ImageTk
             from pdf2image import convert_from_path
-            images = convert_from_path(pdf_path, first_page=1, last_page=1)
+            with tracing.span('preview.rasterize'):
+                images = convert_from_path(pdf_path, first_page=1, last_page=1)
             if images:
-                img = images[0]
-                img.thumbnail((400, 250))
-                photo = ImageTk.PhotoImage(img)
-                self.id_preview.config(image=photo)
-                self.id_preview.image = photo
+                with tracing.span('preview.display'):
+                    img = images[0]
+                    img.thumbnail((400, 250))
+                    photo = ImageTk.PhotoImage(img)
+                    self.id_preview.config(image=photo)
+                    self.id_preview.image = photo
         except ImportError:
             messagebox.showinfo("Info", "For PDF preview, please install:\n"
                                         "pip install pdf2image poppler")
@@ -474,7 +876,30 @@ class StylishHostelApp:
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hostel Management System")
+    parser.add_argument('--server', help="URL of a server.py instance to use instead of the local database")
+    parser.add_argument('--token', help="shared secret for --server")
+    parser.add_argument('--data-dir', help="data root (default: $HOSTEL_DATA_DIR or ./data)")
+    parser.add_argument('--backup-hours', type=float,
+                        help="snapshot the database from this desk every N hours (default: "
+                             "$HOSTEL_DESK_BACKUP_HOURS or off; use server.py --backup-hours for shared files)")
+    parser.add_argument('--hostel', help="use one hostel's database (DATA_DIR/hostels/NAME/hostel.db)")
+    parser.add_argument('--startup-report', action='store_true', help="print startup timing by phase")
+    parser.add_argument('--trace', metavar='DIR', nargs='?', const='',
+                        help="record timing spans and slow queries; the session report is written to DIR "
+                             "(default DATA_DIR/traces) on exit")
+    parser.add_argument('--slow-ms', type=float, default=tracing.SLOW_QUERY_MS,
+                        help="slow-query log threshold with --trace")
+    args = parser.parse_args()
+    config = Config(data_root=args.data_dir, desk_backup_hours=args.backup_hours)
+
+    trace_report = tracing.enable_from_env(os.path.join(config.data_root, 'traces'))
+    if args.trace is not None:
+        trace_report = tracing.enable(args.trace or os.path.join(config.data_root, 'traces'), args.slow_ms)
+
     # Create and run application
+    timer = StartupTimer(STARTUP_T0)
+    timer.mark("imports")
     root = tk.Tk()
 
     # Center the window
@@ -487,7 +912,13 @@ if __name__ == "__main__":
     root.geometry(f'{window_width}x{window_height}+{x}+{y}')
 
     # Initialize application
-    app = StylishHostelApp(root)
+    app = StylishHostelApp(root, timer=timer, startup_report=args.startup_report,
+                           server_url=args.server, server_token=args.token, hostel=args.hostel,
+                           config=config)
 
     # Start main loop
-    root.mainloop()
\ No newline at end of file
+    root.mainloop()
+
+    if trace_report:
+        print(tracing.tracer.format_report())
+        print("Trace report:", tracing.tracer.export(trace_report))
\ No newline at end of file
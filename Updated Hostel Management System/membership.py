@@ -0,0 +1,115 @@
+import hashlib
+import math
+import threading
+
+# Seconds between change log syncs; lookups never wait on them
+SYNC_INTERVAL = 1.0
+
+
+class BloomFilter:
+    """Fixed-size probabilistic set: no false negatives, tunable false positives"""
+
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(capacity, 1)
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class RegistrationIndex:
+    """In-memory membership of every registration number in the students table.
+
+    Uses a plain set, or a Bloom filter once the table is larger than
+    bloom_threshold. Bloom hits are confirmed with a single indexed lookup,
+    so answers are always exact. Lookups are answered from memory only:
+    once loaded, a background thread applies the change log every
+    sync_interval seconds, so archivals, restores, moves and other desks'
+    registrations show up within that interval (this desk's own inserts
+    at once, through add()).
+    """
+
+    def __init__(self, db, bloom_threshold=1_000_000, sync_interval=SYNC_INTERVAL):
+        self.db = db
+        self.bloom_threshold = bloom_threshold
+        self.sync_interval = sync_interval
+        self.members = None
+        self.is_bloom = False
+        self.change_seq = 0
+        self.lock = threading.Lock()
+        self.syncer = None
+        self.stopping = threading.Event()
+
+    def preload(self):
+        """Fill the index on a background thread"""
+        threading.Thread(target=self.load, daemon=True).start()
+
+    def load(self):
+        with self.lock:
+            if self.members is not None:
+                return
+            # Changes from here on are replayed by sync(); replaying one the load saw is harmless
+            self.change_seq = self.db.get_change_seq()
+            count = self.db.count_students()
+            if count > self.bloom_threshold:
+                members = BloomFilter(int(count * 1.5))
+                self.is_bloom = True
+            else:
+                members = set()
+            for reg_no in self.db.iter_registration_numbers():
+                members.add(reg_no.upper())
+            self.members = members
+            if self.sync_interval and self.syncer is None:
+                self.syncer = threading.Thread(target=self.run_sync, daemon=True)
+                self.syncer.start()
+
+    def run_sync(self):
+        while not self.stopping.wait(self.sync_interval):
+            try:
+                self.sync()
+            except Exception as e:
+                print("Database Error:", e)  # Debugging
+
+    def stop(self):
+        self.stopping.set()
+
+    def add(self, reg_no):
+        # Writes before the first load are picked up by the load itself
+        with self.lock:
+            if self.members is not None:
+                self.members.add(reg_no.strip().upper())
+
+    def sync(self):
+        """Apply inserts and deletes logged since the last sync, from any writer"""
+        with self.lock:
+            if self.members is None:
+                return
+            for seq, op, reg_no, _, _ in self.db.iter_changes(self.change_seq):
+                self.change_seq = seq
+                if op == 'INSERT':
+                    self.members.add(reg_no.upper())
+                elif op == 'DELETE' and not self.is_bloom:
+                    # A Bloom filter cannot forget; its hits are confirmed below instead
+                    self.members.discard(reg_no.upper())
+
+    def contains(self, reg_no):
+        reg_no = reg_no.strip().upper()
+        if self.members is None:
+            self.load()
+        if reg_no not in self.members:
+            return False
+        if self.is_bloom:
+            return self.db.get_student(reg_no) is not None
+        return True
@@ -0,0 +1,312 @@
+import os
+import re
+import sqlite3
+from datetime import datetime
+from urllib.parse import quote
+
+from config import Config
+from database import Database, STUDENT_COLUMNS, BUSY_TIMEOUT
+from tracing import connection_factory, traced_methods
+
+# One directory per hostel under the data root: hostels/<NAME>/hostel.db (archive.db beside it)
+
+# SQLite's default compile-time limit on attached databases per connection
+MAX_ATTACHED = 10
+
+
+class RegistrationConflict(Exception):
+    """The registration number is already registered in another hostel"""
+
+    def __init__(self, reg_no, hostel):
+        super().__init__(f"{reg_no} is registered in hostel {hostel}")
+        self.hostel = hostel
+
+HOSTEL_NAME_RE = re.compile(r'^[A-Z0-9_]{1,20}$')
+
+
+def hostel_db_path(name, root=None):
+    if not HOSTEL_NAME_RE.match(name.upper()):
+        raise ValueError(f"Invalid hostel name: {name!r} (letters, digits and _ only)")
+    return os.path.join(root or Config().hostels_dir, name.upper(), 'hostel.db')
+
+
+def open_hostel(name, config=None):
+    """One hostel's Database, sharing the data root and assets of `config`"""
+    config = config or Config()
+    return Database(config=config.for_db(hostel_db_path(name, config.hostels_dir), name.upper()))
+
+
+@traced_methods('federation')
+class HostelFederation:
+    """Several hostels, one SQLite file each.
+
+    Writes go through the hostel's own Database, so desks in different
+    hostels never queue on one write lock. Reads that span hostels run on
+    one connection with every file ATTACHed read-only and UNION ALL over
+    them; federated rows carry the hostel name first.
+    """
+
+    def __init__(self, config=None, names=None):
+        self.config = config or Config()
+        self.root = self.config.hostels_dir
+        if names is None:
+            # In-memory federations start empty; add hostels with add_hostel()
+            names = [] if self.config.memory or not os.path.isdir(self.root) else sorted(
+                entry.name for entry in os.scandir(self.root)
+                if os.path.exists(os.path.join(entry.path, 'hostel.db')))
+        self.partitions = {}
+        for name in names:
+            self.add_hostel(name)
+
+    def add_hostel(self, name):
+        """Open (creating if needed) one hostel's database"""
+        name = name.upper()
+        if name not in self.partitions:
+            db_path = hostel_db_path(name, self.root)
+            if len(self.partitions) == MAX_ATTACHED:
+                raise ValueError(f"At most {MAX_ATTACHED} hostels can be queried together")
+            self.partitions[name] = Database(config=self.config.for_db(db_path, name))
+        return self.partitions[name]
+
+    def hostel(self, name):
+        try:
+            return self.partitions[name.upper()]
+        except KeyError:
+            raise KeyError(f"Unknown hostel: {name}") from None
+
+    @staticmethod
+    def schema(name):
+        return f"h_{name}"
+
+    def connect(self):
+        """Read-only connection with every hostel attached as h_<NAME>"""
+        conn = sqlite3.connect('file::memory:', uri=True, timeout=BUSY_TIMEOUT, factory=connection_factory())
+        for name, db in self.partitions.items():
+            path = db.db_path if db.config.memory else f"file:{quote(os.path.abspath(db.db_path))}?mode=ro"
+            conn.execute(f"ATTACH DATABASE ? AS {self.schema(name)}", (path,))
+        return conn
+
+    def union(self, select, params=()):
+        """UNION ALL of `select` (with a {schema} placeholder) over every hostel.
+
+        Each branch is prefixed with the hostel name; positional params are
+        repeated per branch.
+        """
+        branches = [f"SELECT '{name}' AS hostel, * FROM ({select.format(schema=self.schema(name))})"
+                    for name in self.partitions]
+        return " UNION ALL ".join(branches), list(params) * len(branches)
+
+    def locate(self, reg_no):
+        """Names of the hostels holding this registration number (normally zero or one)"""
+        if not self.partitions:
+            return []
+        query, params = self.union("SELECT 1 FROM {schema}.students WHERE registration_no = ?", (reg_no.upper(),))
+        conn = self.connect()
+        try:
+            return [row[0] for row in conn.execute(query, params)]
+        finally:
+            conn.close()
+
+    def get_student(self, reg_no):
+        """(hostel, *get_student row) or None"""
+        for name in self.locate(reg_no):
+            return (name,) + self.partitions[name].get_student(reg_no.upper())
+        return None
+
+    def add_student(self, hostel, student_data, allocate=False, block=None):
+        """Register into one hostel, refusing a registration number another hostel holds.
+
+        Raises RegistrationConflict naming the hostel that holds it. That
+        check only gives a clearer error; the registry claim made inside
+        the insert (Database.init_registry) is what stops two desks
+        registering one number in two hostels at once, and loses as a
+        plain False like any other failed insert.
+        """
+        reg_no = student_data['registration_no'].strip().upper()
+        for name in self.locate(reg_no):
+            raise RegistrationConflict(reg_no, name)
+        return self.hostel(hostel).add_student(student_data, allocate, block)
+
+    def search_students(self, term, limit=200):
+        """Prefix search across hostels: (hostel, reg_no, first, last, department, room_no)"""
+        if not self.partitions:
+            return []
+        term = term.replace('%', '').replace('_', '').strip()
+        branches = []
+        params = {} if ' ' not in term.strip() else []
+        for name in self.partitions:
+            query, branch_params = Database.search_query(f"{self.schema(name)}.students", term, limit)
+            branches.append(f"SELECT '{name}' AS hostel, * FROM ({query})")
+            if isinstance(params, dict):
+                params.update(branch_params)
+            else:
+                params.extend(branch_params)
+
+        conn = self.connect()
+        try:
+            if isinstance(params, dict):
+                params['outer_limit'] = limit
+                return conn.execute(" UNION ALL ".join(branches) + " LIMIT :outer_limit", params).fetchall()
+            return conn.execute(" UNION ALL ".join(branches) + " LIMIT ?", params + [limit]).fetchall()
+        finally:
+            conn.close()
+
+    def iter_student_records(self, batch_size=1000, columns=None, filters=None):
+        """Stream students of every hostel, hostel by hostel; 'hostel' may be used as a column"""
+        columns = tuple(columns or ('hostel',) + STUDENT_COLUMNS)
+        unknown = [column for column in columns if column not in ('hostel', 'version') + STUDENT_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+        if not self.partitions:
+            return
+        where, params = Database.record_filters(filters)
+
+        branches = []
+        for name in self.partitions:
+            select = ", ".join(f"'{name}'" if column == 'hostel' else column for column in columns)
+            branches.append(f"SELECT {select} FROM {self.schema(name)}.students {where}")
+
+        conn = self.connect()
+        try:
+            c = conn.execute(" UNION ALL ".join(branches), params * len(branches))
+            while True:
+                rows = c.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            conn.close()
+
+    def count_students(self):
+        return sum(count for _, count in self.get_hostel_counts())
+
+    def get_hostel_counts(self):
+        """(hostel, students) from each hostel's summary table"""
+        if not self.partitions:
+            return []
+        query, params = self.union("SELECT value FROM {schema}.stats_totals WHERE name = 'students'")
+        conn = self.connect()
+        try:
+            return conn.execute(query, params).fetchall()
+        finally:
+            conn.close()
+
+    def count_expiring(self, before_date):
+        return sum(db.count_expiring(before_date) for db in self.partitions.values())
+
+    def get_stats(self, month=None):
+        """Database.get_stats figures summed over hostels, plus per-hostel totals.
+
+        Blocks are reported as HOSTEL/BLOCK. Everything is read from the
+        hostels' summary tables in one attached connection.
+        """
+        month = month or datetime.now().strftime('%Y-%m')
+        stats = {'students': 0, 'month': month, 'expiring_this_month': 0, 'expired_before_this_month': 0,
+                 'departments': [], 'blocks': [], 'beds': 0, 'free_beds': 0, 'hostels': []}
+        if not self.partitions:
+            return stats
+
+        conn = self.connect()
+        try:
+            stats['hostels'] = conn.execute(*self.union(
+                "SELECT value FROM {schema}.stats_totals WHERE name = 'students'")).fetchall()
+            stats['students'] = sum(count for _, count in stats['hostels'])
+
+            query, params = self.union("SELECT month, students FROM {schema}.stats_expiry_months")
+            stats['expiring_this_month'], stats['expired_before_this_month'] = conn.execute(
+                f'''SELECT COALESCE(SUM(CASE WHEN month = ? THEN students END), 0),
+                           COALESCE(SUM(CASE WHEN month < ? THEN students END), 0)
+                    FROM ({query})''', [month, month] + params).fetchone()
+
+            query, params = self.union("SELECT department, students FROM {schema}.stats_departments")
+            stats['departments'] = conn.execute(
+                f'''SELECT department, SUM(students) FROM ({query}) GROUP BY department
+                    HAVING SUM(students) > 0 ORDER BY 2 DESC, department''', params).fetchall()
+
+            query, params = self.union("SELECT block, rooms, beds, occupied, free FROM {schema}.stats_blocks "
+                                       "WHERE rooms > 0")
+            stats['blocks'] = [(f"{hostel}/{block}" if block else hostel, *counts)
+                               for hostel, block, *counts in conn.execute(query, params)]
+        finally:
+            conn.close()
+        stats['beds'] = sum(block[2] for block in stats['blocks'])
+        stats['free_beds'] = sum(block[4] for block in stats['blocks'])
+        return stats
+
+    def move_student(self, reg_no, to_hostel, room_no=None):
+        """Move a student to another hostel; returns the new room_no, or None if not found.
+
+        Runs as one write transaction on the destination with the source
+        ATTACHed: the row is copied (room_no replaced, or the first free bed
+        when room_no is None), removed from the source, and any fee balance
+        is carried over as a pair of adjustments, since both ledgers are
+        append-only. In rollback-journal mode the commit is atomic across
+        both files. Under WAL it is atomic per file, so a move cut short by
+        a crash can leave the student in both hostels; running the same move
+        again finishes it. Both adjustments carry a move_id naming the source
+        row (hostel and AUTOINCREMENT id, never reused), so the re-run skips
+        whatever the first attempt already posted.
+        """
+        reg_no = reg_no.upper()
+        to_hostel = to_hostel.upper()
+        dest = self.hostel(to_hostel)
+        sources = [name for name in self.locate(reg_no) if name != to_hostel]
+        if not sources:
+            return None
+        from_hostel = sources[0]
+        copied = ", ".join(column for column in STUDENT_COLUMNS + ('phone_norm', 'email_norm')
+                           if column != 'room_no')
+        posted_at = datetime.now().isoformat(timespec='seconds')
+
+        def move(c):
+            c.execute("SELECT id FROM src.students WHERE registration_no = ?", (reg_no,))
+            source = c.fetchone()
+            if source is None:
+                return None
+            move_id = f"{from_hostel}:{source[0]}"
+            # Hand the claim over first, so the insert's claim check passes
+            c.execute("""INSERT INTO registry.registrations (registration_no, hostel) VALUES (?, ?)
+                         ON CONFLICT(registration_no) DO UPDATE SET hostel = excluded.hostel""",
+                      (reg_no, to_hostel))
+            c.execute("SELECT room_no FROM main.students WHERE registration_no = ?", (reg_no,))
+            existing = c.fetchone()
+            if existing is None:
+                target = room_no or dest.find_free_room(conn=c)
+                if target is None:
+                    raise sqlite3.IntegrityError(f"no free bed in hostel {to_hostel}")
+                c.execute(f'''INSERT INTO main.students ({copied}, room_no, version)
+                              SELECT {copied}, ?, version + 1 FROM src.students WHERE registration_no = ?''',
+                          (target.upper(), reg_no))
+                if c.rowcount != 1:
+                    return None
+            else:
+                # Finishing an interrupted move: the copy already committed
+                target = existing[0]
+            c.execute("DELETE FROM src.students WHERE registration_no = ?", (reg_no,))
+
+            c.execute("SELECT balance FROM src.fee_balances WHERE registration_no = ?", (reg_no,))
+            balance = c.fetchone()
+            if balance and balance[0]:
+                # OR IGNORE: the unique (registration_no, move_id) index skips a side already posted
+                c.execute('''INSERT OR IGNORE INTO src.fee_ledger
+                                 (registration_no, entry_type, amount, description, posted_at, balance_after, move_id)
+                             VALUES (?, 'ADJUSTMENT', ?, ?, ?, 0, ?)''',
+                          (reg_no, -balance[0], f"Transferred to {to_hostel}", posted_at, move_id))
+                c.execute('''INSERT OR IGNORE INTO main.fee_ledger
+                                 (registration_no, entry_type, amount, description, posted_at, balance_after, move_id)
+                             VALUES (?, 'ADJUSTMENT', ?, ?, ?,
+                                     COALESCE((SELECT balance FROM main.fee_balances
+                                               WHERE registration_no = ?), 0) + ?, ?)''',
+                          (reg_no, balance[0], f"Transferred from {from_hostel}", posted_at, reg_no, balance[0],
+                           move_id))
+            return target
+
+        try:
+            moved_to = dest.run_write(move, attach={'src': self.partitions[from_hostel].db_path,
+                                                    **dest.registry_attach()})
+        except sqlite3.IntegrityError as e:
+            print("Database Error:", e)  # Debugging
+            return None
+        if moved_to:
+            dest.reg_numbers.add(reg_no)
+        return moved_to
@@ -0,0 +1,131 @@
+from bisect import insort
+from heapq import nsmallest
+
+# Student columns shown in a label; updating one of them changes the entry
+LABEL_COLUMNS = {'first_name', 'last_name'}
+
+
+class _Node:
+    __slots__ = ('children', 'top', 'ends')
+
+    def __init__(self):
+        self.children = {}
+        self.top = []
+        # Labels with a term ending exactly here, so top can be rebuilt after a remove
+        self.ends = set()
+
+
+class PrefixIndex:
+    """Case-insensitive prefix trie returning the top-K labels for a prefix.
+
+    Every node keeps its K best labels (alphabetical) already sorted, so a
+    lookup is a walk down the typed prefix with no scan of the subtree.
+    remove() rebuilds the tops only along the removed entry's terms, each
+    from the labels ending at that node and its children's tops.
+    """
+
+    def __init__(self, k=15):
+        self.k = k
+        self.root = _Node()
+        self.labels = {}
+        self.terms = {}
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __contains__(self, key):
+        return key in self.labels
+
+    def add(self, key, label, terms):
+        """Index `label` under every term; `key` identifies the entry.
+
+        Adding a key again with the same label is a no-op; a new label
+        replaces the old entry.
+        """
+        if self.labels.get(key) == label:
+            return
+        self.remove(key)
+        terms = {t.strip().lower() for t in terms if t and t.strip()}
+        self.labels[key] = label
+        self.terms[key] = terms
+        for term in terms:
+            self._insert(term, label)
+
+    def remove(self, key):
+        """Drop an entry; returns False if the key was not indexed"""
+        label = self.labels.pop(key, None)
+        if label is None:
+            return False
+        # Paths are taken before any rebuild, which may prune nodes the terms share
+        paths = [(self._path(term), term) for term in self.terms.pop(key)]
+        for path, _ in paths:
+            path[-1].ends.discard(label)
+        for path, term in paths:
+            self._rebuild(path, term, label)
+        return True
+
+    def _insert(self, term, label):
+        node = self.root
+        self._offer(node.top, label)
+        for ch in term:
+            node = node.children.setdefault(ch, _Node())
+            self._offer(node.top, label)
+        node.ends.add(label)
+
+    def _path(self, term):
+        nodes = [self.root]
+        for ch in term:
+            nodes.append(nodes[-1].children[ch])
+        return nodes
+
+    def _rebuild(self, path, term, label):
+        # Deepest first, so each node merges children whose tops are already correct
+        for depth in range(len(path) - 1, -1, -1):
+            node = path[depth]
+            if label not in node.top:
+                continue
+            candidates = set(node.ends)
+            for child in node.children.values():
+                candidates.update(child.top)
+            node.top = nsmallest(self.k, candidates)
+            if depth and not node.top:
+                path[depth - 1].children.pop(term[depth - 1], None)
+
+    def _offer(self, top, label):
+        if label in top:
+            return
+        if len(top) < self.k:
+            insort(top, label)
+        elif label < top[-1]:
+            insort(top, label)
+            top.pop()
+
+    def search(self, prefix):
+        node = self.root
+        for ch in prefix.strip().lower():
+            node = node.children.get(ch)
+            if node is None:
+                return []
+        return list(node.top)
+
+
+def student_label(reg_no, first_name, last_name):
+    return f"{reg_no} - {first_name} {last_name}"
+
+
+def add_student(index, reg_no, first_name, last_name):
+    """Index a student by reg no, first name, last name and full name"""
+    index.add(reg_no, student_label(reg_no, first_name, last_name),
+              (reg_no, first_name, last_name, f"{first_name} {last_name}"))
+
+
+def apply_changes(index, changes, since_seq):
+    """Drop students archived, moved or renamed in change log rows; returns the last seq seen.
+
+    The next load of the students table adds the current rows back.
+    """
+    for seq, op, reg_no, columns, _ in changes:
+        since_seq = seq
+        if op == 'DELETE' or (op == 'UPDATE' and LABEL_COLUMNS.intersection(columns)):
+            index.remove(reg_no)
+    return since_seq
@@ -2,7 +2,7 @@ import qrcode
 from PIL import Image
 
 
-def generate_qr_code(data, filename):
+def make_qr_image(data):
     qr = qrcode.QRCode(
         version=1,
         error_correction=qrcode.constants.ERROR_CORRECT_L,
@@ -12,7 +12,11 @@ def generate_qr_code(data, filename):
     qr.add_data(data)
     qr.make(fit=True)
 
-    img = qr.make_image(fill_color="black", back_color="white")
+    return qr.make_image(fill_color="black", back_color="white")
+
+
+def generate_qr_code(data, filename):
+    img = make_qr_image(data)
     img.save(filename)
 
     return filename
\ No newline at end of file
@@ -0,0 +1,208 @@
+"""Local multi-desk service: one process owns the database, desks connect over HTTP.
+
+    python server.py --host 0.0.0.0 --port 8765 --token SECRET
+    python server.py --hostel NORTH --port 8766
+    python main.py --server http://hostel-pc:8765 --token SECRET
+
+Writes go through a single writer thread in arrival order. Reads run
+concurrently on request threads, up to --readers at a time.
+"""
+import argparse
+import hmac
+import json
+import os
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from backup import BackupManager, BackupScheduler
+from database import Database
+from config import Config
+from partitions import open_hostel
+import tracing
+
+# Methods desks may call, split by whether they modify the database
+READ_METHODS = {
+    'count_students', 'get_student', 'get_student_record', 'get_all_students',
+    'get_students_page', 'get_registration_numbers_page', 'get_students_since',
+    'search_students', 'find_by_phone', 'find_by_email', 'get_department_counts',
+    'count_expiring', 'get_stats', 'get_expiring', 'get_changes', 'get_change_seq',
+    'find_free_room', 'get_vacancies', 'get_room', 'get_block_vacancy', 'get_free_rooms',
+    'get_inside', 'count_inside', 'get_gate_history',
+    'get_balance', 'get_debtors', 'get_statement', 'get_meal_counts', 'get_student_meals',
+}
+WRITE_METHODS = {'add_student', 'add_students', 'update_student', 'renew_students', 'add_rooms',
+                 'assign_rooms', 'add_gate_events', 'post_fee_entries', 'post_term_charges',
+                 'book_default_meals', 'set_meal_booking'}
+# Served by DatabaseService itself: a search the desk can cancel once newer input supersedes it
+SERVICE_METHODS = {'search', 'interrupt_search'}
+
+
+class DatabaseService:
+    """Dispatches calls to a Database: one writer thread, bounded concurrent readers"""
+
+    def __init__(self, db, readers=8):
+        self.db = db
+        self.reader_slots = threading.BoundedSemaphore(readers)
+        # search_id -> connection of a search in flight, and the ones asked to stop
+        self.searches = {}
+        self.cancelled = set()
+        self.searches_lock = threading.Lock()
+        self.write_queue = queue.Queue()
+        self.writer = threading.Thread(target=self.write_loop, daemon=True)
+        self.writer.start()
+
+    def write_loop(self):
+        while True:
+            method, params, future = self.write_queue.get()
+            if method is None:
+                return
+            try:
+                future.set_result(getattr(self.db, method)(*params))
+            except Exception as e:
+                future.set_exception(e)
+
+    def call(self, method, params):
+        if method in WRITE_METHODS:
+            # Includes the wait for the writer thread, which records the db span itself
+            with tracing.span(f"server.{method}"):
+                future = Future()
+                self.write_queue.put((method, params, future))
+                return future.result()
+        if method in READ_METHODS:
+            with tracing.span(f"server.{method}"):
+                with self.reader_slots:
+                    return getattr(self.db, method)(*params)
+        if method in SERVICE_METHODS:
+            with tracing.span(f"server.{method}"):
+                return getattr(self, method)(*params)
+        raise ValueError(f"Unknown method: {method}")
+
+    def search(self, term, limit, include_archive, search_id):
+        """search_students on a connection that interrupt_search(search_id) can cancel"""
+        conn = self.db.connect()
+        with self.searches_lock:
+            self.searches[search_id] = conn
+        try:
+            with self.reader_slots:
+                with self.searches_lock:
+                    if search_id in self.cancelled:
+                        # Cancelled while waiting for a reader slot
+                        raise sqlite3.OperationalError("interrupted")
+                return self.db.search_students(term, limit, conn=conn, include_archive=include_archive)
+        finally:
+            with self.searches_lock:
+                del self.searches[search_id]
+                self.cancelled.discard(search_id)
+            conn.close()
+
+    def interrupt_search(self, search_id):
+        """Stop a search in flight; returns False if it already finished or has not arrived"""
+        with self.searches_lock:
+            conn = self.searches.get(search_id)
+            if conn is None:
+                return False
+            self.cancelled.add(search_id)
+            conn.interrupt()
+        return True
+
+    def close(self):
+        self.write_queue.put((None, None, None))
+        self.writer.join()
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; without this Nagle's algorithm
+    # adds a delayed-ACK stall (~40 ms) to every keep-alive response
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        if self.path != '/rpc':
+            self.send_error(404)
+            return
+        token = self.server.token
+        # Constant-time, so response timing does not reveal how much of the token matched
+        sent = self.headers.get('X-Hostel-Token', '')
+        if token and not hmac.compare_digest(sent.encode('utf-8'), token.encode('utf-8')):
+            self.send_error(403)
+            return
+
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            result = self.server.service.call(request['method'], request.get('params', []))
+            body = {'result': result}
+        except Exception as e:
+            body = {'error': f"{type(e).__name__}: {e}"}
+
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class HostelServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, db=None, readers=8, token=None, verbose=False):
+        super().__init__(address, RequestHandler)
+        self.db = db or Database()
+        self.db.enable_wal()
+        self.service = DatabaseService(self.db, readers)
+        self.token = token
+        self.verbose = verbose
+
+    def server_close(self):
+        super().server_close()
+        self.service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the hostel database to registration desks")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--readers', type=int, default=8, help="concurrent read requests")
+    parser.add_argument('--token', help="shared secret desks must send")
+    parser.add_argument('--data-dir', help="data root (default: $HOSTEL_DATA_DIR or ./data)")
+    parser.add_argument('--hostel', help="serve one hostel's database (DATA_DIR/hostels/NAME/hostel.db)")
+    parser.add_argument('--backup-hours', type=float, default=6,
+                        help="hours between online snapshots (0 disables)")
+    parser.add_argument('--trace', metavar='DIR', nargs='?', const='',
+                        help="record timing spans and slow queries; the session report is written to DIR "
+                             "(default DATA_DIR/traces) on shutdown")
+    parser.add_argument('--slow-ms', type=float, default=tracing.SLOW_QUERY_MS,
+                        help="slow-query log threshold with --trace")
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args(argv)
+
+    config = Config(data_root=args.data_dir)
+    trace_report = tracing.enable_from_env(os.path.join(config.data_root, 'traces'))
+    if args.trace is not None:
+        trace_report = tracing.enable(args.trace or os.path.join(config.data_root, 'traces'), args.slow_ms)
+    db = open_hostel(args.hostel, config) if args.hostel else Database(config=config)
+    server = HostelServer((args.host, args.port), db=db, readers=args.readers,
+                          token=args.token, verbose=args.verbose)
+    if args.backup_hours > 0:
+        BackupScheduler(BackupManager(server.db), interval=args.backup_hours * 3600).start()
+    print(f"Serving hostel database on http://{args.host}:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if trace_report:
+            print(tracing.tracer.format_report())
+            print("Trace report:", tracing.tracer.export(trace_report))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+import os
+import sys
+
+import pytest
+
+# The application modules live one directory up, not in an installed package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+from database import Database  # noqa: E402
+
+
+def make_student(reg_no, **overrides):
+    student = {
+        'registration_no': reg_no,
+        'first_name': 'Ali',
+        'last_name': 'Khan',
+        'father_name': 'Ahmed Khan',
+        'department': 'CS',
+        'room_no': 'A-101',
+        'phone': '03001234567',
+        'email': f"{reg_no.lower()}@example.edu",
+        'address': 'House 1, Lahore',
+        'photo_path': '',
+        'join_date': '2025-09-01',
+        'expiry_date': '2026-09-01',
+    }
+    student.update(overrides)
+    return student
+
+
+@pytest.fixture
+def db(tmp_path):
+    """In-memory database with two blocks of rooms; nothing touches the disk but tmp_path"""
+    db = Database(config=Config(data_root=str(tmp_path), memory=True))
+    db.add_rooms([
+        {'room_no': 'A-101', 'block': 'A', 'floor': 1, 'capacity': 2},
+        {'room_no': 'A-102', 'block': 'A', 'floor': 1, 'capacity': 1},
+        {'room_no': 'B-201', 'block': 'B', 'floor': 2, 'capacity': 2},
+    ])
+    return db
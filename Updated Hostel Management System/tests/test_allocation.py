@@ -0,0 +1,32 @@
+from allocation import RoomAllocator
+from conftest import make_student
+
+
+def test_plan_respects_gender_year_and_capacity(db):
+    db.add_rooms([
+        {'room_no': 'M-101', 'block': 'M', 'floor': 1, 'capacity': 2, 'gender': 'M'},
+        {'room_no': 'M-102', 'block': 'M', 'floor': 1, 'capacity': 2, 'gender': 'M'},
+        {'room_no': 'F-101', 'block': 'F', 'floor': 1, 'capacity': 2, 'gender': 'F'},
+    ])
+    intake = ([{'registration_no': f"M{i}", 'gender': 'M', 'year': '1', 'department': 'CS'} for i in range(3)] +
+              [{'registration_no': 'M9', 'gender': 'M', 'year': '2', 'department': 'CS'}] +
+              [{'registration_no': f"F{i}", 'gender': 'F', 'year': '1', 'department': 'EE'} for i in range(3)])
+    allocator = RoomAllocator(db)
+    assignments, unplaced, report = allocator.plan(intake)
+
+    # Gendered blocks only take their own gender; the fixture's A/B rooms take anyone
+    for reg_no, room_no in assignments.items():
+        assert db.get_room(room_no)[1] != {'M': 'F', 'F': 'M'}[reg_no[0]]
+    beds = {}
+    for room_no in assignments.values():
+        beds[room_no] = beds.get(room_no, 0) + 1
+    assert all(count <= db.get_room(room_no)[3] for room_no, count in beds.items())
+    # The year-2 student never shares a room with year-1 students
+    year2 = assignments.get('M9')
+    assert year2 is None or all(assignments.get(f"M{i}") != year2 for i in range(3))
+    assert report['placed'] + report['unplaced'] == len(intake)
+
+    for student in intake:
+        db.add_student(make_student(student['registration_no'], room_no='TBD'))
+    assert allocator.commit(assignments) == len(assignments)
+    assert db.get_stats()['free_beds'] == 2 + 1 + 2 + 2 + 2 + 2 - len(assignments)
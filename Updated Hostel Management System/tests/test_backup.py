@@ -0,0 +1,9 @@
+import pytest
+
+from backup import BackupManager
+
+
+def test_backup_manager_rejects_keeping_no_snapshots(db):
+    with pytest.raises(ValueError):
+        BackupManager(db, keep=0)
+
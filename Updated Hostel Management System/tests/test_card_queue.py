@@ -0,0 +1,27 @@
+import threading
+
+from card_queue import CardRegenerationQueue
+from conftest import make_student
+
+
+def test_each_worker_builds_one_generator_from_the_database_config(db, tmp_path):
+    reg_nos = ['CS001', 'CS002', 'CS003', 'CS004']
+    for reg_no, room_no in zip(reg_nos, ('A-101', 'A-101', 'B-201', 'B-201')):
+        assert db.add_student(make_student(reg_no, room_no=room_no))
+    built = []
+    cards = []
+
+    def make_generate(config):
+        built.append((threading.current_thread(), config))
+        return lambda student_data, output_path: cards.append(output_path)
+
+    queue = CardRegenerationQueue(db, output_dir=str(tmp_path / 'cards'), workers=2,
+                                  make_generate=make_generate)
+    queue.put(reg_nos)
+    queue.join()
+    queue.stop()
+
+    assert queue.done == len(cards) == 4 and not queue.failed
+    assert 1 <= len(built) <= 2
+    assert len({thread for thread, _ in built}) == len(built)
+    assert all(config is db.config for _, config in built)
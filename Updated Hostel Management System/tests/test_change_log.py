@@ -0,0 +1,11 @@
+from conftest import make_student
+
+
+def test_change_log_records_every_write(db):
+    db.add_student(make_student('CS001'))
+    db.update_student('CS001', {'phone': '03009999999'})
+    db.update_student('CS001', {'phone': '03009999999'})  # no real change, no entry
+    db.archive_expired('2030-01-01')
+    changes = [(op, reg_no, columns) for _, op, reg_no, columns, _ in db.get_changes()]
+    assert changes[0][:2] == ('INSERT', 'CS001')
+    assert changes[1:] == [('UPDATE', 'CS001', ['phone']), ('DELETE', 'CS001', [])]
@@ -0,0 +1,102 @@
+import argparse
+import csv
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import cli
+from conftest import make_student
+from database import STUDENT_COLUMNS
+
+
+def write_csv(path, students):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=STUDENT_COLUMNS)
+        writer.writeheader()
+        writer.writerows(students)
+
+
+def test_import_search_and_stats_from_the_command_line(tmp_path, capsys):
+    data_dir = str(tmp_path / 'data')
+    students_csv = str(tmp_path / 'students.csv')
+    today = datetime.now().strftime('%Y-%m-%d')
+    write_csv(students_csv, [make_student('CS0001', first_name=' sara ', join_date=today, expiry_date=''),
+                             make_student('CS0002', department='EE', room_no='B-201', expiry_date='2020-01-01')])
+
+    assert cli.main(['--data-dir', data_dir, 'import', students_csv]) == 0
+    assert capsys.readouterr().out == 'imported 2, rejected 0\n'
+
+    # A new process would see the same file; the form's clean-up was applied on import
+    assert cli.main(['--data-dir', data_dir, 'search', 'sar']) == 0
+    assert capsys.readouterr().out == 'CS0001\tSara Khan\tCS\tA-101\n'
+
+    assert cli.main(['--data-dir', data_dir, 'stats', '--expiring-days', '0']) == 0
+    out = capsys.readouterr().out.splitlines()
+    assert out[0] == 'total\t2'
+    # An empty expiry date defaults to a year after joining
+    assert out[1] == 'expiring_within_0_days\t1'
+    assert out[-2:] == ['department\tCS\t1', 'department\tEE\t1']
+
+
+def test_cli_does_not_import_tkinter():
+    app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    check = "import sys, cli; sys.exit('tkinter' in sys.modules)"
+    assert subprocess.run([sys.executable, '-c', check], cwd=app_dir).returncode == 0
+
+
+class FakeCardGenerator:
+    finished = 0
+
+    def __init__(self, config):
+        pass
+
+    def generate(self, student_data, output_path):
+        time.sleep(0.02)
+        FakeCardGenerator.finished += 1
+        return student_data['registration_no'] != 'CS003'
+
+
+def test_generate_cards_streams_through_a_bounded_window(db, tmp_path, monkeypatch, capsys):
+    rooms = ['A-101', 'A-101', 'A-102', 'B-201', 'B-201']
+    for i, room_no in enumerate(rooms, 1):
+        db.add_student(make_student(f"CS00{i}", room_no=room_no))
+
+    # Threads instead of processes, so the fake generator's counter is visible here
+    def init_card_worker(config):
+        cli.card_generator = FakeCardGenerator(config)
+
+    monkeypatch.setattr(cli, 'ProcessPoolExecutor', ThreadPoolExecutor)
+    monkeypatch.setattr(cli, 'init_card_worker', init_card_worker)
+    monkeypatch.setattr(cli, 'card_generator', None)
+    monkeypatch.setattr(cli, 'CARD_JOBS_PER_WORKER', 2)
+    monkeypatch.setattr(FakeCardGenerator, 'finished', 0)
+
+    iter_student_records = db.iter_student_records
+    in_flight = []
+
+    def tracked_records(*args, **kwargs):
+        for read, row in enumerate(iter_student_records(*args, **kwargs)):
+            # Cards submitted but not finished when the next record is read
+            in_flight.append(read - FakeCardGenerator.finished)
+            yield row
+
+    monkeypatch.setattr(db, 'iter_student_records', tracked_records)
+    args = argparse.Namespace(all=True, reg_nos=[], jobs=1, output_dir=str(tmp_path / 'cards'))
+    assert cli.cmd_generate_cards(db, args) == 1
+
+    assert len(in_flight) == 5 and max(in_flight) <= 2
+    out, err = capsys.readouterr()
+    cards = str(tmp_path / 'cards')
+    assert out.splitlines() == [os.path.join(cards, f"CS00{i}_id_card.pdf") for i in (1, 2, 4, 5)]
+    assert err == f"{os.path.join(cards, 'CS003_id_card.pdf')}: failed\n"
+
+
+def test_generate_cards_reports_unknown_registration_numbers(db, tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(cli, 'ProcessPoolExecutor', ThreadPoolExecutor)
+    monkeypatch.setattr(cli, 'init_card_worker', lambda config: None)
+    args = argparse.Namespace(all=False, reg_nos=['nosuch1'], jobs=1, output_dir=str(tmp_path / 'cards'))
+    assert cli.cmd_generate_cards(db, args) == 0
+    assert capsys.readouterr() == ('', 'nosuch1: not found\n')
@@ -0,0 +1,43 @@
+import sqlite3
+
+import pytest
+
+from conftest import make_student
+from config import Config
+from database import ConcurrencyError, Database, is_busy_error
+
+
+def test_memory_config_is_shared_per_config_and_never_touches_disk(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    config = Config(memory=True)
+    first = Database(config=config)
+    assert first.add_student(make_student('CS001'))
+    # Same config, same database; a new config starts empty
+    assert Database(config=config).get_student('CS001')[0] == 'CS001'
+    assert Database(config=Config(memory=True)).get_student('CS001') is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_stale_version_raises_concurrency_error(db):
+    db.add_student(make_student('CS001'))
+    record = db.get_student_record('CS001')
+    assert db.update_student('CS001', {'address': 'Desk 1'}, expected_version=record['version'])
+    with pytest.raises(ConcurrencyError):
+        db.update_student('CS001', {'address': 'Desk 2'}, expected_version=record['version'])
+    assert db.get_student_record('CS001')['address'] == 'Desk 1'
+    assert db.get_student_record('CS001')['version'] == record['version'] + 1
+    # A row that no longer exists is not a conflict
+    assert db.update_student('XX999', {'address': 'Nowhere'}, expected_version=1) is False
+
+
+def busy(code):
+    error = sqlite3.OperationalError("database is locked")
+    error.sqlite_errorcode = code
+    return error
+
+
+def test_extended_busy_and_locked_codes_are_retried():
+    assert is_busy_error(busy(sqlite3.SQLITE_BUSY))
+    assert is_busy_error(busy(517))  # SQLITE_BUSY_SNAPSHOT
+    assert is_busy_error(busy(262))  # SQLITE_LOCKED_SHAREDCACHE
+    assert not is_busy_error(busy(sqlite3.SQLITE_READONLY))
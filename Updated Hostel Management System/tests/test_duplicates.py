@@ -0,0 +1,57 @@
+import time
+
+from conftest import make_student
+from database import Database
+from duplicates import DuplicateDetector
+
+
+def probe(**overrides):
+    return make_student('NEW001', **overrides)
+
+
+def test_matches_follow_updates_and_archival_from_other_writers(db):
+    db.add_student(make_student('CS001', expiry_date='2020-01-01'))
+    db.add_student(make_student('EE001', first_name='Sara', last_name='Malik', father_name='Tariq Malik',
+                                phone='03111111111', room_no='B-201'))
+    detector = DuplicateDetector(db)
+    assert [reg_no for _, reg_no in detector.find_matches(probe())] == ['CS001']
+
+    # Another desk (its own Database) edits and archives behind the detector's back
+    other = Database(config=db.config)
+    other.update_student('EE001', {'first_name': 'Ali', 'last_name': 'Khan', 'father_name': 'Ahmed Khan'})
+    assert sorted(reg_no for _, reg_no in detector.find_matches(probe())) == ['CS001', 'EE001']
+
+    other.update_student('EE001', {'first_name': 'Sara', 'phone': '03222222222'})
+    other.archive_expired('2021-01-01')
+    assert detector.find_matches(probe()) == []
+    assert ('phone', '03001234567') not in detector.blocks
+
+    other.restore_student('CS001')
+    assert [reg_no for _, reg_no in detector.find_matches(probe())] == ['CS001']
+
+
+def test_lookups_during_preload_return_partial_results_without_waiting(db):
+    db.add_student(make_student('CS001'))
+    db.add_student(make_student('CS002', first_name='Aly'))
+    db.add_student(make_student('EE001', first_name='Alli', room_no='B-201'))
+    get_students_since = db.get_students_since
+
+    def slow_get_students_since(last_id=0, limit=None):
+        time.sleep(0.2)
+        return get_students_since(last_id, limit)
+
+    db.get_students_since = slow_get_students_since
+    detector = DuplicateDetector(db)
+    detector.PRELOAD_BATCH_SIZE = 1
+    detector.preload()
+
+    started = time.monotonic()
+    partial = detector.find_matches(probe())
+    assert time.monotonic() - started < 0.15
+    assert detector.loading and len(partial) < 3
+
+    deadline = time.monotonic() + 5
+    while detector.loading and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert sorted(reg_no for _, reg_no in detector.find_matches(probe())) == ['CS001', 'CS002', 'EE001']
+    assert len(detector.report()) == 3
@@ -0,0 +1,97 @@
+import argparse
+import csv
+import gzip
+import json
+
+import pytest
+
+from cli import cmd_export
+from conftest import make_student
+from database import STUDENT_COLUMNS
+from exporter import export_students
+
+
+@pytest.fixture
+def students(db):
+    db.add_student(make_student('EE002', department='EE', room_no='B-201', join_date='2024-09-01'))
+    db.add_student(make_student('CS001', first_name='Sara "S"', address='Flat 2, Block 7\nKarachi'))
+    db.add_student(make_student('CS003', first_name='Zoë', room_no='A-102'))
+    return db
+
+
+def test_csv_has_a_header_and_every_column(students, tmp_path):
+    path = str(tmp_path / 'students.csv')
+    assert export_students(students, path, batch_size=2) == 3
+
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == list(STUDENT_COLUMNS)
+    # Ordered by registration number; quotes, commas and newlines survive
+    assert [row[0] for row in rows[1:]] == ['CS001', 'CS003', 'EE002']
+    assert rows[1][1] == 'Sara "S"' and rows[1][8] == 'Flat 2, Block 7\nKarachi'
+    assert rows[2][1] == 'Zoë'
+
+
+def test_jsonl_with_columns_and_filters(students, tmp_path):
+    path = str(tmp_path / 'students.jsonl')
+    count = export_students(students, path, 'jsonl', columns=['registration_no', 'room_no'],
+                            filters={'department': 'cs', 'joined_from': '2025-01-01'})
+    assert count == 2
+    with open(path, encoding='utf-8') as f:
+        assert [json.loads(line) for line in f] == [
+            {'registration_no': 'CS001', 'room_no': 'A-101'},
+            {'registration_no': 'CS003', 'room_no': 'A-102'},
+        ]
+
+    assert export_students(students, path, 'jsonl', filters={'registration_prefix': 'ee'}) == 1
+    with open(path, encoding='utf-8') as f:
+        assert json.loads(f.read())['department'] == 'EE'
+
+
+def test_gzip_by_suffix_or_flag(students, tmp_path):
+    by_suffix = str(tmp_path / 'students.csv.gz')
+    by_flag = str(tmp_path / 'students.out')
+    assert export_students(students, by_suffix) == 3
+    assert export_students(students, by_flag, compress=True) == 3
+
+    for path in (by_suffix, by_flag):
+        with gzip.open(path, 'rt', encoding='utf-8', newline='') as f:
+            rows = list(csv.reader(f))
+        assert len(rows) == 4 and rows[3][0] == 'EE002'
+
+    plain = str(tmp_path / 'plain.gz')
+    export_students(students, plain, compress=False)
+    with open(plain, encoding='utf-8') as f:
+        assert f.readline().startswith('registration_no,')
+
+
+def test_bad_format_and_columns_are_rejected(students, tmp_path):
+    with pytest.raises(ValueError, match='xml'):
+        export_students(students, str(tmp_path / 'out'), 'xml')
+    with pytest.raises(ValueError, match='password'):
+        export_students(students, str(tmp_path / 'out'), columns=['registration_no', 'password'])
+
+
+def export_args(**overrides):
+    args = {'format': 'csv', 'output': '-', 'gzip': False, 'columns': None, 'filter': [],
+            'all_hostels': False}
+    args.update(overrides)
+    return argparse.Namespace(**args)
+
+
+def test_cli_export_streams_to_stdout(students, capsys):
+    assert cmd_export(students, export_args(format='jsonl', columns='registration_no',
+                                            filter=['room_no=b-201'])) == 0
+    out, err = capsys.readouterr()
+    assert out == '{"registration_no": "EE002"}\n'
+    assert err == 'exported 1\n'
+
+    with pytest.raises(SystemExit, match='invalid --filter'):
+        cmd_export(students, export_args(filter=['hostel=NORTH']))
+
+
+def test_cli_export_gzip_flag(students, tmp_path, capsys):
+    path = str(tmp_path / 'students.csv')
+    assert cmd_export(students, export_args(output=path, gzip=True)) == 0
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        assert sum(1 for _ in csv.reader(f)) == 4
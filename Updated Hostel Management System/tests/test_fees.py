@@ -0,0 +1,43 @@
+import argparse
+
+import pytest
+
+from cli import cmd_payment
+from conftest import make_student
+
+
+def test_post_term_charges_is_idempotent(db):
+    db.add_student(make_student('CS001'))
+    db.add_student(make_student('EE001', department='EE', room_no='B-201'))
+    assert db.post_term_charges('2025-FALL', 15000) == 2
+    assert db.post_term_charges('2025-FALL', 15000) == 0
+    assert db.post_term_charges('2026-SPRING', 15000, department='EE') == 1
+    db.post_fee_entries([('CS001', 'PAYMENT', -5000, 'Cash', '2025-FALL')])
+    assert db.get_balance('CS001') == 10000
+    assert db.get_balance('EE001') == 30000
+    statement = db.get_statement('EE001')
+    assert [entry[6] for entry in statement] == [30000, 15000]
+
+
+def test_entries_for_unknown_students_are_rejected(db):
+    db.add_student(make_student('CS001', expiry_date='2020-01-01'))
+    db.add_student(make_student('CS002', expiry_date='2020-01-01'))
+    with pytest.raises(ValueError, match='NOSUCH1'):
+        db.post_fee_entries([('CS001', 'CHARGE', 5000, 'Fine', None), ('nosuch1', 'PAYMENT', -500, '', None)])
+    # The whole batch is rolled back
+    assert db.get_balance('CS001') == 0 and db.get_debtors(min_balance=-10**9) == []
+
+    # An archived student can still settle an open balance, but gets no new ledger
+    db.post_fee_entries([('CS001', 'CHARGE', 5000, 'Fine', None)])
+    assert db.archive_expired('2021-01-01') == 2
+    assert db.post_fee_entries([('CS001', 'PAYMENT', -5000, 'Cash', None)]) == 1
+    for reg_no in ('CS001', 'CS002'):
+        with pytest.raises(ValueError):
+            db.post_fee_entries([(reg_no, 'PAYMENT', -100, 'Cash', None)])
+
+
+def test_cli_payment_reports_unknown_students(db):
+    args = argparse.Namespace(reg_no='NOSUCH1', amount='500', note='', adjust=False)
+    with pytest.raises(SystemExit, match='Unknown registration number: NOSUCH1'):
+        cmd_payment(db, args)
+    assert db.get_debtors(min_balance=-10**9) == []
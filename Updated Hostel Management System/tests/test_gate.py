@@ -0,0 +1,57 @@
+import threading
+import time
+
+from conftest import make_student
+from gate import GateRecorder
+
+
+def test_concurrent_scans_count_every_event(db):
+    db.add_student(make_student('CS001'))
+    recorder = GateRecorder(db, gate='NORTH')
+
+    def scan_many():
+        for _ in range(200):
+            recorder.scan('CS001')
+            recorder.scan('UNKNOWN1')
+
+    threads = [threading.Thread(target=scan_many) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    recorder.flush()
+    recorder.close()
+
+    assert recorder.rejected == 800
+    assert recorder.recorded == 800
+    assert len(db.get_gate_history('CS001', limit=1000)) == 800
+
+
+def test_scans_blocked_on_a_full_queue_do_not_stall_the_writer(db):
+    db.add_student(make_student('CS001'))
+    db.add_student(make_student('CS002'))
+    add_gate_events = db.add_gate_events
+
+    def slow_add_gate_events(events):
+        time.sleep(0.05)
+        return add_gate_events(events)
+
+    db.add_gate_events = slow_add_gate_events
+    recorder = GateRecorder(db, batch_size=2, flush_interval=0.01, max_pending=2)
+
+    def scan_many(reg_no):
+        for _ in range(10):
+            recorder.scan(reg_no)
+
+    threads = [threading.Thread(target=scan_many, args=(reg_no,), daemon=True)
+               for reg_no in ('CS001', 'CS002', 'CS001')]
+    for thread in threads:
+        thread.start()
+    # Before the counters had their own lock this deadlocked with recorded == 0
+    deadline = time.monotonic() + 10
+    for thread in threads:
+        thread.join(timeout=max(0.0, deadline - time.monotonic()))
+    assert not any(thread.is_alive() for thread in threads)
+    recorder.flush()
+    recorder.close()
+    assert recorder.recorded == 30
@@ -0,0 +1,55 @@
+import pytest
+
+from conftest import make_student
+from validator import Validator
+
+
+@pytest.mark.parametrize('phone, expected', [
+    ('0300-1234567', '+923001234567'),
+    (' 0300 123 4567 ', '+923001234567'),
+    ('+92 300 1234567', '+923001234567'),
+    ('0092-300-1234567', '+923001234567'),
+    ('3001234567', '+923001234567'),
+    ('+1 (415) 555-0100', '+14155550100'),
+    ('', None),
+    ('  ', None),
+    (None, None),
+])
+def test_normalize_phone(phone, expected):
+    assert Validator.normalize_phone(phone) == expected
+
+
+def registration_nos(rows):
+    return sorted(row[0] for row in rows)
+
+
+def test_find_by_phone_matches_any_spelling_of_the_number(db):
+    db.add_student(make_student('CS001', phone='0300-1234567'))
+    db.add_student(make_student('CS002', phone='+92 300 1234567'))
+    db.add_student(make_student('CS003', phone='03217654321', room_no='B-201'))
+
+    assert registration_nos(db.find_by_phone('00923001234567')) == ['CS001', 'CS002']
+    assert registration_nos(db.find_by_phone('321 7654321')) == ['CS003']
+    assert db.find_by_phone('03330000000') == []
+    assert db.find_by_phone('') == []
+    # Rows are shaped like get_all_students
+    assert db.find_by_phone('03217654321')[0][6] == '03217654321'
+
+
+def test_find_by_email_ignores_case_and_spaces(db):
+    db.add_student(make_student('CS001', email='Ali.Khan@Example.edu'))
+    db.add_student(make_student('CS002', email=''))
+
+    assert registration_nos(db.find_by_email('  ali.khan@example.EDU ')) == ['CS001']
+    assert db.find_by_email('') == []
+    assert db.find_by_email('   ') == []
+
+
+def test_lookups_follow_updates(db):
+    db.add_student(make_student('CS001', phone='03001234567', email='old@example.edu'))
+    assert db.update_student('CS001', {'phone': '0345-7654321', 'email': 'New@Example.edu'})
+
+    assert db.find_by_phone('03001234567') == []
+    assert db.find_by_email('old@example.edu') == []
+    assert registration_nos(db.find_by_phone('+923457654321')) == ['CS001']
+    assert registration_nos(db.find_by_email('new@example.edu')) == ['CS001']
@@ -0,0 +1,47 @@
+import argparse
+
+import pytest
+
+from cli import cmd_meal_opt_out
+from conftest import make_student
+
+
+def test_meal_counts_after_opt_out(db):
+    db.add_student(make_student('CS001'))
+    db.add_student(make_student('CS002'))
+    db.add_student(make_student('EE001', department='EE', room_no='B-201'))
+    assert db.book_default_meals('2026-03-01', '2026-03-02') == 3 * 2 * 3
+    assert db.get_meal_counts('2026-03-01') == [
+        ('A', 'BREAKFAST', 2), ('A', 'LUNCH', 2), ('A', 'DINNER', 2),
+        ('B', 'BREAKFAST', 1), ('B', 'LUNCH', 1), ('B', 'DINNER', 1)]
+
+    db.set_meal_booking('CS001', '2026-03-01', meals=['LUNCH', 'DINNER'])
+    db.set_meal_booking('EE001', '2026-03-01', '2026-03-02')
+    assert db.get_meal_counts('2026-03-01') == [('A', 'BREAKFAST', 2), ('A', 'LUNCH', 1), ('A', 'DINNER', 1)]
+    # Re-applying the default keeps the opt-outs
+    assert db.book_default_meals('2026-03-01', '2026-03-02') == 0
+    assert db.get_meal_counts('2026-03-02') == [('A', 'BREAKFAST', 2), ('A', 'LUNCH', 2), ('A', 'DINNER', 2)]
+
+    db.set_meal_booking('EE001', '2026-03-02', meals=['DINNER'], booked=True)
+    assert db.get_meal_counts('2026-03-02')[-1] == ('B', 'DINNER', 1)
+
+
+def test_unknown_meals_are_rejected_before_writing(db):
+    db.add_student(make_student('CS001'))
+    with pytest.raises(ValueError, match='SNACK'):
+        db.set_meal_booking('CS001', '2026-03-01', meals=['lunch', 'SNACK'])
+    with pytest.raises(ValueError, match='SNACK'):
+        db.book_default_meals('2026-03-01', '2026-03-01', meals=['SNACK'])
+    assert db.get_student_meals('CS001', '2026-03-01', '2026-03-01') == []
+    assert db.set_meal_booking('CS001', '2026-03-01', meals=[' lunch ']) == 1
+
+
+def test_cli_meal_opt_out_reports_bad_meals_and_unknown_students(db, capsys):
+    db.add_student(make_student('CS001'))
+    args = argparse.Namespace(reg_no='CS001', start='2026-03-01', end=None, meals='SNACK', book=False)
+    with pytest.raises(SystemExit, match='Unknown meals: SNACK'):
+        cmd_meal_opt_out(db, args)
+
+    args = argparse.Namespace(reg_no='cs999', start='2026-03-01', end=None, meals='LUNCH', book=False)
+    assert cmd_meal_opt_out(db, args) == 1
+    assert capsys.readouterr().err.strip() == "cs999: not found"
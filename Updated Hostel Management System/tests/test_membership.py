@@ -0,0 +1,58 @@
+import time
+
+from conftest import make_student
+from database import Database
+from membership import RegistrationIndex
+
+
+def test_index_follows_archival_restore_and_other_writers(db):
+    db.add_student(make_student('CS001', expiry_date='2020-01-01'))
+    db.reg_numbers.load()
+    assert db.reg_numbers.contains('cs001')
+
+    # Another desk (its own Database and index) registers and archives
+    other = Database(config=db.config)
+    other.add_student(make_student('CS002'))
+    other.archive_expired('2021-01-01')
+    db.reg_numbers.sync()
+    assert db.reg_numbers.contains('CS002')
+    assert not db.reg_numbers.contains('CS001')
+
+    other.restore_student('CS001')
+    db.reg_numbers.sync()
+    assert db.reg_numbers.contains('CS001')
+
+
+def test_bloom_index_confirms_hits_after_deletes(db):
+    db.add_student(make_student('CS001', expiry_date='2020-01-01'))
+    index = RegistrationIndex(db, bloom_threshold=0, sync_interval=0)
+    index.load()
+    assert index.is_bloom and index.contains('CS001')
+    db.archive_expired('2021-01-01')
+    index.sync()
+    assert not index.contains('CS001')
+    db.add_student(make_student('CS002'))
+    index.sync()
+    assert index.contains('CS002')
+
+
+def test_lookups_stay_in_memory_and_the_syncer_catches_up(db):
+    db.add_student(make_student('CS001'))
+    index = RegistrationIndex(db, sync_interval=0)
+    index.load()
+
+    def no_reads(*args):
+        raise AssertionError("lookup read the change log")
+
+    iter_changes, db.iter_changes = db.iter_changes, no_reads
+    assert index.contains('CS001') and not index.contains('CS002')
+    db.iter_changes = iter_changes
+
+    index = RegistrationIndex(db, sync_interval=0.01)
+    index.load()
+    Database(config=db.config).add_student(make_student('CS002'))
+    deadline = time.monotonic() + 2
+    while not index.contains('CS002') and time.monotonic() < deadline:
+        time.sleep(0.01)
+    index.stop()
+    assert index.contains('CS002')
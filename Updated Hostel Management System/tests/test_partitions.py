@@ -0,0 +1,90 @@
+import sqlite3
+
+import pytest
+
+from conftest import make_student
+from config import Config
+from partitions import HostelFederation, RegistrationConflict
+
+
+def test_move_student_carries_fee_balance(tmp_path):
+    federation = HostelFederation(Config(data_root=str(tmp_path), memory=True))
+    for name in ('NORTH', 'SOUTH'):
+        federation.add_hostel(name).add_rooms([{'room_no': 'R-1', 'block': 'R', 'capacity': 2}])
+    north, south = federation.hostel('NORTH'), federation.hostel('SOUTH')
+    assert federation.add_student('NORTH', make_student('CS001', room_no='R-1'))
+    north.post_term_charges('2025-FALL', 15000)
+    north.post_fee_entries([('CS001', 'PAYMENT', -4000, 'Cash', '2025-FALL')])
+
+    assert federation.move_student('CS001', 'SOUTH') == 'R-1'
+    assert federation.locate('CS001') == ['SOUTH']
+    assert north.get_balance('CS001') == 0
+    assert south.get_balance('CS001') == 11000
+    assert (north.get_room('R-1')[4], south.get_room('R-1')[4]) == (0, 1)
+    assert north.get_stats()['students'] == 0 and south.get_stats()['students'] == 1
+
+    # Moving again is a no-op, not a second transfer
+    assert federation.move_student('CS001', 'SOUTH') is None
+    assert south.get_balance('CS001') == 11000
+    # The registration number is taken in every hostel
+    with pytest.raises(RegistrationConflict) as conflict:
+        federation.add_student('NORTH', make_student('cs001', room_no='R-1'))
+    assert conflict.value.hostel == 'SOUTH'
+
+
+def test_rerunning_an_interrupted_move_carries_the_balance_once(tmp_path):
+    federation = HostelFederation(Config(data_root=str(tmp_path), memory=True))
+    for name in ('NORTH', 'SOUTH'):
+        federation.add_hostel(name).add_rooms([{'room_no': 'R-1', 'block': 'R', 'capacity': 2}])
+    north, south = federation.hostel('NORTH'), federation.hostel('SOUTH')
+    federation.add_student('NORTH', make_student('CS001', room_no='R-1'))
+    north.post_term_charges('2025-FALL', 15000)
+    # An earlier round trip already carried the same amount from NORTH to SOUTH
+    assert federation.move_student('CS001', 'SOUTH') and federation.move_student('CS001', 'NORTH')
+
+    run_write = south.run_write
+
+    def source_commit_lost(work, attach=None):
+        # The source half lands in a throwaway copy, as if its commit never happened
+        scratch = Config(memory=True).db_path
+        copy = sqlite3.connect(scratch, uri=True)
+        source = sqlite3.connect(north.db_path, uri=True)
+        source.backup(copy)
+        source.close()
+        try:
+            return run_write(work, attach=dict(attach, src=scratch))
+        finally:
+            copy.close()
+
+    south.run_write = source_commit_lost
+    assert federation.move_student('CS001', 'SOUTH') == 'R-1'
+    assert sorted(federation.locate('CS001')) == ['NORTH', 'SOUTH']
+    south.run_write = run_write
+
+    assert federation.move_student('CS001', 'SOUTH') == 'R-1'
+    assert federation.locate('CS001') == ['SOUTH']
+    assert (north.get_balance('CS001'), south.get_balance('CS001')) == (0, 15000)
+    carried = [entry for entry in south.get_statement('CS001') if entry[3] == 'Transferred from NORTH']
+    assert len(carried) == 2
+
+
+def test_registry_refuses_a_number_held_by_another_hostel(tmp_path):
+    federation = HostelFederation(Config(data_root=str(tmp_path), memory=True))
+    for name in ('NORTH', 'SOUTH'):
+        federation.add_hostel(name).add_rooms([{'room_no': 'R-1', 'block': 'R', 'capacity': 2}])
+    north, south = federation.hostel('NORTH'), federation.hostel('SOUTH')
+    assert federation.add_student('NORTH', make_student('CS001', room_no='R-1'))
+
+    # A desk that passed the locate() check before NORTH committed inserts directly
+    assert not south.add_student(make_student('CS001', room_no='R-1'))
+    inserted, failures = south.add_students([make_student('CS001', room_no='R-1'),
+                                             make_student('CS002', room_no='R-1')])
+    assert (inserted, len(failures)) == (1, 1)
+    assert federation.locate('CS001') == ['NORTH']
+
+    # Archiving keeps the claim, and restoring in the owning hostel still works
+    assert north.archive_expired('2030-01-01') == 1
+    assert not south.add_student(make_student('CS001', room_no='R-1'))
+    assert north.restore_student('CS001')
+    assert federation.move_student('CS001', 'SOUTH') == 'R-1'
+    assert not north.add_student(make_student('CS001', room_no='R-1'))
@@ -0,0 +1,66 @@
+import os
+import sys
+from collections import Counter
+from datetime import date
+
+import pytest
+
+from cli import prepare_student
+from validator import Validator
+
+# The generator is a benchmark script, not an application module
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+from population import ROOM_CAPACITY, block_name, generate_students, parse_size, room_layout  # noqa: E402
+
+TODAY = date(2025, 10, 1)
+
+
+@pytest.fixture(scope='module')
+def students():
+    return list(generate_students(3000, seed=7, today=TODAY))
+
+
+def test_sizes_and_block_names():
+    assert [parse_size(text) for text in ('1k', '10K', ' 1m ', '2500')] == [1000, 10000, 1000000, 2500]
+    assert [block_name(i) for i in (0, 25, 26, 53)] == ['A', 'Z', 'A1', 'B2']
+
+
+def test_population_is_deterministic_per_seed(students):
+    assert list(generate_students(50, seed=7, today=TODAY)) == students[:50]
+    assert list(generate_students(50, seed=8, today=TODAY)) != students[:50]
+
+
+def test_every_student_passes_validation_with_a_unique_registration_number(students):
+    assert Validator.validate_batch(students) == {}
+    assert len({student['registration_no'] for student in students}) == len(students)
+    # Intakes are the last five Septembers up to TODAY
+    assert {student['join_date'][:4] for student in students} == {str(year) for year in range(2021, 2026)}
+
+
+def test_siblings_share_a_phone_and_father(students):
+    by_phone = Counter(student['phone'] for student in students)
+    shared = [student for student in students if by_phone[student['phone']] > 1]
+    assert 0 < len(shared) < len(students) * 0.05
+    for phone in {student['phone'] for student in shared}:
+        family = [student for student in shared if student['phone'] == phone]
+        assert len({(student['last_name'], student['father_name']) for student in family}) == 1
+
+
+def test_students_fit_the_room_layout(students, tmp_path):
+    from config import Config
+    from database import Database
+
+    genders = Counter(student['gender'] for student in students)
+    rooms = room_layout(genders['M'], genders['F'])
+    occupancy = Counter(student['room_no'] for student in students)
+    room_gender = {room['room_no']: room['gender'] for room in rooms}
+    assert set(occupancy) == set(room_gender)
+    assert max(occupancy.values()) <= ROOM_CAPACITY
+    assert all(room_gender[student['room_no']] == student['gender'] for student in students)
+
+    db = Database(config=Config(data_root=str(tmp_path), memory=True))
+    db.add_rooms(rooms)
+    inserted, failures = db.add_students([prepare_student(student) for student in students])
+    assert (inserted, failures) == (len(students), [])
+    assert db.get_stats()['free_beds'] == len(rooms) * ROOM_CAPACITY - len(students)
@@ -0,0 +1,55 @@
+import prefix_index
+from conftest import make_student
+from prefix_index import PrefixIndex
+
+
+def test_search_returns_the_top_k_labels_for_a_prefix():
+    index = PrefixIndex(k=2)
+    prefix_index.add_student(index, 'CS003', 'Sara', 'Ali')
+    prefix_index.add_student(index, 'CS001', 'Ali', 'Khan')
+    prefix_index.add_student(index, 'CS002', 'Alina', 'Shah')
+    assert index.search('AL') == ['CS001 - Ali Khan', 'CS002 - Alina Shah']
+    assert index.search('ali k') == ['CS001 - Ali Khan']
+    assert index.search('sara ali') == ['CS003 - Sara Ali']
+    assert index.search('zz') == []
+    assert len(index) == 3 and 'CS002' in index
+
+
+def test_remove_refills_the_top_k_from_the_rest_of_the_subtree():
+    index = PrefixIndex(k=2)
+    for reg_no, first_name in (('CS001', 'Ali'), ('CS002', 'Alina'), ('CS003', 'Alia')):
+        prefix_index.add_student(index, reg_no, first_name, 'Khan')
+    assert index.search('ali') == ['CS001 - Ali Khan', 'CS002 - Alina Khan']
+
+    assert index.remove('CS001')
+    assert not index.remove('CS001')
+    assert index.search('ali') == ['CS002 - Alina Khan', 'CS003 - Alia Khan']
+    assert index.search('khan') == ['CS002 - Alina Khan', 'CS003 - Alia Khan']
+    assert 'CS001' not in index
+
+
+def test_adding_a_key_with_a_new_label_replaces_it():
+    index = PrefixIndex()
+    prefix_index.add_student(index, 'CS001', 'Ali', 'Khan')
+    prefix_index.add_student(index, 'CS001', 'Ali', 'Khan')
+    prefix_index.add_student(index, 'CS001', 'Bilal', 'Khan')
+    assert index.search('ali') == []
+    assert index.search('khan') == ['CS001 - Bilal Khan']
+    assert len(index) == 1
+
+
+def test_changes_drop_archived_and_renamed_students(db):
+    index = PrefixIndex()
+    for reg_no, room_no, expiry_date in (('CS001', 'A-101', '2020-01-01'), ('CS002', 'A-101', '2030-01-01'),
+                                         ('EE001', 'B-201', '2030-01-01')):
+        db.add_student(make_student(reg_no, room_no=room_no, expiry_date=expiry_date))
+        prefix_index.add_student(index, reg_no, 'Ali', 'Khan')
+    seq = db.get_change_seq()
+
+    db.archive_expired('2021-01-01')
+    db.update_student('CS002', {'first_name': 'Bilal'})
+    db.update_student('EE001', {'phone': '03009999999'})
+    seq = prefix_index.apply_changes(index, db.iter_changes(seq), seq)
+
+    assert seq == db.get_change_seq()
+    assert index.search('ali') == ['EE001 - Ali Khan']
@@ -0,0 +1,91 @@
+import argparse
+from datetime import datetime, timedelta
+
+import pytest
+
+from cli import cmd_expiring, cmd_renew
+from conftest import make_student
+
+
+def days_from_today(days):
+    return (datetime.now() + timedelta(days=days)).strftime('%Y-%m-%d')
+
+
+@pytest.fixture
+def expiring(db):
+    db.add_student(make_student('CS001', expiry_date='2020-06-30'))
+    db.add_student(make_student('CS002', expiry_date=days_from_today(10)))
+    db.add_student(make_student('EE001', department='EE', room_no='B-201', expiry_date=days_from_today(5)))
+    db.add_student(make_student('EE002', department='EE', room_no='B-201', expiry_date=days_from_today(40)))
+    return db
+
+
+def test_expiry_window_queries(expiring):
+    db = expiring
+    today = days_from_today(0)
+    assert [row[0] for row in db.get_expiring(today, days_from_today(30))] == ['EE001', 'CS002']
+    assert [row[0] for row in db.get_expiring(today, days_from_today(30), department='ee')] == ['EE001']
+    assert [row[0] for row in db.get_expiring('2000-01-01', days_from_today(60), limit=2)] == ['CS001', 'EE001']
+    # The upper bound is exclusive
+    assert db.get_expiring(today, days_from_today(5)) == []
+    assert db.count_expiring(today) == 1
+    assert db.count_expiring(days_from_today(41)) == 4
+
+
+def test_renewal_counts_from_the_later_of_expiry_and_today(expiring):
+    db = expiring
+    version = db.get_student_record('EE002')['version']
+    assert sorted(db.renew_students(30, expiring_before=days_from_today(50))) == ['CS001', 'CS002', 'EE001', 'EE002']
+
+    # Long-expired students get a full term from today; early renewals keep their remaining days
+    assert db.get_student_record('CS001')['expiry_date'] == days_from_today(30)
+    assert db.get_student_record('EE001')['expiry_date'] == days_from_today(35)
+    assert db.get_student_record('EE002')['expiry_date'] == days_from_today(70)
+    assert db.get_student_record('EE002')['version'] == version + 1
+
+
+def test_renewal_selectors(expiring):
+    db = expiring
+    assert db.renew_students(department='ee', expiring_before=days_from_today(20)) == ['EE001']
+    assert db.get_student_record('EE002')['expiry_date'] == days_from_today(40)
+
+    # Explicit registration numbers, still narrowed by department; unknown ones are skipped
+    assert db.renew_students(10, department='CS', reg_nos=['CS002', 'EE002', 'NOSUCH1']) == ['CS002']
+    assert db.get_student_record('CS002')['expiry_date'] == days_from_today(20)
+
+    with pytest.raises(ValueError, match='renew_students needs'):
+        db.renew_students(30)
+
+
+def test_renewal_moves_students_out_of_the_expiry_stats(db):
+    db.add_student(make_student('CS001', expiry_date='2020-06-30'))
+    db.add_student(make_student('CS002', expiry_date=days_from_today(0)))
+    stats = db.get_stats()
+    assert (stats['expiring_this_month'], stats['expired_before_this_month']) == (1, 1)
+
+    db.renew_students(reg_nos=['CS001', 'CS002'])
+    stats = db.get_stats()
+    assert (stats['expiring_this_month'], stats['expired_before_this_month']) == (0, 0)
+    assert db.get_stats(days_from_today(365)[:7])['expiring_this_month'] == 2
+
+
+def renew_args(**overrides):
+    args = {'reg_nos': [], 'days': 365, 'department': None, 'expiring_within': None,
+            'no_cards': True, 'jobs': 1, 'output_dir': None}
+    args.update(overrides)
+    return argparse.Namespace(**args)
+
+
+def test_cli_expiring_and_renew(expiring, capsys):
+    assert cmd_expiring(expiring, argparse.Namespace(days=30, department=None, limit=None)) == 0
+    out, _ = capsys.readouterr()
+    assert out.splitlines() == [f"{days_from_today(5)}\tEE001\tAli Khan\tEE",
+                                f"{days_from_today(10)}\tCS002\tAli Khan\tCS"]
+
+    assert cmd_renew(expiring, renew_args(expiring_within=7, days=30)) == 0
+    assert capsys.readouterr().err == 'renewed 2 students by 30 days\n'
+    assert cmd_renew(expiring, renew_args(reg_nos=[' cs002 '], days=30)) == 0
+    assert expiring.get_student_record('CS002')['expiry_date'] == days_from_today(40)
+
+    with pytest.raises(SystemExit, match='renew needs'):
+        cmd_renew(expiring, renew_args())
@@ -0,0 +1,117 @@
+import threading
+import time
+
+import pytest
+
+from client import RemoteDatabase, RemoteError
+from conftest import make_student
+from database import ConcurrencyError
+from server import HostelServer
+
+TOKEN = 's3cret'
+
+
+@pytest.fixture
+def server(db):
+    server = HostelServer(('127.0.0.1', 0), db=db, token=TOKEN)
+    # A short poll interval keeps shutdown() from adding half a second per test
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def remote(server, token=TOKEN):
+    return RemoteDatabase(f"http://127.0.0.1:{server.server_address[1]}", token=token, timeout=5)
+
+
+def test_calls_need_the_shared_token(server):
+    server.db.add_student(make_student('CS001'))
+    assert remote(server).get_student('CS001')[0] == 'CS001'
+    for token in (None, 's3cre', 's3cret!', 'sécret'):
+        with pytest.raises(RemoteError, match='403'):
+            remote(server, token).get_student('CS001')
+
+
+@pytest.mark.parametrize('method', ['print_db_structure', 'run_write', 'connect', '__init__', 'close', 'write_loop'])
+def test_only_whitelisted_methods_are_served(server, method):
+    with pytest.raises(RemoteError, match=f"ValueError: Unknown method: {method}"):
+        remote(server).call(method)
+
+
+def test_reads_and_writes_round_trip(server):
+    desk = remote(server)
+    assert desk.add_student(make_student('CS001'))
+    assert desk.get_student('CS001')[:3] == ('CS001', 'Ali', 'Khan')
+    record = desk.get_student_record('CS001')
+    assert desk.update_student('CS001', {'first_name': 'Asad'}, record['version'])
+    # Errors raised on the writer thread come back to the desk, and the writer keeps going
+    with pytest.raises(RemoteError, match=ConcurrencyError.__name__):
+        desk.update_student('CS001', {'first_name': 'Omar'}, record['version'])
+    assert desk.count_students() == 1 and desk.get_student('CS001')[1] == 'Asad'
+
+
+def test_writes_run_one_at_a_time_on_the_writer_thread(server):
+    add_student = server.db.add_student
+    lock = threading.Lock()
+    running, overlaps, threads = [0], [], set()
+
+    def slow_add_student(*args):
+        with lock:
+            running[0] += 1
+            overlaps.append(running[0] > 1)
+            threads.add(threading.current_thread())
+        time.sleep(0.02)
+        try:
+            return add_student(*args)
+        finally:
+            with lock:
+                running[0] -= 1
+
+    server.db.add_student = slow_add_student
+    rooms = ['A-101', 'A-101', 'A-102', 'B-201', 'B-201']
+    results = []
+
+    def register(i):
+        results.append(remote(server).add_student(make_student(f"CS00{i}", room_no=rooms[i])))
+
+    desks = [threading.Thread(target=register, args=(i,)) for i in range(len(rooms))]
+    for desk in desks:
+        desk.start()
+    for desk in desks:
+        desk.join(timeout=5)
+    assert results == [True] * len(rooms)
+    assert threads == {server.service.writer} and not any(overlaps)
+    assert server.db.count_students() == len(rooms)
+
+
+def test_a_superseded_search_is_interrupted_on_the_server(server):
+    server.db.add_student(make_student('CS001'))
+    desk = remote(server)
+    assert desk.search_students('cs0', 10, conn=desk.connect()) == [('CS001', 'Ali', 'Khan', 'CS', 'A-101')]
+
+    def endless_search(term, limit, conn=None, include_archive=False):
+        return conn.execute("WITH RECURSIVE r(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM r) "
+                            "SELECT COUNT(*) FROM r").fetchall()
+
+    server.db.search_students = endless_search
+    handle = desk.connect()
+    errors = []
+
+    def search():
+        try:
+            desk.search_students('ali', 10, conn=handle)
+        except RemoteError as e:
+            errors.append(str(e))
+
+    thread = threading.Thread(target=search, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while handle.search_id not in server.service.searches and time.monotonic() < deadline:
+        time.sleep(0.01)
+    handle.interrupt()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+    assert 'interrupted' in errors[0]
+    assert server.service.searches == {} and server.service.cancelled == set()
@@ -0,0 +1,68 @@
+from conftest import make_student
+
+
+def summary_tables(db):
+    conn = db.connect()
+    try:
+        return {table: sorted(conn.execute(f"SELECT * FROM {table}").fetchall())
+                for table in ('stats_totals', 'stats_departments', 'stats_expiry_months', 'stats_blocks')}
+    finally:
+        conn.close()
+
+
+def assert_stats_exact(db):
+    """The trigger-maintained tables must equal a rebuild from scratch"""
+    maintained = summary_tables(db)
+    conn = db.connect()
+    try:
+        conn.execute("SAVEPOINT check_stats")
+        db.recount_rooms(conn.cursor())
+        recounted = sorted(conn.execute("SELECT room_no, occupied FROM rooms").fetchall())
+        db.rebuild_stats(conn.cursor())
+        rebuilt = {table: sorted(conn.execute(f"SELECT * FROM {table} WHERE {column} != 0").fetchall())
+                   for table, column in (('stats_totals', 'value'), ('stats_departments', 'students'),
+                                         ('stats_expiry_months', 'students'), ('stats_blocks', 'rooms'))}
+        conn.execute("ROLLBACK TO check_stats")
+        rooms = sorted(conn.execute("SELECT room_no, occupied FROM rooms").fetchall())
+    finally:
+        conn.close()
+    # Maintained tables keep rows that fell to zero; a rebuild does not create them
+    assert {table: [row for row in rows if any(row[1:])] for table, rows in maintained.items()} == rebuilt
+    assert rooms == recounted
+
+
+def occupied(db, room_no):
+    return db.get_room(room_no)[4]
+
+
+def test_stats_and_occupancy_follow_insert_update_archive_restore(db):
+    assert db.add_student(make_student('CS001'))
+    assert db.add_student(make_student('CS002', expiry_date='2020-01-15'))
+    assert db.add_student(make_student('EE001', department='EE', room_no='B-201'))
+    assert db.get_stats(month='2026-09')['students'] == 3
+    assert occupied(db, 'A-101') == 2
+    assert_stats_exact(db)
+
+    # Full room is refused and nothing changes
+    assert not db.add_student(make_student('CS003'))
+    assert db.get_stats()['students'] == 3
+
+    assert db.update_student('CS001', {'room_no': 'A-102', 'department': 'EE', 'expiry_date': '2027-01-01'})
+    assert (occupied(db, 'A-101'), occupied(db, 'A-102')) == (1, 1)
+    stats = db.get_stats(month='2027-01')
+    assert dict(stats['departments']) == {'CS': 1, 'EE': 2}
+    assert stats['expiring_this_month'] == 1
+    assert_stats_exact(db)
+
+    assert db.archive_expired('2021-01-01') == 1
+    assert db.get_student('CS002') is None
+    assert db.get_student('CS002', include_archive=True)[0] == 'CS002'
+    assert occupied(db, 'A-101') == 0
+    assert db.get_stats()['students'] == 2
+    assert_stats_exact(db)
+
+    assert db.restore_student('CS002')
+    assert occupied(db, 'A-101') == 1
+    assert db.get_stats()['students'] == 3
+    assert db.get_student('CS002', include_archive=True) is not None
+    assert_stats_exact(db)
@@ -0,0 +1,109 @@
+import json
+import sqlite3
+
+import pytest
+
+import tracing
+from conftest import make_student
+
+
+@pytest.fixture
+def tracer(tmp_path):
+    """The process-wide tracer, enabled for one test and reset afterwards"""
+    report_path = tracing.enable(str(tmp_path / 'traces'), slow_ms=10**6)
+    yield tracing.tracer, report_path
+    tracing.tracer.disable()
+    tracing.tracer.slow_log_path = None
+    tracing.tracer.reset()
+
+
+def test_tracing_is_off_by_default(db):
+    assert not tracing.tracer.enabled
+    assert tracing.span('anything') is tracing.NO_SPAN
+    assert tracing.connection_factory() is sqlite3.Connection
+    db.add_student(make_student('CS001'))
+    assert tracing.tracer.report()['spans'] == {}
+
+
+def test_spans_nest_and_aggregate(tracer):
+    tracer, _ = tracer
+    for rows in (3, 5):
+        with tracing.span('import', file='a.csv'):
+            with tracing.span('validate') as validate:
+                validate.set(rows=rows)
+    with pytest.raises(KeyError):
+        with tracing.span('validate'):
+            raise KeyError('room_no')
+
+    report = tracer.report()
+    assert report['spans']['import']['count'] == 2
+    assert report['spans']['validate']['count'] == 3
+    recent = list(tracer.recent)
+    assert [(span['name'], span['path']) for span in recent[:2]] == [('validate', 'import>validate'),
+                                                                     ('import', 'import')]
+    assert recent[0]['rows'] == 3 and recent[1]['file'] == 'a.csv'
+    assert recent[-1]['path'] == 'validate' and recent[-1]['error'] == 'KeyError'
+    assert 'validate' in tracer.format_report()
+
+
+def test_database_calls_and_statements_are_timed(tracer, db):
+    tracer, report_path = tracer
+    db.add_student(make_student('CS001'))
+    assert db.get_student('CS001')[0] == 'CS001'
+
+    report = tracer.report()
+    assert report['spans']['db.add_student']['count'] == 1
+    assert report['spans']['db.get_student']['count'] == 1
+    assert any(row['sql'].startswith('SELECT') and 'FROM students' in row['sql'] for row in report['statements'])
+    assert report['slow_queries'] == []
+
+    assert tracer.export(report_path) == report_path
+    with open(report_path, encoding='utf-8') as f:
+        exported = json.load(f)
+    assert 'db.get_student' in exported['spans']
+    assert {span['name'] for span in exported['recent_spans']} >= {'db.add_student', 'db.get_student'}
+
+
+def test_slow_queries_are_logged_with_plan_but_no_values(tracer, db, tmp_path):
+    tracer, _ = tracer
+    tracer.slow_ms = 0
+    db.add_student(make_student('CS001', first_name='Zainab', phone='03219876543'))
+    db.find_by_phone('03219876543')
+
+    lookup = [entry for entry in tracer.slow_queries if 'phone_norm = ?' in entry['sql']][-1]
+    assert lookup['span'] == 'db.find_by_phone'
+    assert lookup['params'] == ['str']
+    assert lookup['plan'] and any('phone' in step for step in lookup['plan'])
+
+    with open(tmp_path / 'traces' / 'slow_queries.jsonl', encoding='utf-8') as f:
+        log = f.read()
+    assert len(log.splitlines()) == len(tracer.slow_queries)
+    # Parameter types are logged, never the student's data
+    assert 'Zainab' not in log and '9876543' not in log
+
+
+def test_generators_are_timed_over_the_whole_iteration(tracer):
+    tracer, _ = tracer
+
+    @tracing.traced('rows')
+    def rows():
+        yield 1
+        yield 2
+
+    assert list(rows()) == [1, 2]
+    assert tracer.report()['spans']['rows']['count'] == 1
+
+
+def test_enable_from_env(monkeypatch, tmp_path):
+    monkeypatch.delenv('HOSTEL_TRACE', raising=False)
+    assert tracing.enable_from_env(str(tmp_path)) is None and not tracing.tracer.enabled
+
+    monkeypatch.setenv('HOSTEL_TRACE', str(tmp_path / 'custom'))
+    monkeypatch.setenv('HOSTEL_SLOW_MS', '5')
+    try:
+        report_path = tracing.enable_from_env(str(tmp_path / 'default'))
+        assert tracing.tracer.enabled and tracing.tracer.slow_ms == 5
+        assert report_path.startswith(str(tmp_path / 'custom'))
+    finally:
+        tracing.tracer.disable()
+        tracing.tracer.slow_log_path = None
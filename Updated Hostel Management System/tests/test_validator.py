@@ -0,0 +1,55 @@
+import argparse
+import json
+
+from cli import cmd_import
+from conftest import make_student
+from validator import ERR_FORMAT, ERR_REQUIRED, Validator
+
+
+def test_valid_rows_are_left_out_of_the_failure_map():
+    assert Validator.validate_batch([make_student('CS-0001'), make_student('EE12345', email='')]) == {}
+    assert Validator.validate_row(make_student('CS0001'), Validator.compile_schema()) == {}
+
+
+def test_each_error_code_is_reported_per_field():
+    row = make_student('CS0001', first_name='   ', phone='12', email='not-an-email',
+                       join_date='2025-02-30', room_no=None)
+    del row['father_name']
+    assert Validator.validate_batch([row]) == {0: {
+        'first_name': ERR_REQUIRED,
+        'father_name': ERR_REQUIRED,
+        'room_no': ERR_REQUIRED,
+        'phone': ERR_FORMAT,
+        'email': ERR_FORMAT,
+        'join_date': ERR_FORMAT,
+    }}
+
+
+def test_failures_are_keyed_by_row_index():
+    rows = [make_student('CS0001'), make_student('BAD'), make_student('CS0003'),
+            make_student('CS0004', department='C5')]
+    # A generator is consumed once, as cmd_import passes it
+    assert Validator.validate_batch(row for row in rows) == {
+        1: {'registration_no': ERR_FORMAT},
+        3: {'department': ERR_FORMAT},
+    }
+
+
+def test_custom_schema_and_non_string_values():
+    schema = {'room_no': ('room', True), 'email': ('email', False)}
+    assert Validator.validate_batch([{'room_no': 101}, {'room_no': 'a-1', 'email': None}, {}], schema) == {
+        2: {'room_no': ERR_REQUIRED},
+    }
+
+
+def test_import_reports_rejected_lines(db, tmp_path, capsys):
+    path = tmp_path / 'students.jsonl'
+    rows = [make_student('CS0001'), make_student('CS0002', phone='x'), make_student('EE0001', room_no='B-201')]
+    path.write_text("\n".join(json.dumps(row) for row in rows) + "\n")
+
+    args = argparse.Namespace(file=str(path), format='jsonl', dry_run=False)
+    assert cmd_import(db, args) == 1
+    out, err = capsys.readouterr()
+    assert out.strip() == "imported 2, rejected 1"
+    assert err.strip() == "line 2: rejected (phone=invalid_format)"
+    assert db.get_student('CS0002') is None and db.get_student('EE0001') is not None
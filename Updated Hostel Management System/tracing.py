@@ -0,0 +1,322 @@
+import functools
+import inspect
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+# Statements slower than this (ms) go to the slow-query log
+SLOW_QUERY_MS = 50
+
+# Durations kept per span name for percentiles, and raw spans kept for export
+SAMPLES_PER_NAME = 1000
+RECENT_SPANS = 5000
+
+# Statements worth an EXPLAIN QUERY PLAN (not BEGIN, PRAGMA, DDL, ...)
+EXPLAINABLE_RE = re.compile(r'^\s*(SELECT|WITH|INSERT|UPDATE|DELETE|REPLACE)\b', re.IGNORECASE)
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def param_shape(params):
+    """Types of the bound parameters, never their values: ['str', 'int'] or {'prefix': 'str'}"""
+    if isinstance(params, dict):
+        return {name: type(value).__name__ for name, value in params.items()}
+    return [type(value).__name__ for value in params or ()]
+
+
+class _NoSpan:
+    """What span() returns while tracing is off: entering and leaving it costs two method calls"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+NO_SPAN = _NoSpan()
+
+
+class Span:
+    __slots__ = ('tracer', 'name', 'attrs', 'start', 'path')
+
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        stack = self.tracer.stack()
+        stack.append(self.name)
+        self.path = '>'.join(stack)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.start
+        self.tracer.stack().pop()
+        if exc_type is not None:
+            self.attrs['error'] = exc_type.__name__
+        self.tracer.record(self.name, self.path, self.start, duration, self.attrs)
+        return False
+
+    def set(self, **attrs):
+        """Attach attributes (row counts, sizes) once they are known"""
+        self.attrs.update(attrs)
+
+
+class Tracer:
+    """Per-process timing spans and slow-query log, off by default.
+
+    While disabled, span() hands back a shared no-op and Database opens
+    plain sqlite3 connections, so the only cost is a flag check per call.
+    Enabled, every span is aggregated by name (count, total, percentiles
+    over the last SAMPLES_PER_NAME durations) and the most recent ones are
+    kept for export. SQL statements are timed on the connection; those over
+    slow_ms are logged with their span path, parameter types (not values)
+    and EXPLAIN QUERY PLAN, and appended to slow_log_path as JSON lines.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.slow_ms = SLOW_QUERY_MS
+        self.slow_log_path = None
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.started = datetime.now().isoformat(timespec='seconds')
+            self.origin = time.perf_counter()
+            self.names = {}
+            self.statements = {}
+            self.recent = deque(maxlen=RECENT_SPANS)
+            self.slow_queries = deque(maxlen=RECENT_SPANS)
+
+    def enable(self, slow_ms=SLOW_QUERY_MS, slow_log_path=None):
+        self.slow_ms = slow_ms
+        self.slow_log_path = slow_log_path
+        if slow_log_path:
+            os.makedirs(os.path.dirname(slow_log_path) or '.', exist_ok=True)
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def stack(self):
+        stack = getattr(self.local, 'stack', None)
+        if stack is None:
+            stack = self.local.stack = []
+        return stack
+
+    def span(self, name, **attrs):
+        if not self.enabled:
+            return NO_SPAN
+        return Span(self, name, attrs)
+
+    def record(self, name, path, start, duration, attrs):
+        with self.lock:
+            stats = self.names.get(name)
+            if stats is None:
+                stats = self.names[name] = {'count': 0, 'total': 0.0, 'max': 0.0,
+                                            'samples': deque(maxlen=SAMPLES_PER_NAME)}
+            stats['count'] += 1
+            stats['total'] += duration
+            stats['max'] = max(stats['max'], duration)
+            stats['samples'].append(duration)
+            self.recent.append({'name': name, 'path': path, 'thread': threading.current_thread().name,
+                                'start_ms': round((start - self.origin) * 1e3, 3),
+                                'ms': round(duration * 1e3, 3), **attrs})
+
+    def record_statement(self, conn, sql, params, duration, many=False):
+        """Called by TracedCursor after each statement"""
+        key = WHITESPACE_RE.sub(' ', sql).strip()
+        with self.lock:
+            stats = self.statements.get(key)
+            if stats is None:
+                stats = self.statements[key] = {'count': 0, 'total': 0.0, 'max': 0.0}
+            stats['count'] += 1
+            stats['total'] += duration
+            stats['max'] = max(stats['max'], duration)
+        if duration * 1e3 < self.slow_ms:
+            return
+
+        entry = {'at': datetime.now().isoformat(timespec='milliseconds'),
+                 'ms': round(duration * 1e3, 3), 'sql': key,
+                 'span': '>'.join(self.stack()) or None,
+                 'params': 'executemany' if many else param_shape(params)}
+        if not many and EXPLAINABLE_RE.match(sql):
+            try:
+                # Same connection and parameters, so temp tables and attached schemas resolve
+                entry['plan'] = [row[-1] for row in
+                                 sqlite3.Connection.execute(conn, "EXPLAIN QUERY PLAN " + sql, params)]
+            except sqlite3.Error as e:
+                entry['plan_error'] = str(e)
+        with self.lock:
+            self.slow_queries.append(entry)
+            if self.slow_log_path:
+                with open(self.slow_log_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry) + '\n')
+
+    def report(self):
+        """Session summary: spans and statements by total time, plus the slow queries"""
+        def summary(stats, samples=None):
+            row = {'count': stats['count'], 'total_ms': round(stats['total'] * 1e3, 3),
+                   'mean_ms': round(stats['total'] / stats['count'] * 1e3, 3),
+                   'max_ms': round(stats['max'] * 1e3, 3)}
+            if samples:
+                samples = sorted(samples)
+                row['p50_ms'] = round(samples[len(samples) // 2] * 1e3, 3)
+                row['p95_ms'] = round(samples[min(len(samples) - 1, len(samples) * 95 // 100)] * 1e3, 3)
+            return row
+
+        with self.lock:
+            spans = {name: summary(stats, stats['samples']) for name, stats in self.names.items()}
+            statements = [dict(summary(stats), sql=sql) for sql, stats in self.statements.items()]
+            slow = list(self.slow_queries)
+        return {
+            'started': self.started,
+            'finished': datetime.now().isoformat(timespec='seconds'),
+            'pid': os.getpid(),
+            'slow_ms': self.slow_ms,
+            'spans': dict(sorted(spans.items(), key=lambda item: -item[1]['total_ms'])),
+            'statements': sorted(statements, key=lambda row: -row['total_ms'])[:100],
+            'slow_queries': slow,
+        }
+
+    def export(self, path, include_spans=True):
+        """Write the session report (and the recent raw spans) as JSON; returns the path"""
+        report = self.report()
+        if include_spans:
+            with self.lock:
+                report['recent_spans'] = list(self.recent)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=1)
+        return path
+
+    def format_report(self, limit=20):
+        """Plain-text table of the slowest span names and statements"""
+        report = self.report()
+        lines = [f"{'span':<32} {'count':>7} {'total ms':>10} {'mean':>8} {'p95':>8} {'max':>8}"]
+        for name, row in list(report['spans'].items())[:limit]:
+            lines.append(f"{name:<32} {row['count']:>7} {row['total_ms']:>10.1f} {row['mean_ms']:>8.2f} "
+                         f"{row.get('p95_ms', 0):>8.2f} {row['max_ms']:>8.2f}")
+        lines.append(f"\n{'statement':<60} {'count':>7} {'total ms':>10} {'max':>8}")
+        for row in report['statements'][:limit]:
+            lines.append(f"{row['sql'][:60]:<60} {row['count']:>7} {row['total_ms']:>10.1f} {row['max_ms']:>8.2f}")
+        lines.append(f"\nslow queries (>{report['slow_ms']} ms): {len(report['slow_queries'])}")
+        return '\n'.join(lines)
+
+
+class TracedCursor(sqlite3.Cursor):
+    # Times statement execution (up to the first row); fetch time is not included
+    def execute(self, sql, params=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, params)
+        finally:
+            tracer.record_statement(self.connection, sql, params, time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_params):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_params)
+        finally:
+            tracer.record_statement(self.connection, sql, (), time.perf_counter() - start, many=True)
+
+
+class TracedConnection(sqlite3.Connection):
+    # Connection.execute would otherwise use the plain cursor type
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self.cursor().executemany(sql, seq_of_params)
+
+
+tracer = Tracer()
+
+
+def span(name, **attrs):
+    """Context manager timing a named stage; a no-op unless tracing is enabled"""
+    return tracer.span(name, **attrs) if tracer.enabled else NO_SPAN
+
+
+def connection_factory():
+    """sqlite3.connect factory: timed connections while tracing, plain ones otherwise"""
+    return TracedConnection if tracer.enabled else sqlite3.Connection
+
+
+def traced(name):
+    """Function decorator: a span around every call.
+
+    Generator functions are timed over the whole iteration, including the
+    consumer's time between batches, and are not nested under other spans
+    since they may be resumed from anywhere. With tracing off each call
+    pays one attribute check.
+    """
+    def wrap(method):
+        if inspect.isgeneratorfunction(method):
+            @functools.wraps(method)
+            def generator_wrapper(*args, **kwargs):
+                if not tracer.enabled:
+                    return (yield from method(*args, **kwargs))
+                start = time.perf_counter()
+                try:
+                    return (yield from method(*args, **kwargs))
+                finally:
+                    tracer.record(name, name, start, time.perf_counter() - start, {})
+            return generator_wrapper
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return method(*args, **kwargs)
+            with Span(tracer, name, {}):
+                return method(*args, **kwargs)
+        return wrapper
+    return wrap
+
+
+def traced_methods(prefix):
+    """Class decorator: traced(prefix.method) on each public method"""
+    def decorate(cls):
+        for attr, value in list(vars(cls).items()):
+            if not attr.startswith('_') and inspect.isfunction(value):
+                setattr(cls, attr, traced(f"{prefix}.{attr}")(value))
+        return cls
+    return decorate
+
+
+def enable(directory, slow_ms=SLOW_QUERY_MS):
+    """Trace into directory (slow_queries.jsonl); returns the path to export the session report to"""
+    tracer.enable(slow_ms, os.path.join(directory, 'slow_queries.jsonl'))
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+    return os.path.join(directory, f"session-{stamp}-{os.getpid()}.json")
+
+
+def enable_from_env(default_dir=None):
+    """Turn tracing on when $HOSTEL_TRACE is set; returns the report path to export to, or None.
+
+    HOSTEL_TRACE=1 writes reports under default_dir; any other value is
+    taken as the directory. $HOSTEL_SLOW_MS overrides the slow-query
+    threshold.
+    """
+    value = os.environ.get('HOSTEL_TRACE')
+    if not value:
+        return None
+    return enable(default_dir if value == '1' else value,
+                  float(os.environ.get('HOSTEL_SLOW_MS', SLOW_QUERY_MS)))
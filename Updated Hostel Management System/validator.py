@@ -1,28 +1,82 @@
 import re
-from datetime import datetime
+from datetime import datetime, date
+
+# Patterns are compiled once at import so neither the form checks nor bulk
+# imports pay for the re module's compile-cache lookup on every field.
+REG_NO_RE = re.compile(r'^[A-Z]{2,3}-?\d{4,8}$')
+NAME_RE = re.compile(r'^[A-Za-z\s.\-]{2,50}$')
+PHONE_RE = re.compile(r'^[\+]?[0-9\s\-]{10,15}$')
+EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+DATE_RE = re.compile(r'^(\d{4})-(\d{1,2})-(\d{1,2})$')
+ROOM_RE = re.compile(r'^[A-Z0-9\-]{1,10}$')
+NON_DIGIT_RE = re.compile(r'\D')
+AMOUNT_RE = re.compile(r'^-?\d{1,9}(\.\d{1,2})?$')
+
+# Country code assumed for local numbers when normalizing phones to E.164
+DEFAULT_COUNTRY_CODE = '92'
+
+# Error codes reported per field by Validator.validate_batch
+ERR_REQUIRED = 'required'
+ERR_FORMAT = 'invalid_format'
+
+
+def _check_date(value):
+    m = DATE_RE.match(value)
+    if m is None:
+        return False
+    try:
+        date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+        return True
+    except ValueError:
+        return False
+
+
+# Rule name -> check taking an already stripped value
+RULES = {
+    'registration_no': lambda v: REG_NO_RE.match(v.upper()) is not None,
+    'name': NAME_RE.match,
+    'phone': PHONE_RE.match,
+    'email': EMAIL_RE.match,
+    'date': _check_date,
+    'room': lambda v: ROOM_RE.match(v.upper()) is not None,
+}
+
+# Field -> (rule name, required). Mirrors the registration form.
+STUDENT_SCHEMA = {
+    'registration_no': ('registration_no', True),
+    'first_name': ('name', True),
+    'last_name': ('name', True),
+    'father_name': ('name', True),
+    'department': ('name', True),
+    'room_no': ('room', True),
+    'phone': ('phone', True),
+    'email': ('email', False),
+    'join_date': ('date', True),
+}
+
 
 class Validator:
     @staticmethod
     def validate_registration_no(reg_no):
         reg_no = reg_no.strip().upper()
-        return bool(re.match(r'^[A-Z]{2,3}-?\d{4,8}$', reg_no))
+        return bool(REG_NO_RE.match(reg_no))
 
     @staticmethod
     def validate_name(name):
         name = name.strip()
-        return bool(re.match(r'^[A-Za-z\s.\-]{2,50}$', name)) and len(name) >= 2
+        return bool(NAME_RE.match(name)) and len(name) >= 2
 
     @staticmethod
     def validate_phone(phone):
         phone = phone.strip()
-        return bool(re.match(r'^[\+]?[0-9\s\-]{10,15}$', phone))
+        return bool(PHONE_RE.match(phone))
 
     @staticmethod
     def validate_email(email):
         email = email.strip()
         if not email:  # Email is optional
             return True
-        return bool(re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', email))
+        return bool(EMAIL_RE.match(email))
 
     @staticmethod
     def validate_date(date_str):
@@ -36,4 +90,82 @@ class Validator:
     @staticmethod
     def validate_room(room_no):
         room_no = room_no.strip().upper()
-        return bool(re.match(r'^[A-Z0-9\-]{1,10}$', room_no)) and len(room_no) >= 1
\ No newline at end of file
+        return bool(ROOM_RE.match(room_no)) and len(room_no) >= 1
+
+    @staticmethod
+    def normalize_phone(phone):
+        """E.164-style form of a phone number ('0300-1234567' -> '+923001234567')"""
+        phone = (phone or '').strip()
+        digits = NON_DIGIT_RE.sub('', phone)
+        if not digits:
+            return None
+        if phone.startswith('+'):
+            return '+' + digits
+        if digits.startswith('00'):
+            return '+' + digits[2:]
+        if digits.startswith('0'):
+            return '+' + DEFAULT_COUNTRY_CODE + digits[1:]
+        if len(digits) == 10:
+            return '+' + DEFAULT_COUNTRY_CODE + digits
+        return '+' + digits
+
+    @staticmethod
+    def parse_amount(amount):
+        """Money as integer minor units ('1,250.5' -> 125050); None if invalid"""
+        amount = str(amount).strip().replace(',', '')
+        if not AMOUNT_RE.match(amount):
+            return None
+        whole, _, fraction = amount.lstrip('-').partition('.')
+        minor = int(whole) * 100 + int(fraction.ljust(2, '0') or 0)
+        return -minor if amount.startswith('-') else minor
+
+    @staticmethod
+    def format_amount(minor):
+        sign = '-' if minor < 0 else ''
+        return f"{sign}{abs(minor) // 100:,}.{abs(minor) % 100:02d}"
+
+    @staticmethod
+    def normalize_email(email):
+        """Lower-cased email used for lookups, None when blank"""
+        email = (email or '').strip().lower()
+        return email or None
+
+    @staticmethod
+    def compile_schema(schema=None):
+        """Resolve a field schema into a flat list of (field, required, check)"""
+        schema = STUDENT_SCHEMA if schema is None else schema
+        return [(field, required, RULES[rule]) for field, (rule, required) in schema.items()]
+
+    @staticmethod
+    def validate_row(row, compiled):
+        """Return {field: error_code} for a single row (empty when valid)"""
+        errors = {}
+        for field, required, check in compiled:
+            value = row.get(field)
+            if value is None:
+                value = ''
+            elif not isinstance(value, str):
+                value = str(value)
+            value = value.strip()
+            if not value:
+                if required:
+                    errors[field] = ERR_REQUIRED
+            elif not check(value):
+                errors[field] = ERR_FORMAT
+        return errors
+
+    @staticmethod
+    def validate_batch(rows, schema=None):
+        """Validate many rows against a schema.
+
+        Returns {row_index: {field: error_code}} for the rows that failed;
+        valid rows are left out so large clean imports stay cheap.
+        """
+        compiled = Validator.compile_schema(schema)
+        validate_row = Validator.validate_row
+        failures = {}
+        for index, row in enumerate(rows):
+            errors = validate_row(row, compiled)
+            if errors:
+                failures[index] = errors
+        return failures